@@ -1,7 +1,57 @@
-from base.client import Client, Interpreter
-from base.interface import Interface
+from base.client import Client, AsyncClient, Interpreter
+from base.interface import Interface, AsyncInterface
+from base.scheduler import CommandScheduler, AsyncCommandScheduler
+from base.status import StatusCache, StatusPoller, AsyncStatusPoller, StatusSnapshot
+from base.worker import ClientWorker, AsyncClientWorker
+from base.bus import BusScheduler
+from base.metrics import Histogram, MetricsRegistry, MetricsServer
+from base.broadcast import StatusBroadcaster, StatusPublisher, AsyncStatusPublisher
+from base.trajectory import Trajectory, TrajectoryExecutor
+from base.control import Controller, ControlLoop
+from base.lanes import LaneQueue, AsyncLaneQueue
+from base.supervisor import ConnectionSupervisor, AsyncConnectionSupervisor
+from base.timing import AdaptiveTimeout
+from base.plugins import PluginRegistry
+from base.shm import SeqlockSlot
+from base.telemetry import TelemetryRecorder, TelemetryReader
+from base.watcher import ConfigWatcher, AsyncConfigWatcher
+from base.sessions import Session, SessionManager
 __all__ = [
     'Client',
+    'AsyncClient',
     'Interface',
-    'Interpreter'
+    'AsyncInterface',
+    'Interpreter',
+    'CommandScheduler',
+    'AsyncCommandScheduler',
+    'StatusCache',
+    'StatusPoller',
+    'AsyncStatusPoller',
+    'StatusSnapshot',
+    'ClientWorker',
+    'AsyncClientWorker',
+    'BusScheduler',
+    'Histogram',
+    'MetricsRegistry',
+    'MetricsServer',
+    'StatusBroadcaster',
+    'StatusPublisher',
+    'AsyncStatusPublisher',
+    'Trajectory',
+    'TrajectoryExecutor',
+    'Controller',
+    'ControlLoop',
+    'LaneQueue',
+    'AsyncLaneQueue',
+    'ConnectionSupervisor',
+    'AsyncConnectionSupervisor',
+    'AdaptiveTimeout',
+    'PluginRegistry',
+    'SeqlockSlot',
+    'TelemetryRecorder',
+    'TelemetryReader',
+    'ConfigWatcher',
+    'AsyncConfigWatcher',
+    'Session',
+    'SessionManager'
 ]
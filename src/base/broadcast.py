@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.status import StatusSnapshot
+from collections import deque
+from dataclasses import is_dataclass, asdict
+from threading import Thread, Event
+from queue import Queue, Full, Empty
+from typing import Callable
+import asyncio, time, logging
+
+log = logging.getLogger(__name__)
+
+def status_update(gripper_id: str, snapshot: StatusSnapshot) -> dict:
+    """A JSON serialisable status update for a gripper's snapshot
+    """
+    status = snapshot.status
+    return {
+        'type': 'status',
+        'gripper': gripper_id,
+        'seq': snapshot.seq,
+        'stamp': snapshot.wall,
+        'status': asdict(status) if is_dataclass(status) else status,
+    }
+
+def put_latest(queue, item):
+    """Puts an item on a bounded queue without blocking, dropping the oldest item when full.
+    Works with both queue.Queue and asyncio.Queue. Returns True if an item was dropped
+    """
+    empty = Empty if isinstance(queue, Queue) else asyncio.QueueEmpty
+    full = Full if isinstance(queue, Queue) else asyncio.QueueFull
+    dropped = False
+    while True:
+        try:
+            queue.put_nowait(item)
+            return dropped
+        except full:
+            try:
+                queue.get_nowait()
+                dropped = True
+            except empty:
+                pass
+
+# -- Subscriber Definition
+class Subscriber:
+    """A websocket client's status subscription (used on the interface's event loop).
+    Updates are held in a bounded queue that drops the oldest update when full (a size
+    of 1 keeps only the latest), so a slow client only ever delays itself
+    """
+    def __init__(self, queue_size: int = 8, changes_only: bool = False):
+        """Constructor
+        """
+        self._updates: deque = deque(maxlen=max(1, queue_size))
+        self._ready: asyncio.Event = asyncio.Event()
+        self._changes_only: bool = changes_only
+        # The last status offered per gripper (for change-only subscriptions)
+        self._last: dict = {}
+        self.sent: int = 0
+        self.dropped: int = 0
+
+    def offer(self, update: dict):
+        """Queues an update (skipped if change-only and the gripper status is unchanged)
+        """
+        if self._changes_only:
+            gripper_id = update['gripper']
+            if self._last.get(gripper_id) == update['status']:
+                return
+            self._last[gripper_id] = update['status']
+        if len(self._updates) == self._updates.maxlen:
+            self.dropped += 1
+        self._updates.append(update)
+        self._ready.set()
+
+    async def next(self) -> dict:
+        """Waits for the next queued update
+        """
+        while not self._updates:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._updates.popleft()
+
+# --- Broadcaster Definition
+class StatusBroadcaster:
+    """Fans status updates out to every subscribed websocket client.
+    Lives on the interface's event loop; publishing never waits on a client
+    """
+    def __init__(self, queue_size: int = 8):
+        """Constructor
+        """
+        self._queue_size: int = queue_size
+        self._subscribers: set = set()
+        self._published: int = 0
+
+    def subscribe(self, changes_only: bool = False) -> Subscriber:
+        subscriber = Subscriber(queue_size=self._queue_size, changes_only=changes_only)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, update: dict):
+        """Offers an update to every subscriber
+        """
+        self._published += 1
+        for subscriber in self._subscribers:
+            subscriber.offer(update)
+
+    def forward(self, output_q, loop: asyncio.AbstractEventLoop) -> asyncio.Task:
+        """Publishes every update taken from the handler's output queue on the given loop.
+        An asyncio.Queue is read by a task (returned); a queue.Queue by a daemon thread
+        """
+        if isinstance(output_q, Queue):
+            def _read():
+                while True:
+                    update = output_q.get()
+                    if update is None:
+                        break
+                    loop.call_soon_threadsafe(self.publish, update)
+            Thread(target=_read, daemon=True, name="Thread-Status-Forward").start()
+            return None
+
+        async def _read_async():
+            while True:
+                self.publish(await output_q.get())
+        return loop.create_task(_read_async(), name="Task-Status-Forward")
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'subscribers': len(self._subscribers),
+            'published': self._published,
+            'sent': sum(subscriber.sent for subscriber in self._subscribers),
+            'dropped': sum(subscriber.dropped for subscriber in self._subscribers),
+        }
+
+# --- Publisher Definition
+class StatusPublisher:
+    """Publishes each gripper's latest status snapshot to the handler's output queue at a fixed
+    rate (only snapshots newer than the last published). The queue is bounded and the oldest
+    update is dropped when the interface is not keeping up
+    """
+    def __init__(self, sources: Callable[[], dict], output_q: Queue, rate: float = 10.0):
+        """Constructor (sources returns the {gripper id: worker} to publish)
+        """
+        self._sources: Callable[[], dict] = sources
+        self._output_q: Queue = output_q
+        self.set_rate(rate)
+        self._seq: dict = {}
+        self._published: int = 0
+        self._dropped: int = 0
+        self._stop: Event = Event()
+        self._thread: Thread = None
+
+    def publish(self):
+        """Publishes any new snapshots
+        """
+        for gripper_id, worker in self._sources().items():
+            snapshot = worker.get_status()
+            if snapshot is None or snapshot.seq == self._seq.get(gripper_id):
+                continue
+            self._seq[gripper_id] = snapshot.seq
+            self._dropped += int(put_latest(self._output_q, status_update(gripper_id, snapshot)))
+            self._published += 1
+
+    def _run(self):
+        """Thread method publishing at the configured rate
+        """
+        log.info("Status Publisher Running")
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            self.publish()
+            deadline += self._period
+            self._stop.wait(max(0.0, deadline - time.monotonic()))
+        log.info("Status Publisher Stopped")
+
+    def set_rate(self, rate: float):
+        """Sets the publish rate (Hz) in place
+        """
+        self._period: float = 1.0 / rate if rate > 0 else 0.1
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True, name="Thread-Status-Publisher")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @property
+    def stats(self) -> dict:
+        return {'published': self._published, 'dropped': self._dropped}
+
+class AsyncStatusPublisher(StatusPublisher):
+    """Asyncio variant of the StatusPublisher that runs as a task on the event loop
+    """
+    def __init__(self, sources: Callable[[], dict], output_q: asyncio.Queue, rate: float = 10.0):
+        """Constructor
+        """
+        super().__init__(sources, output_q, rate)
+        self._task: asyncio.Task = None
+
+    async def _run(self):
+        """Task method publishing at the configured rate
+        """
+        log.info("Async Status Publisher Running")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while not self._stop.is_set():
+            self.publish()
+            deadline += self._period
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+        log.info("Async Status Publisher Stopped")
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="Task-Status-Publisher")
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
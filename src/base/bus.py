@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.lanes import PRIORITY_QUERY, LANES
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from collections import deque
+from threading import Thread, Condition
+from typing import Any, Callable
+import time, logging
+
+log = logging.getLogger(__name__)
+
+# -- Transaction Definition
+class _Transaction():
+    __slots__ = ('slave_id', 'fn', 'future', 'queued')
+
+    def __init__(self, slave_id: int, fn: Callable[[], Any]):
+        self.slave_id: int = slave_id
+        self.fn: Callable[[], Any] = fn
+        self.future: Future = Future()
+        self.queued: float = time.perf_counter()
+
+# --- Bus Scheduler Definition
+class BusScheduler:
+    """Time-multiplexes the transactions of many slave ids sharing one bus (e.g., daisy-chained RS-485).
+    A single bus thread owns the shared transport and runs one transaction at a time: pending
+    transactions are served by priority class (safety, mode, motion, then status reads), and
+    round-robin across slaves within a class.
+    Callers block until their transaction has run and receive its result (or exception), for
+    at most their timeout. A stopped bus is not restarted: later transactions are refused.
+    """
+    def __init__(self, name: str):
+        """Constructor
+        """
+        self._name: str = name
+        # The shared transport (e.g., a pymodbus client) registered by the first client on the bus
+        self.transport: Any = None
+        # Pending transactions per slave for each priority class
+        self._lanes: tuple = tuple({} for _ in LANES)
+        # Round-robin order of slave ids (and the next index per priority class)
+        self._slaves: list = []
+        self._next_index: list = [0] * len(LANES)
+        self._pending: Condition = Condition()
+        self._running: bool = False
+        # Set once stopped (the bus thread is not started again)
+        self._stopped: bool = False
+        self._thread: Thread = None
+        self._started: float = time.perf_counter()
+        # Per slave statistics
+        self._stats: dict = {}
+
+    # -- Private Methods
+    def _register(self, slave_id: int):
+        """Adds a slave id to the round-robin order
+        """
+        if slave_id not in self._stats:
+            for lane in self._lanes:
+                lane[slave_id] = deque()
+            self._slaves.append(slave_id)
+            self._stats[slave_id] = {
+                'commands': 0, 'reads': 0, 'errors': 0, 'expired': 0,
+                'busy': 0.0, 'latency_total': 0.0, 'latency_max': 0.0
+            }
+
+    def _take(self, queues: dict, index: int) -> tuple:
+        """Takes the next transaction round-robin from the given queues (None if all empty)
+        """
+        count = len(self._slaves)
+        for offset in range(count):
+            slave_id = self._slaves[(index + offset) % count]
+            if queues[slave_id]:
+                return queues[slave_id].popleft(), (index + offset + 1) % count
+        return None, index
+
+    def _next(self) -> tuple:
+        """The next transaction to run and its priority class (most urgent class first)
+        """
+        for priority, lane in enumerate(self._lanes):
+            transaction, self._next_index[priority] = self._take(lane, self._next_index[priority])
+            if transaction is not None:
+                return transaction, priority
+        return None, None
+
+    def _run(self):
+        """Thread method running transactions on the bus
+        """
+        log.info(f"{self._name} Scheduler Running")
+        while True:
+            with self._pending:
+                transaction, priority = self._next()
+                while transaction is None and self._running:
+                    self._pending.wait()
+                    transaction, priority = self._next()
+                if transaction is None:
+                    break
+
+            # A transaction its caller stopped waiting for is dropped rather than run late
+            if not transaction.future.set_running_or_notify_cancel():
+                self._stats[transaction.slave_id]['expired'] += 1
+                continue
+            start = time.perf_counter()
+            try:
+                transaction.future.set_result(transaction.fn())
+                error = False
+            except Exception as e:
+                transaction.future.set_exception(e)
+                error = True
+            end = time.perf_counter()
+
+            stats = self._stats[transaction.slave_id]
+            stats['reads' if priority == PRIORITY_QUERY else 'commands'] += 1
+            stats['errors'] += int(error)
+            stats['busy'] += end - start
+            latency = end - transaction.queued
+            stats['latency_total'] += latency
+            stats['latency_max'] = max(stats['latency_max'], latency)
+        log.info(f"{self._name} Scheduler Stopped")
+
+    # -- Public Methods
+    def submit(self, slave_id: int, fn: Callable[[], Any], priority: int = PRIORITY_QUERY, timeout: float = None) -> Any:
+        """Queues a transaction for a slave and blocks until it has run on the bus (at most
+        timeout seconds, None waits indefinitely). More urgent priority classes (see base.lanes)
+        are served first. Raises RuntimeError once the bus is stopped, and TimeoutError if the
+        transaction has not run in time (it is then dropped, unless already running)
+        """
+        transaction = _Transaction(slave_id, fn)
+        with self._pending:
+            if self._stopped:
+                raise RuntimeError(f"{self._name} bus is stopped")
+            if not self._running:
+                self.start()
+            self._register(slave_id)
+            self._lanes[priority][slave_id].append(transaction)
+            self._pending.notify()
+        try:
+            return transaction.future.result(timeout)
+        except FutureTimeout:
+            transaction.future.cancel()
+            raise TimeoutError(f"{self._name} bus transaction for slave {slave_id} not run within {timeout} s") from None
+
+    def start(self):
+        """Starts the bus thread (a stopped bus is not started again)
+        """
+        if self._stopped:
+            raise RuntimeError(f"{self._name} bus is stopped")
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._started = time.perf_counter()
+        self._thread = Thread(target=self._run, daemon=True, name=f"Thread-Bus-{self._name}")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stops the bus thread once pending transactions have run. Later transactions are refused
+        """
+        with self._pending:
+            self._running = False
+            self._stopped = True
+            self._pending.notify()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def close(self, timeout: float = 1.0):
+        """Stops the bus thread and closes the shared transport (the bus is not used again)
+        """
+        self.stop(timeout)
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    # -- Properties
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def stats(self) -> dict:
+        """Bus utilisation and transaction latency per slave id
+        """
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        slaves: dict = {}
+        busy: float = 0.0
+        for slave_id, stats in self._stats.items():
+            count = stats['commands'] + stats['reads']
+            busy += stats['busy']
+            slaves[slave_id] = {
+                'commands': stats['commands'],
+                'reads': stats['reads'],
+                'errors': stats['errors'],
+                'expired': stats['expired'],
+                'utilisation': stats['busy'] / elapsed,
+                'latency_avg': stats['latency_total'] / count if count else 0.0,
+                'latency_max': stats['latency_max'],
+                'transaction_avg': stats['busy'] / count if count else 0.0,
+            }
+        return {
+            'utilisation': busy / elapsed,
+            'slaves': slaves,
+        }
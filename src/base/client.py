@@ -5,7 +5,10 @@ __author__ = 'Dasun Gunasinghe'
 __email__ = 'robotics.ref@qut.edu.au'
 
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Callable
+from threading import RLock
+from base.lanes import PRIORITY_MODE, PRIORITY_MOTION
+import asyncio, time
 
 T = TypeVar("T")
 class Interpreter(ABC, Generic[T]):
@@ -30,11 +33,50 @@ class Interpreter(ABC, Generic[T]):
         """
         pass
 
+    # -- Standard Methods
+    def is_barrier(self, command: T) -> bool:
+        """Returns True if a command is ordering-sensitive and must be sent on its own
+        (i.e., it cannot be coalesced with neighbouring commands)
+        """
+        return False
+
+    def priority(self, command: T) -> int:
+        """Returns the priority class (see base.lanes) of a command: ordering-sensitive
+        commands (barriers) are mode changes, anything else is motion
+        """
+        return PRIORITY_MODE if self.is_barrier(command) else PRIORITY_MOTION
+
+    def is_moving(self, status: T) -> bool:
+        """Returns True if an interpreted status indicates the gripper is in motion
+        """
+        return False
+
+    def is_activation_lost(self, status: T) -> bool:
+        """Returns True if an interpreted status shows the client lost a setup (e.g., activation)
+        that its last generated output still expects, so it needs setting up again
+        """
+        return False
+
+    def resume(self, status: T) -> bool:
+        """Returns True if an interpreted status shows the gripper is already set up, taking over
+        its state so that new outputs continue from it (e.g., a new client after a config reload).
+        Otherwise (the default) the gripper is set up again
+        """
+        return False
+
+    def stop_command(self, status: T) -> T:
+        """Returns a command that halts motion given the latest interpreted status
+        (None if the gripper cannot be stopped by a command)
+        """
+        return None
+
 T = TypeVar("T")
 class Client(ABC, Generic[T]):
     def __init__(self, interpreter: Interpreter):
         self._connection_status: bool = False
         self._interpreter: Interpreter = interpreter
+        # Serialises bus transactions between threads (e.g., command dispatch and status polling)
+        self._lock: RLock = RLock()
 
     # -- Standard Methods
     def get_interpreter(self) -> Interpreter:
@@ -84,3 +126,134 @@ class Client(ABC, Generic[T]):
         """
         pass
 
+    # -- Standard Methods (may be overridden for a more efficient transport)
+    @property
+    def stats(self) -> dict:
+        """Client specific counters (none by default)
+        """
+        return {}
+
+    def close(self):
+        """Releases the client for good (e.g., when replaced after a config reload). Clients
+        owning more than a connection (e.g., a process) release it here too
+        """
+        if self._connected:
+            self.disconnect()
+
+    def send_and_get_status(self, command: T, priority: int = PRIORITY_MOTION) -> T:
+        """Sends the command and returns the status from client (empty on failure).
+        The priority class may be used by clients that share a bus
+        """
+        if not self.send(command):
+            return b''
+        return self.get_status()
+
+    def wait_for(self, condition: Callable[[T], bool], timeout: float = 5.0, period: float = 0.02) -> T:
+        """Polls the interpreted status until the condition is met or the timeout expires.
+        Returns the final interpreted status (None if the status could not be read)
+        """
+        deadline = time.monotonic() + timeout
+        status = None
+        while True:
+            raw = self.get_status()
+            if raw:
+                status = self._interpreter.interpret_input(raw)
+                if condition(status):
+                    return status
+            if time.monotonic() + period > deadline:
+                return status
+            time.sleep(period)
+
+
+T = TypeVar("T")
+class AsyncClient(ABC, Generic[T]):
+    """Asyncio variant of the Client for use on a single event loop (shares the Interpreter)
+    """
+    def __init__(self, interpreter: Interpreter):
+        self._connection_status: bool = False
+        self._interpreter: Interpreter = interpreter
+
+    # -- Standard Methods
+    def get_interpreter(self) -> Interpreter:
+        return self._interpreter
+
+    # -- Properties
+    @property
+    def _connected(self):
+        """The _connection_status property.
+        """
+        return self._connection_status
+
+    @_connected.setter
+    def _connected(self, value: bool = False):
+        """Setting the _connection_status property
+        """
+        self._connection_status = value
+
+    # -- Abstract Methods
+    @abstractmethod
+    async def setup(self) -> T:
+        """Conducts required setup for the client
+        """
+        pass
+
+    @abstractmethod
+    async def send(self, command: T) -> bool:
+        """Sends the command to a client
+        """
+        pass
+
+    @abstractmethod
+    async def connect(self) -> bool:
+        """Connects to a client device
+        """
+        pass
+
+    @abstractmethod
+    async def disconnect(self) -> T:
+        """Disconnects from a client device 
+        """
+        pass
+
+    @abstractmethod
+    async def get_status(self) -> T:
+        """Return the status from client
+        """
+        pass
+
+    # -- Standard Methods (may be overridden for a more efficient transport)
+    @property
+    def stats(self) -> dict:
+        """Client specific counters (none by default)
+        """
+        return {}
+
+    async def close(self):
+        """Releases the client for good (e.g., when replaced after a config reload)
+        """
+        if self._connected:
+            await self.disconnect()
+
+    async def send_and_get_status(self, command: T, priority: int = PRIORITY_MOTION) -> T:
+        """Sends the command and returns the status from client (empty on failure).
+        The priority class may be used by clients that share a bus
+        """
+        if not await self.send(command):
+            return b''
+        return await self.get_status()
+
+    async def wait_for(self, condition: Callable[[T], bool], timeout: float = 5.0, period: float = 0.02) -> T:
+        """Polls the interpreted status until the condition is met or the timeout expires.
+        Returns the final interpreted status (None if the status could not be read)
+        """
+        deadline = time.monotonic() + timeout
+        status = None
+        while True:
+            raw = await self.get_status()
+            if raw:
+                status = self._interpreter.interpret_input(raw)
+                if condition(status):
+                    return status
+            if time.monotonic() + period > deadline:
+                return status
+            await asyncio.sleep(period)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from abc import ABC, abstractmethod
+from base.metrics import registry, Histogram
+from collections import deque
+from typing import Callable
+import time, logging
+
+log = logging.getLogger(__name__)
+
+# Recent ticks kept for the jitter and cycle time percentiles
+JITTER_SAMPLES = 1000
+# Highest loop rate (Hz) a control request may ask for
+MAX_CONTROL_RATE = 1000.0
+
+# --- Controller Definition
+class Controller(ABC):
+    """A closed-loop controller run by a ControlLoop at a fixed period. Each tick it is given the
+    interpreted status and the time since the previous tick (s), and returns a command for the
+    interpreter (e.g., {'position': 200, 'force': 60}), or None to keep the current output.
+    A controller that has reached its goal sets done, ending the loop after that tick's write.
+    Controllers are named in control requests by their plugin name (see grippers.PLUGINS), and
+    the other fields of the request are passed to the constructor as options
+    """
+    def __init__(self):
+        self.done: bool = False
+
+    def start(self, status):
+        """Called with the first status, before the first update
+        """
+        pass
+
+    @abstractmethod
+    def update(self, status, dt: float):
+        """Returns the command for this tick (None keeps the current output)
+        """
+        pass
+
+    @property
+    def result(self) -> dict:
+        """Fields reported when the loop ends (none by default)
+        """
+        return {}
+
+# --- Loop Definition
+class ControlLoop:
+    """Runs at most one controller per client worker at a fixed period. Ticks are scheduled
+    against absolute deadlines (so timing errors do not accumulate): the worker waits until
+    shortly before a deadline and the loop spins out the rest, so sleep overshoot stays out of
+    the tick. Each tick's lateness (jitter) and cycle time (read, control and write) are
+    recorded. A tick that ends after the next deadline is an overrun, and deadlines missed
+    entirely are skipped rather than run late in a burst. Events (started, completed, stopped,
+    preempted, link_down) are reported through the reply method as dicts.
+    """
+    def __init__(self, name: str = 'default', max_failures: int = 3, spin: float = 0.0005):
+        """Constructor (max_failures is the consecutive failed status reads that end the loop and
+        spin the time before each deadline that is spun rather than slept)
+        """
+        self._jitter_histogram: Histogram = registry.histogram(
+            'gripper_control_jitter_seconds', 'Lateness of control loop ticks', gripper=name)
+        self._cycle_histogram: Histogram = registry.histogram(
+            'gripper_control_cycle_seconds', 'Time of a control loop tick (read, control and write)', gripper=name)
+        self.configure(max_failures=max_failures, spin=spin)
+        self._controller: Controller = None
+        self._id: str = None
+        self._reply: Callable[[dict], None] = None
+        self._rate: float = 0.0
+        self._period: float = 0.0
+        self._deadline: float = 0.0
+        self._tick_start: float = None
+        self._last_output = None
+        # Set when the previous tick's write read the status back (so the next tick need not read it)
+        self._refreshed: bool = False
+        self._started: bool = False
+        self._failures: int = 0
+        self._session_start: float = 0.0
+        self._session_ticks: int = 0
+        # Recent tick lateness and cycle times (seconds)
+        self._jitter: deque = deque(maxlen=JITTER_SAMPLES)
+        self._cycle: deque = deque(maxlen=JITTER_SAMPLES)
+        # Counters
+        self._sessions: int = 0
+        self._completed: int = 0
+        self._ticks: int = 0
+        self._writes: int = 0
+        self._overruns: int = 0
+        self._skipped: int = 0
+        self._read_failures: int = 0
+
+    # -- Private Methods
+    def _report(self, event: str, **fields):
+        """Sends an event to the requesting client (if any)
+        """
+        if self._reply is None:
+            return
+        try:
+            self._reply({'type': 'control', 'id': self._id, 'event': event, **fields})
+        except Exception as e:
+            log.warning(f"Cannot Report Control {self._id} {event} -> {e}")
+
+    def _end(self, event: str):
+        """Ends the running controller, reporting the event with its result and loop timing
+        """
+        self._report(event, ticks=self._session_ticks, achieved_rate=self._achieved_rate(),
+                     **self._controller.result, **self.timing())
+        self._controller = None
+        self._reply = None
+
+    def _achieved_rate(self) -> float:
+        elapsed = time.perf_counter() - self._session_start
+        return self._session_ticks / elapsed if self._session_ticks and elapsed > 0 else 0.0
+
+    # -- Public Methods
+    def configure(self, max_failures: int = 3, spin: float = 0.0005):
+        """Sets the loop options (applied in place while running)
+        """
+        self._max_failures: int = max(1, max_failures)
+        self._spin: float = max(0.0, spin)
+
+    def start(self, controller: Controller, rate: float, control_id: str = None, reply: Callable[[dict], None] = None):
+        """Starts running a controller at a rate (Hz), pre-empting the current one. The first
+        tick is due at once
+        """
+        self.cancel('preempted')
+        self._controller = controller
+        self._id = control_id
+        self._reply = reply
+        self._rate = rate
+        self._period = 1.0 / rate
+        self._deadline = time.perf_counter()
+        self._tick_start = None
+        self._last_output = None
+        self._refreshed = False
+        self._started = False
+        self._failures = 0
+        self._session_start = self._deadline
+        self._session_ticks = 0
+        self._jitter.clear()
+        self._cycle.clear()
+        self._sessions += 1
+        self._report('started', rate=rate)
+
+    def cancel(self, reason: str = 'stopped') -> bool:
+        """Ends the running controller (reason is the reported event). Returns True if one was running
+        """
+        if self._controller is None:
+            return False
+        self._end(reason)
+        return True
+
+    def time_to_next(self) -> float:
+        """Seconds to wait before the next tick (None when idle). The spin time before the
+        deadline is left to begin
+        """
+        if self._controller is None:
+            return None
+        return max(0.0, self._deadline - self._spin - time.perf_counter())
+
+    def due(self) -> bool:
+        """True if a controller is running and its next tick is due (within the spin time)
+        """
+        return self._controller is not None and time.perf_counter() >= self._deadline - self._spin
+
+    def begin(self) -> float:
+        """Begins a due tick: spins until its deadline, records its lateness and skips any
+        deadlines already missed. Returns the time since the previous tick (s)
+        """
+        now = time.perf_counter()
+        while now < self._deadline:
+            now = time.perf_counter()
+        lateness = now - self._deadline
+        if lateness >= self._period:
+            missed = int(lateness // self._period)
+            self._skipped += missed
+            self._deadline += missed * self._period
+            lateness -= missed * self._period
+        self._jitter.append(lateness)
+        self._jitter_histogram.observe(lateness)
+        dt = now - self._tick_start if self._tick_start is not None else self._period
+        self._tick_start = now
+        return dt
+
+    def step(self, status, interpreter, dt: float):
+        """Runs the controller on a tick's interpreted status (None if it could not be read).
+        Returns the output to write, or None if it is unchanged since the last write
+        """
+        if status is None:
+            self._failures += 1
+            self._read_failures += 1
+            return None
+        self._failures = 0
+        if not self._started:
+            self._controller.start(status)
+            self._started = True
+        command = self._controller.update(status, dt)
+        if command is None:
+            return None
+        output = interpreter.generate_output(command)
+        if output == self._last_output:
+            return None
+        # The output may be a view of the interpreter's reused buffer, so a copy is kept
+        self._last_output = bytes(output)
+        self._writes += 1
+        return output
+
+    def end(self, refreshed: bool = False):
+        """Ends the tick: records its cycle time and schedules the next deadline (refreshed if its
+        write read the status back). The loop ends once the controller is done, or after
+        consecutive failed status reads
+        """
+        self._refreshed = refreshed
+        now = time.perf_counter()
+        cycle = now - self._tick_start
+        self._cycle.append(cycle)
+        self._cycle_histogram.observe(cycle)
+        self._ticks += 1
+        self._session_ticks += 1
+        self._deadline += self._period
+        if now > self._deadline:
+            self._overruns += 1
+        if self._controller.done:
+            self._completed += 1
+            self._end('completed')
+        elif self._failures >= self._max_failures:
+            log.warning(f"Control {self._id} Ended After {self._failures} Failed Status Reads")
+            self._end('link_down')
+
+    def timing(self) -> dict:
+        """Jitter (tick lateness) and cycle time percentiles (ms) over the recent ticks
+        """
+        timing: dict = {}
+        for name, samples in (('jitter_ms', self._jitter), ('cycle_ms', self._cycle)):
+            ordered = sorted(samples)
+            if not ordered:
+                timing[name] = {'mean': 0.0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+                continue
+            timing[name] = {
+                'mean': 1e3 * sum(ordered) / len(ordered),
+                'p50': 1e3 * ordered[len(ordered) // 2],
+                'p99': 1e3 * ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))],
+                'max': 1e3 * ordered[-1],
+            }
+        return timing
+
+    # -- Properties
+    @property
+    def refreshed(self) -> bool:
+        """True if the previous tick's write read the status back, so this tick runs on the
+        cached status instead of reading it again (one bus transaction per tick)
+        """
+        return self._refreshed
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'active': self._controller is not None,
+            'rate': self._rate,
+            'achieved_rate': self._achieved_rate() if self._controller is not None else 0.0,
+            'sessions': self._sessions,
+            'completed': self._completed,
+            'ticks': self._ticks,
+            'writes': self._writes,
+            'overruns': self._overruns,
+            'skipped': self._skipped,
+            'read_failures': self._read_failures,
+            **self.timing(),
+        }
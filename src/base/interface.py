@@ -7,6 +7,7 @@ __email__ = 'robotics.ref@qut.edu.au'
 from abc import ABC, abstractmethod
 from typing import TypeVar, Generic, Callable
 from queue import Queue
+import asyncio
 
 T = TypeVar("T")
 Func = Callable[[T], bool]
@@ -16,12 +17,15 @@ class Interface(ABC, Generic[T]):
             input_q: Queue, 
             output_q: Queue, 
             run_control_method: Func[T], 
-            connection_check_method: Func[T]
+            connection_check_method: Func[T],
+            stats_method: Callable[[], dict] = None
         ):
         # This is a method/object that controls if the interface runs or not
         self._run_control_method: Func[T] = run_control_method
         # This is a method/object that checks if the interface is connected or not
         self._connection_check_method: Func[T] = connection_check_method
+        # This is an (optional) method returning the handler statistics for a 'stats' query
+        self._stats_method: Callable[[], dict] = stats_method
         # Expected Queue variables for interface thread communication
         self._input_q: Queue = input_q
         self._output_q: Queue = output_q
@@ -38,3 +42,44 @@ class Interface(ABC, Generic[T]):
         """
         pass
 
+T = TypeVar("T")
+class AsyncInterface(ABC, Generic[T]):
+    """Asyncio variant of the Interface that runs on the caller's event loop
+    (the queues are expected to be asyncio.Queue objects)
+    """
+    def __init__(
+            self, 
+            input_q: asyncio.Queue, 
+            output_q: asyncio.Queue, 
+            run_control_method: Func[T], 
+            connection_check_method: Func[T],
+            stats_method: Callable[[], dict] = None
+        ):
+        # This is a method/object that controls if the interface runs or not
+        self._run_control_method: Func[T] = run_control_method
+        # This is a method/object that checks if the interface is connected or not
+        self._connection_check_method: Func[T] = connection_check_method
+        # This is an (optional) method returning the handler statistics for a 'stats' query
+        self._stats_method: Callable[[], dict] = stats_method
+        # Expected Queue variables for interface task communication
+        self._input_q: asyncio.Queue = input_q
+        self._output_q: asyncio.Queue = output_q
+
+    @abstractmethod
+    async def _setup(self):
+        """A required setup method for the interface (starts serving and returns)
+        """
+        pass
+
+    @abstractmethod
+    async def _interface_handler(self):
+        """This is the main interface handler 
+        """
+        pass
+
+    @abstractmethod
+    async def close(self):
+        """Stops serving the interface
+        """
+        pass
+
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from collections import deque
+from queue import Queue
+from typing import Any, Callable
+import asyncio
+
+# Command priority classes (lower is more urgent)
+PRIORITY_SAFETY = 0     # stop (and worker control)
+PRIORITY_MODE = 1       # reset/activate and other mode changes
+PRIORITY_MOTION = 2     # position/speed/force targets and trajectories
+PRIORITY_QUERY = 3      # status reads
+LANES = ('safety', 'mode', 'motion', 'query')
+
+# -- Lanes Definition
+class _Lanes:
+    """FIFO lanes (one per priority class) behind a deque-like interface (append/popleft/len).
+    An urgent (safety or mode) item cancels the stale motion items queued before it, passing
+    each to the cancel method (if given)
+    """
+    def __init__(self, priority: Callable[[Any], int], cancel: Callable[[Any], None] = None):
+        self._priority: Callable[[Any], int] = priority
+        self._cancel: Callable[[Any], None] = cancel
+        self._lanes: tuple = tuple(deque() for _ in LANES)
+        self.cancelled: int = 0
+
+    def append(self, item):
+        lane = self._priority(item)
+        if lane < PRIORITY_MOTION:
+            motion = self._lanes[PRIORITY_MOTION]
+            self.cancelled += len(motion)
+            if self._cancel is not None:
+                for stale in motion:
+                    self._cancel(stale)
+            motion.clear()
+        self._lanes[lane].append(item)
+
+    def popleft(self):
+        for lane in self._lanes:
+            if lane:
+                return lane.popleft()
+        raise IndexError("pop from empty lanes")
+
+    def urgent(self) -> bool:
+        """True if a safety or mode item is pending
+        """
+        return bool(self._lanes[PRIORITY_SAFETY] or self._lanes[PRIORITY_MODE])
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+# --- Queue Definitions
+class LaneQueue(Queue):
+    """Queue that serves items by priority class (FIFO within a class). The priority method
+    maps an item to its class. Safety and mode items jump the queue and cancel queued motion
+    (the cancel method, if given, is called with each cancelled item while holding the queue lock)
+    """
+    def __init__(self, priority: Callable[[Any], int], maxsize: int = 0, cancel: Callable[[Any], None] = None):
+        self._priority: Callable[[Any], int] = priority
+        self._cancel: Callable[[Any], None] = cancel
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int):
+        self.queue = _Lanes(self._priority, self._cancel)
+
+    def is_urgent(self, item) -> bool:
+        return self._priority(item) < PRIORITY_MOTION
+
+    def urgent(self) -> bool:
+        """True if a safety or mode item is pending
+        """
+        with self.mutex:
+            return self.queue.urgent()
+
+    def wait_urgent(self, timeout: float) -> bool:
+        """Blocks until a safety or mode item is pending or the timeout expires
+        (used to sleep between writes without delaying urgent items)
+        """
+        with self.not_empty:
+            return self.not_empty.wait_for(self.queue.urgent, timeout)
+
+    @property
+    def cancelled(self) -> int:
+        return self.queue.cancelled
+
+class AsyncLaneQueue(asyncio.Queue):
+    """Asyncio variant of the LaneQueue
+    """
+    def __init__(self, priority: Callable[[Any], int], maxsize: int = 0, cancel: Callable[[Any], None] = None):
+        self._priority: Callable[[Any], int] = priority
+        self._cancel: Callable[[Any], None] = cancel
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int):
+        self._queue = _Lanes(self._priority, self._cancel)
+        self._pending_urgent: asyncio.Event = asyncio.Event()
+
+    def _put(self, item):
+        super()._put(item)
+        if self.is_urgent(item):
+            self._pending_urgent.set()
+
+    def is_urgent(self, item) -> bool:
+        return self._priority(item) < PRIORITY_MOTION
+
+    def urgent(self) -> bool:
+        return self._queue.urgent()
+
+    async def wait_urgent(self, timeout: float) -> bool:
+        """Waits until a safety or mode item is pending or the timeout expires
+        """
+        if self._queue.urgent():
+            return True
+        self._pending_urgent.clear()
+        try:
+            await asyncio.wait_for(self._pending_urgent.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._queue.urgent()
+
+    @property
+    def cancelled(self) -> int:
+        return self._queue.cancelled
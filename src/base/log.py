@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+# Logging setup shared by all modules (each module logs through logging.getLogger(__name__)).
+# Records are handed to a bounded queue and written by a background listener thread, so a slow
+# stdout never blocks the serial or websocket loops. Records repeated from the same call site
+# are rate limited, and disabled levels cost only the logger's level check.
+
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
+from queue import Queue, Full
+import logging, atexit, sys, time
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s [%(name)s] %(message)s"
+
+# -- Rate Limit Filter Definition
+class RateLimitFilter(logging.Filter):
+    """Passes at most `burst` records per call site (logger and line) in each period.
+    The next record passed from a call site notes how many of its records were suppressed
+    """
+    def __init__(self, burst: int = 10, period: float = 1.0):
+        """Constructor
+        """
+        super().__init__()
+        self._burst: int = burst
+        self._period: float = period
+        # (logger name, line) -> [window start, count in window, suppressed]
+        self._sites: dict = {}
+        self._lock: Lock = Lock()
+        self.suppressed: int = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._burst <= 0:
+            return True
+        now = time.monotonic()
+        key = (record.name, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self._period:
+                suppressed = site[2] if site is not None else 0
+                self._sites[key] = [now, 1, 0]
+            elif site[1] < self._burst:
+                site[1] += 1
+                suppressed = 0
+            else:
+                site[2] += 1
+                self.suppressed += 1
+                return False
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar suppressed)"
+        return True
+
+# -- Queue Handler Definition
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller: records are dropped (and counted) when the
+    queue is full, and messages are formatted by the listener thread rather than the caller
+    """
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Tracebacks are rendered now as the exception may not outlive the caller
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+# Active handler and listener (set by configure_logging)
+_handler: NonBlockingQueueHandler = None
+_listener: QueueListener = None
+_rate_limit: RateLimitFilter = None
+
+def configure_logging(config: dict = None):
+    """Configures the root logger from the 'logging' section of the config:
+        level: default level (e.g., INFO)
+        levels: per module levels (e.g., {grippers.robotiq.client: DEBUG})
+        rate_limit: records per call site per second (0 disables)
+        queue_size: maximum pending records before records are dropped
+    """
+    global _handler, _listener, _rate_limit
+    settings = (config or {}).get('logging') or {}
+    shutdown_logging()
+
+    queue: Queue = Queue(maxsize=settings.get('queue_size', 10000))
+    _rate_limit = RateLimitFilter(burst=settings.get('rate_limit', 10))
+    _handler = NonBlockingQueueHandler(queue)
+    _handler.addFilter(_rate_limit)
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = QueueListener(queue, output, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    set_levels(config)
+
+def check_levels(config: dict = None):
+    """Raises ValueError for an unknown level or an invalid rate limit in the config's 'logging' section
+    """
+    settings = (config or {}).get('logging') or {}
+    levels: dict = dict(settings.get('levels') or {}, **{'logging.level': settings.get('level', 'INFO')})
+    for name, level in levels.items():
+        if not isinstance(level, int) and not isinstance(logging.getLevelName(str(level)), int):
+            raise ValueError(f"unknown logging level for {name} -> {level}")
+    rate_limit = settings.get('rate_limit', 10)
+    if isinstance(rate_limit, bool) or not isinstance(rate_limit, int):
+        raise ValueError(f"logging.rate_limit must be an integer -> {rate_limit!r}")
+
+def set_levels(config: dict = None, previous: dict = None):
+    """Applies the levels and rate limit of the config's 'logging' section in place (e.g., on a
+    config reload). Modules only given a level by the previous config are reset to inherit
+    """
+    settings = (config or {}).get('logging') or {}
+    if _rate_limit is not None:
+        _rate_limit._burst = settings.get('rate_limit', 10)
+    logging.getLogger().setLevel(settings.get('level', 'INFO'))
+    levels: dict = settings.get('levels') or {}
+    for name in ((previous or {}).get('logging') or {}).get('levels') or {}:
+        if name not in levels:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+def shutdown_logging():
+    """Flushes pending records and stops the listener thread
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+
+def logging_stats() -> dict:
+    """Records dropped (queue full) and suppressed (rate limited) since configuration
+    """
+    return {
+        'dropped': _handler.dropped if _handler is not None else 0,
+        'suppressed': _rate_limit.suppressed if _rate_limit is not None else 0,
+    }
+
+atexit.register(shutdown_logging)
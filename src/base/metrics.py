@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread, Lock
+from bisect import bisect_left
+from typing import Callable
+import math, logging
+
+log = logging.getLogger(__name__)
+
+# Default latency buckets (seconds)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+# -- Histogram Definition
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, as per the Prometheus text format)
+    """
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        """Constructor
+        """
+        self._bounds: tuple = tuple(buckets)
+        # One count per bucket plus the +Inf bucket
+        self._counts: list = [0] * (len(self._bounds) + 1)
+        self._sum: float = 0.0
+        self._count: int = 0
+        self._lock: Lock = Lock()
+
+    def observe(self, value: float):
+        """Records a value
+        """
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile (0-1) as the upper bound of the bucket it falls in
+        """
+        with self._lock:
+            counts, count = list(self._counts), self._count
+        if count == 0:
+            return 0.0
+        rank = q * count
+        cumulative = 0
+        for index, value in enumerate(counts):
+            cumulative += value
+            if cumulative >= rank:
+                return self._bounds[index] if index < len(self._bounds) else math.inf
+        return math.inf
+
+    def snapshot(self) -> dict:
+        """Summary of the histogram
+        """
+        return {
+            'count': self._count,
+            'sum': self._sum,
+            'mean': self._sum / self._count if self._count else 0.0,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+        }
+
+    def render(self, name: str, labels: str) -> list:
+        """Prometheus text lines for this histogram
+        """
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        lines: list = []
+        cumulative = 0
+        for bound, value in zip(self._bounds + ('+Inf',), counts):
+            cumulative += value
+            le = bound if isinstance(bound, str) else repr(bound)
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {total}')
+        lines.append(f'{name}_count{{{labels}}} {count}')
+        return lines
+
+# --- Registry Definition
+class MetricsRegistry:
+    """Registry of labelled histograms shared by all stages of the command path
+    """
+    def __init__(self):
+        """Constructor
+        """
+        # name -> (help, {labels: Histogram})
+        self._histograms: dict = {}
+        self._lock: Lock = Lock()
+
+    def histogram(self, name: str, help: str = '', **labels) -> Histogram:
+        """Returns (creating if needed) the histogram for a name and set of labels
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._histograms.setdefault(name, (help, {}))[1]
+            if key not in family:
+                family[key] = Histogram()
+            return family[key]
+
+    def snapshot(self) -> dict:
+        """Summary of every histogram keyed by name and label values
+        """
+        with self._lock:
+            families = {name: dict(family) for name, (_, family) in self._histograms.items()}
+        return {
+            name: {','.join(f'{k}={v}' for k, v in key): hist.snapshot() for key, hist in family.items()}
+            for name, family in families.items()
+        }
+
+    def render(self) -> str:
+        """Prometheus text format of every histogram
+        """
+        with self._lock:
+            families = [(name, help, dict(family)) for name, (help, family) in self._histograms.items()]
+        lines: list = []
+        for name, help, family in families:
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} histogram')
+            for key, hist in family.items():
+                lines.extend(hist.render(name, ','.join(f'{k}="{v}"' for k, v in key)))
+        return '\n'.join(lines) + '\n'
+
+def render_stats(stats: dict, name: str = 'gripper_stat') -> str:
+    """Prometheus text format of a nested stats dict (numeric leaves become gauges labelled by path)
+    """
+    lines: list = [f'# HELP {name} Handler, client, scheduler, poller and bus counters', f'# TYPE {name} gauge']
+
+    def _walk(value, path: list):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                _walk(child, path + [str(key)])
+        elif isinstance(value, (bool, int, float)) and value is not None:
+            lines.append(f'{name}{{path="{".".join(path)}"}} {float(value)}')
+
+    _walk(stats, [])
+    return '\n'.join(lines) + '\n'
+
+# The registry used by the command path stages
+registry: MetricsRegistry = MetricsRegistry()
+
+# --- Endpoint Definition
+class MetricsServer:
+    """Local HTTP endpoint serving metrics in the Prometheus text format (GET /metrics)
+    """
+    def __init__(self, render_method: Callable[[], str], host: str = 'localhost', port: int = 9100):
+        """Constructor
+        """
+        self._render_method: Callable[[], str] = render_method
+        self._address: tuple = (host, port)
+        self._server: ThreadingHTTPServer = None
+        self._thread: Thread = None
+
+    def start(self) -> bool:
+        """Starts serving in a background thread
+        """
+        render_method = self._render_method
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = render_method().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes are frequent, do not log each request
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(self._address, _Handler)
+        except OSError as e:
+            log.error(f"Cannot Serve on {self._address} -> {e}")
+            return False
+        self._thread = Thread(target=self._server.serve_forever, daemon=True, name="Thread-Metrics-Server")
+        self._thread.start()
+        log.info(f"Serving on http://{self._address[0]}:{self._address[1]}/metrics")
+        return True
+
+    def stop(self):
+        """Stops serving
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
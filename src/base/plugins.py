@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Any
+import time, logging
+
+log = logging.getLogger(__name__)
+
+# Entry point group of gripper types provided by installed packages
+ENTRY_POINT_GROUP = 'gripper_comms.plugins'
+
+def load_entry_point(target: str) -> Any:
+    """Imports and returns the object named by an entry point ('module:attribute')
+    """
+    module_name, _, attribute = target.partition(':')
+    obj = import_module(module_name)
+    for part in attribute.split('.') if attribute else ():
+        obj = getattr(obj, part)
+    return obj
+
+# --- Registry Definition
+class PluginRegistry:
+    """Maps the type names used in the config (e.g., RobotiqModbusSerialClient) to entry points
+    ('module:attribute'), so only the configured clients, interpreters and interfaces (and
+    their dependencies) are imported. A name that is itself an entry point is loaded as is,
+    unless loading strictly (names that come from an interface rather than the config).
+    The import time of each loaded module is measured and logged.
+    """
+    def __init__(self, entry_points: dict = None):
+        """Constructor
+        """
+        self._entry_points: dict = dict(entry_points or {})
+        self._loaded: dict = {}
+        # Seconds spent importing each module (the first load from a module pays for it)
+        self._import_times: dict = {}
+
+    # -- Public Methods
+    def register(self, name: str, target: str):
+        """Maps a name to an entry point ('module:attribute')
+        """
+        self._entry_points[name] = target
+        self._loaded.pop(name, None)
+
+    def discover(self, group: str = ENTRY_POINT_GROUP):
+        """Registers the entry points installed packages provide for the group (nothing is imported)
+        """
+        for entry_point in entry_points(group=group):
+            self._entry_points.setdefault(entry_point.name, entry_point.value)
+
+    def load(self, name: str, strict: bool = False) -> Any:
+        """Returns the object for a name, importing its module on first use. Strictly, only
+        registered names are loaded (never a raw entry point, so nothing else can be imported).
+        Raises ValueError for an unknown name
+        """
+        registered = name in self._entry_points
+        if strict and not registered:
+            raise ValueError(f"unknown plugin '{name}' (registered: {', '.join(sorted(self._entry_points))})")
+        if name in self._loaded:
+            return self._loaded[name]
+        target = self._entry_points[name] if registered else (name if ':' in name else None)
+        if target is None:
+            raise ValueError(f"unknown plugin '{name}' (registered: {', '.join(sorted(self._entry_points))})")
+
+        module_name = target.partition(':')[0]
+        start = time.perf_counter()
+        obj = load_entry_point(target)
+        elapsed = time.perf_counter() - start
+        if module_name not in self._import_times:
+            self._import_times[module_name] = elapsed
+            log.info(f"Loaded {name} from {module_name} in {elapsed * 1000.0:.1f} ms")
+        self._loaded[name] = obj
+        return obj
+
+    # -- Properties
+    @property
+    def names(self) -> list:
+        return sorted(self._entry_points)
+
+    @property
+    def stats(self) -> dict:
+        """Loaded plugins and the import time (seconds) of their modules
+        """
+        return {
+            'loaded': len(self._loaded),
+            'import_seconds': dict(self._import_times),
+            'import_total': sum(self._import_times.values()),
+        }
@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.client import Client
+from base.status import StatusCache
+from base.metrics import registry, Histogram
+from base.lanes import PRIORITY_MOTION, LANES
+from base.telemetry import TelemetryChannel
+from queue import Queue, Empty
+import asyncio, time
+
+class CommandScheduler:
+    """Dispatches interface commands to a client with latest-wins coalescing.
+    All pending interface data is drained at once; consecutive commands are applied to
+    the interpreter in order but only the newest resulting target is written. Commands
+    flagged as barriers by the interpreter (e.g., reset/activate) are always sent in order.
+    Each write also returns the client status, which is published to the cache if given.
+    Urgent outputs (safety and mode priority classes, see base.lanes) skip the write rate limit.
+    Stage latencies (queue wait, encode, transaction and end-to-end, also per priority lane)
+    are recorded in the metrics registry, labelled by the scheduler name. Each output sent is
+    recorded if a telemetry channel is given.
+    """
+    def __init__(
+            self,
+            client: Client,
+            rate: float = 50.0,
+            cache: StatusCache = None,
+            name: str = 'default',
+            recorder: TelemetryChannel = None
+        ):
+        """Constructor
+        """
+        self._client: Client = client
+        self._cache: StatusCache = cache
+        self._recorder: TelemetryChannel = recorder
+        # Stage latency histograms
+        self._queue_wait: Histogram = registry.histogram(
+            'gripper_queue_wait_seconds', 'Time from websocket receipt to dispatch by the worker', gripper=name)
+        self._encode: Histogram = registry.histogram(
+            'gripper_encode_seconds', 'Time to generate the output for a command', gripper=name)
+        self._transaction: Histogram = registry.histogram(
+            'gripper_transaction_seconds', 'Time of a Modbus write and status read', gripper=name)
+        self._end_to_end: Histogram = registry.histogram(
+            'gripper_end_to_end_seconds', 'Time from websocket receipt to the write completing', gripper=name)
+        self._lanes: tuple = tuple(registry.histogram(
+            'gripper_lane_latency_seconds', 'Time from websocket receipt to the write completing per priority lane',
+            gripper=name, lane=lane) for lane in LANES)
+        # Minimum period between writes as set by the configured rate (0 is unbounded)
+        self._period: float = 1.0 / rate if rate is not None and rate > 0 else 0.0
+        # Smoothed bus round-trip time of a send (seconds)
+        self._rtt: float = 0.0
+        self._last_send: float = 0.0
+        # Start (time.monotonic) of the most recent send
+        self._last_dispatch: float = 0.0
+        # Counters
+        self._received: int = 0
+        self._coalesced: int = 0
+        self._sent: int = 0
+        self._failed: int = 0
+        self._depth: int = 0
+        self._max_depth: int = 0
+
+    # -- Private Methods
+    def _interval(self) -> float:
+        """The minimum interval between writes, bounded by the measured bus round-trip time
+        """
+        return max(self._period, self._rtt)
+
+    def _wait_slot(self, input_q=None):
+        """Sleeps until the next write slot is available (woken early by an urgent item
+        arriving on a lane queue, if given)
+        """
+        remaining = self._last_send + self._interval() - time.perf_counter()
+        if remaining <= 0:
+            return
+        if getattr(input_q, 'wait_urgent', None) is not None:
+            input_q.wait_urgent(remaining)
+        else:
+            time.sleep(remaining)
+
+    def _record(self, start: float, status, stamps: list = (), priority: int = PRIORITY_MOTION) -> bool:
+        """Records the result of a send that started at the given time.
+        Stamps are the receipt times (time.monotonic) of the commands served by the send
+        """
+        self._last_send = time.perf_counter()
+        self._transaction.observe(self._last_send - start)
+        result: bool = bool(status)
+        if result:
+            now = time.monotonic()
+            for stamp in stamps:
+                self._end_to_end.observe(now - stamp)
+                self._lanes[priority].observe(now - stamp)
+        if result and self._cache is not None:
+            self._cache.publish(self._client.get_interpreter().interpret_input(status), raw=status)
+        # Exponentially weighted round-trip time (only successful transactions)
+        if result:
+            rtt = self._last_send - start
+            self._rtt = rtt if self._rtt == 0.0 else 0.8 * self._rtt + 0.2 * rtt
+            self._sent += 1
+        else:
+            self._failed += 1
+        return result
+
+    def _generate(self, interpreter, command):
+        """Generates the output for a command, recording the encode time
+        """
+        start = time.perf_counter()
+        output = interpreter.generate_output(command)
+        self._encode.observe(time.perf_counter() - start)
+        return output
+
+    def _plan(self, commands: list, stamps: list = None, priorities: list = None):
+        """Coalesces a list of commands into the outputs that need to be sent (in order).
+        Yields (output, stamps, priority) where stamps are those of the commands each output
+        serves and priority is the most urgent class among them. Each output is yielded before
+        the next is generated, so it is sent before an interpreter reusing its output buffer
+        overwrites it
+        """
+        interpreter = self._client.get_interpreter()
+        stamps = stamps if stamps is not None else [None] * len(commands)
+        priorities = priorities if priorities is not None else [interpreter.priority(command) for command in commands]
+        pending = None
+        served: list = []
+        urgency: int = PRIORITY_MOTION
+        for command, stamp, priority in zip(commands, stamps, priorities):
+            self._received += 1
+            if interpreter.is_barrier(command):
+                # Flush anything superseded so far, then send the barrier on its own
+                if pending is not None:
+                    yield pending, served, urgency
+                    pending, served, urgency = None, [], PRIORITY_MOTION
+                yield self._generate(interpreter, command), [stamp] if stamp is not None else [], priority
+            else:
+                if pending is not None:
+                    self._coalesced += 1
+                pending = self._generate(interpreter, command)
+                urgency = min(urgency, priority)
+                if stamp is not None:
+                    served.append(stamp)
+
+        if pending is not None:
+            yield pending, served, urgency
+
+    def _send(self, output, stamps: list = (), priority: int = PRIORITY_MOTION) -> bool:
+        """Sends a generated output to the client at the scheduled rate (urgent outputs go at once).
+        The write and status read share a single bus transaction where the client supports it
+        """
+        if priority >= PRIORITY_MOTION:
+            self._wait_slot()
+        return self.write(output, stamps, priority)
+
+    def _urgent(self, input_q, item) -> bool:
+        """True if the item (or anything pending) on a lane queue is urgent
+        """
+        is_urgent = getattr(input_q, 'is_urgent', None)
+        return is_urgent is not None and (is_urgent(item) or input_q.urgent())
+
+    def _observe_queue_wait(self, batch: list):
+        """Records the queue wait of drained interface data and stamps it as drained
+        """
+        now = time.monotonic()
+        for data in batch:
+            if isinstance(data, dict) and 'stamps' in data:
+                data['stamps']['drained'] = now
+                self._queue_wait.observe(now - data['stamps']['received'])
+
+    # -- Public Methods
+    def set_rate(self, rate: float):
+        """Sets the maximum write rate (Hz, 0 is unbounded) in place
+        """
+        self._period = 1.0 / rate if rate is not None and rate > 0 else 0.0
+
+    def write(self, output, stamps: list = (), priority: int = PRIORITY_MOTION) -> bool:
+        """Sends a generated output at once, outside of coalescing and the write rate (e.g., from
+        a control loop keeping its own period). The status read with it is published as for any send
+        """
+        if self._recorder is not None:
+            self._recorder.command(output)
+        self._last_dispatch = time.monotonic()
+        start = time.perf_counter()
+        return self._record(start, self._client.send_and_get_status(output, priority=priority), stamps, priority)
+
+    def drain(self, input_q: Queue, timeout: float = None) -> list:
+        """Blocks for the next interface data then drains everything else pending.
+        Waiting for the next write slot happens before draining so that commands
+        arriving in the meantime are coalesced into this batch (skipped for urgent
+        data). Returns an empty batch if nothing arrives within the timeout (None
+        waits indefinitely)
+        """
+        try:
+            batch: list = [input_q.get(block=True, timeout=timeout)]
+        except Empty:
+            return []
+        if not self._urgent(input_q, batch[0]):
+            self._wait_slot(input_q)
+        self._depth = input_q.qsize() + 1
+        self._max_depth = max(self._max_depth, self._depth)
+        while True:
+            try:
+                batch.append(input_q.get_nowait())
+            except Empty:
+                break
+        self._observe_queue_wait(batch)
+        return batch
+
+    def dispatch(self, commands: list, stamps: list = None, priorities: list = None) -> bool:
+        """Coalesces a list of commands and sends the result to the client.
+        Stamps (optional) are the receipt times of each command, for end-to-end latency.
+        Priorities (optional) are the class of each command (the interpreter's by default)
+        """
+        result: bool = True
+        for output, served, priority in self._plan(commands, stamps, priorities):
+            result &= self._send(output, served, priority)
+        return result
+
+    # -- Properties
+    @property
+    def last_dispatch(self) -> float:
+        """Start (time.monotonic) of the most recent send
+        """
+        return self._last_dispatch
+
+    @property
+    def stats(self) -> dict:
+        """Scheduler counters
+        """
+        return {
+            'queue_depth': self._depth,
+            'max_queue_depth': self._max_depth,
+            'received': self._received,
+            'coalesced': self._coalesced,
+            'sent': self._sent,
+            'failed': self._failed,
+            'rtt': self._rtt,
+            'interval': self._interval(),
+            'lanes': {lane: histogram.snapshot() for lane, histogram in zip(LANES, self._lanes)},
+        }
+
+class AsyncCommandScheduler(CommandScheduler):
+    """Asyncio variant of the CommandScheduler for use with an AsyncClient.
+    Drains an asyncio.Queue and awaits the client instead of blocking a thread
+    """
+    # -- Private Methods
+    async def _wait_slot(self, input_q=None):
+        """Sleeps (without blocking the event loop) until the next write slot is available,
+        or until an urgent item arrives on a lane queue (if given)
+        """
+        remaining = self._last_send + self._interval() - time.perf_counter()
+        if remaining <= 0:
+            return
+        if getattr(input_q, 'wait_urgent', None) is not None:
+            await input_q.wait_urgent(remaining)
+        else:
+            await asyncio.sleep(remaining)
+
+    async def _send(self, output, stamps: list = (), priority: int = PRIORITY_MOTION) -> bool:
+        """Sends a generated output to the client at the scheduled rate (urgent outputs go at once)
+        """
+        if priority >= PRIORITY_MOTION:
+            await self._wait_slot()
+        return await self.write(output, stamps, priority)
+
+    # -- Public Methods
+    async def write(self, output, stamps: list = (), priority: int = PRIORITY_MOTION) -> bool:
+        """Sends a generated output at once, outside of coalescing and the write rate
+        """
+        if self._recorder is not None:
+            self._recorder.command(output)
+        self._last_dispatch = time.monotonic()
+        start = time.perf_counter()
+        return self._record(start, await self._client.send_and_get_status(output, priority=priority), stamps, priority)
+
+    async def drain(self, input_q: asyncio.Queue, timeout: float = None) -> list:
+        """Waits for the next interface data then drains everything else pending
+        (an empty batch if nothing arrives within the timeout)
+        """
+        try:
+            batch: list = [await asyncio.wait_for(input_q.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        if not self._urgent(input_q, batch[0]):
+            await self._wait_slot(input_q)
+        self._depth = input_q.qsize() + 1
+        self._max_depth = max(self._max_depth, self._depth)
+        while True:
+            try:
+                batch.append(input_q.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        self._observe_queue_wait(batch)
+        return batch
+
+    async def dispatch(self, commands: list, stamps: list = None, priorities: list = None) -> bool:
+        """Coalesces a list of commands and sends the result to the client
+        """
+        result: bool = True
+        for output, served, priority in self._plan(commands, stamps, priorities):
+            result &= await self._send(output, served, priority)
+        return result
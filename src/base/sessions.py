@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from typing import Callable
+import time, uuid, logging
+
+log = logging.getLogger(__name__)
+
+# Arbitration policies: one session holds control until it unlocks or disconnects, or the
+# session that wrote last has control (any controller may take over at any time)
+POLICY_EXCLUSIVE = 'exclusive'
+POLICY_LAST_WRITER = 'last_writer'
+POLICIES: tuple = (POLICY_EXCLUSIVE, POLICY_LAST_WRITER)
+# Session roles (observers may query and subscribe but not command)
+ROLE_CONTROLLER = 'controller'
+ROLE_OBSERVER = 'observer'
+ROLES: tuple = (ROLE_CONTROLLER, ROLE_OBSERVER)
+
+# --- Session Definition
+class Session:
+    """A connected interface client. Messages are rate limited by a token bucket refilled
+    at the manager's rate up to its burst
+    """
+    def __init__(self, role: str = ROLE_CONTROLLER, remote: str = None, burst: int = 20):
+        """Constructor
+        """
+        self.id: str = uuid.uuid4().hex[:8]
+        self.role: str = role
+        self.remote: str = remote
+        # Sends a JSON serialisable event to the client (set by the interface)
+        self.reply: Callable[[dict], None] = None
+        self._opened: float = time.monotonic()
+        self._tokens: float = float(burst)
+        self._stamp: float = self._opened
+        # Set while messages are being dropped (the client is told once per episode)
+        self._throttled: bool = False
+        # Counters
+        self.received: int = 0
+        self.accepted: int = 0
+        self.throttled: int = 0
+        self.denied: int = 0
+
+    # -- Public Methods
+    def take(self, rate: float, burst: int) -> bool:
+        """Takes a token for a message. False if the session is over its rate (0 is unlimited)
+        """
+        if rate <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(float(burst), self._tokens + (now - self._stamp) * rate)
+        self._stamp = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def notify(self, event: str, **fields):
+        """Sends a session event to the client (if it can be replied to)
+        """
+        if self.reply is not None:
+            self.reply({'type': 'session', 'id': self.id, 'event': event, **fields})
+
+    # -- Properties
+    @property
+    def info(self) -> dict:
+        return {
+            'id': self.id,
+            'role': self.role,
+            'remote': self.remote,
+            'age': time.monotonic() - self._opened,
+            'received': self.received,
+            'accepted': self.accepted,
+            'throttled': self.throttled,
+            'denied': self.denied,
+        }
+
+# --- Manager Definition
+class SessionManager:
+    """Tracks the sessions of an interface and arbitrates which may command each gripper
+    (by the gripper id the interface data is addressed to, as resolved by the resolve method,
+    so an unaddressed command and one naming the default gripper contend for the same lock).
+    Under the exclusive policy a controller takes a gripper's lock explicitly (lock/unlock) or
+    with its first command while the lock is free, and commands to it from other sessions are
+    denied until it is released (or its session closes). Under the last writer policy every
+    controller's commands are accepted, and the session that was in control is told it was
+    superseded. Observers are never allowed to command. Each session's messages are rate
+    limited, except stops, which are always passed on from a controller. Used on the
+    interface's event loop
+    """
+    def __init__(
+            self,
+            policy: str = POLICY_LAST_WRITER,
+            max_sessions: int = 16,
+            rate: float = 100.0,
+            burst: int = 20,
+            resolve: Callable[[str], str] = None
+        ):
+        """Constructor (rate is the messages per second allowed per session, 0 is unlimited, and
+        resolve maps an addressed gripper id, or None, to the id of the gripper it reaches)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"unknown arbitration policy -> {policy}")
+        self._policy: str = policy
+        self._max_sessions: int = max_sessions
+        self._rate: float = rate
+        self._burst: int = max(1, burst)
+        self._sessions: dict = {}
+        # The session in control of each gripper (lock holder or last writer)
+        self._holders: dict = {}
+        self._resolve: Callable[[str], str] = resolve
+        # Counters
+        self._opened: int = 0
+        self._refused: int = 0
+        self._takeovers: int = 0
+
+    # -- Private Methods
+    def _key(self, gripper: str) -> str:
+        """The gripper a command addressed to an id (None for unaddressed) is arbitrated by
+        """
+        return self._resolve(gripper) if self._resolve is not None else gripper
+
+    def _deny(self, session: Session, reason: str, **fields) -> bool:
+        session.denied += 1
+        session.notify('denied', reason=reason, **fields)
+        return False
+
+    def _throttle(self, session: Session) -> bool:
+        """Takes a token for a session's message, telling the client when it starts being throttled
+        """
+        if session.take(self._rate, self._burst):
+            session._throttled = False
+            return True
+        session.throttled += 1
+        if not session._throttled:
+            session._throttled = True
+            log.warning(f"Session {session.id} ({session.remote}) Throttled at {self._rate} Messages/s")
+            session.notify('throttled', rate=self._rate)
+        return False
+
+    # -- Public Methods
+    def open(self, remote: str = None, role: str = ROLE_CONTROLLER) -> Session:
+        """Opens a session for a new connection. Returns None if the session limit is reached.
+        Raises ValueError for an unknown role
+        """
+        if role not in ROLES:
+            raise ValueError(f"unknown session role -> {role}")
+        if self._max_sessions > 0 and len(self._sessions) >= self._max_sessions:
+            self._refused += 1
+            log.warning(f"Refused Session from {remote} ({len(self._sessions)} open)")
+            return None
+        session = Session(role=role, remote=remote, burst=self._burst)
+        self._sessions[session.id] = session
+        self._opened += 1
+        log.info(f"Session {session.id} Opened from {remote} as {role}")
+        return session
+
+    def close(self, session: Session):
+        """Closes a session, releasing control if it held it
+        """
+        if self._sessions.pop(session.id, None) is None:
+            return
+        for gripper in [gripper for gripper, holder in self._holders.items() if holder is session]:
+            del self._holders[gripper]
+        log.info(f"Session {session.id} Closed ({session.accepted} accepted, {session.throttled} throttled, {session.denied} denied)")
+
+    def allow(self, session: Session) -> bool:
+        """True if a query (e.g., stats or subscribe) from the session is within its rate
+        """
+        session.received += 1
+        return self._throttle(session)
+
+    def admit(self, session: Session, data: dict) -> bool:
+        """True if the session may send the interface data to the grippers
+        """
+        session.received += 1
+        if session.role != ROLE_CONTROLLER:
+            return self._deny(session, 'observer')
+        if 'stop' in data:
+            session.accepted += 1
+            return True
+        if not self._throttle(session):
+            return False
+        gripper = self._key(data.get('gripper'))
+        holder = self._holders.get(gripper)
+        if holder is not None and holder is not session:
+            if self._policy == POLICY_EXCLUSIVE:
+                return self._deny(session, 'locked', gripper=gripper, holder=holder.id)
+            self._takeovers += 1
+            holder.notify('superseded', gripper=gripper, by=session.id)
+        if holder is None and self._policy == POLICY_EXCLUSIVE:
+            session.notify('locked', gripper=gripper)
+        self._holders[gripper] = session
+        session.accepted += 1
+        return True
+
+    def lock(self, session: Session, gripper: str = None) -> bool:
+        """Takes control of a gripper for a session (exclusive policy). True if it holds the lock
+        """
+        if session.role != ROLE_CONTROLLER:
+            return self._deny(session, 'observer')
+        if self._policy != POLICY_EXCLUSIVE:
+            return self._deny(session, 'policy', policy=self._policy)
+        gripper = self._key(gripper)
+        holder = self._holders.get(gripper)
+        if holder is not None and holder is not session:
+            return self._deny(session, 'locked', gripper=gripper, holder=holder.id)
+        self._holders[gripper] = session
+        session.notify('locked', gripper=gripper)
+        return True
+
+    def unlock(self, session: Session, gripper: str = None) -> bool:
+        """Releases control of a gripper held by a session. True if it was held
+        """
+        gripper = self._key(gripper)
+        if self._holders.get(gripper) is not session:
+            return self._deny(session, 'not_holder', gripper=gripper)
+        del self._holders[gripper]
+        session.notify('unlocked', gripper=gripper)
+        return True
+
+    # -- Properties
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def holders(self) -> dict:
+        """The id of the session in control of each gripper (keyed 'default' for the default gripper)
+        """
+        return {gripper or 'default': holder.id for gripper, holder in self._holders.items()}
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'policy': self._policy,
+            'holders': self.holders,
+            'open': len(self._sessions),
+            'opened': self._opened,
+            'refused': self._refused,
+            'takeovers': self._takeovers,
+            'sessions': [session.info for session in self._sessions.values()],
+        }
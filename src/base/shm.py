@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+import struct, time
+
+# Sequence counter heading each slot (odd while a write is in progress)
+_SEQ: struct.Struct = struct.Struct('<I')
+
+# --- Slot Definition
+class SeqlockSlot:
+    """Latest-value slot in a shared memory buffer (e.g., a multiprocessing RawArray) with one
+    writer and any number of readers, in any process. Values are packed with a struct format
+    behind a sequence counter: the writer makes it odd, packs the values, then makes it even, and
+    a reader retries if the counter was odd or changed while it unpacked (so reads never tear
+    and never block the writer)
+    """
+    def __init__(self, buffer, fmt: str, offset: int = 0):
+        """Constructor
+        """
+        self._buffer: memoryview = memoryview(buffer).cast('B')
+        self._struct: struct.Struct = struct.Struct('<' + fmt)
+        self._offset: int = offset
+        # Reads repeated because they overlapped a write
+        self.retries: int = 0
+
+    @staticmethod
+    def size(fmt: str) -> int:
+        """Bytes taken by a slot of the struct format (including its sequence counter)
+        """
+        return _SEQ.size + struct.calcsize('<' + fmt)
+
+    def write(self, *values):
+        """Publishes the values (single writer only)
+        """
+        seq = _SEQ.unpack_from(self._buffer, self._offset)[0]
+        _SEQ.pack_into(self._buffer, self._offset, (seq + 1) & 0xFFFFFFFF)
+        self._struct.pack_into(self._buffer, self._offset + _SEQ.size, *values)
+        _SEQ.pack_into(self._buffer, self._offset, (seq + 2) & 0xFFFFFFFF)
+
+    def read(self) -> tuple:
+        """Returns the latest values published (all zero before the first write)
+        """
+        while True:
+            seq = _SEQ.unpack_from(self._buffer, self._offset)[0]
+            if not seq & 1:
+                values = self._struct.unpack_from(self._buffer, self._offset + _SEQ.size)
+                if _SEQ.unpack_from(self._buffer, self._offset)[0] == seq:
+                    return values
+            self.retries += 1
+            # The writer may have been descheduled mid-write
+            time.sleep(0)
+
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.client import Client
+from base.telemetry import TelemetryChannel
+from dataclasses import dataclass, field
+from threading import Thread, Event, Lock, Condition
+from typing import Any, Callable
+import asyncio, time, logging
+
+log = logging.getLogger(__name__)
+
+# -- Snapshot Definition
+@dataclass(frozen=True)
+class StatusSnapshot():
+    seq: int = 0
+    # Monotonic timestamp (for ages/deadlines) and wall clock timestamp (for logs)
+    stamp: float = field(default_factory=time.monotonic)
+    wall: float = field(default_factory=time.time)
+    status: Any = None
+
+    def age(self) -> float:
+        """Seconds since this snapshot was taken
+        """
+        return time.monotonic() - self.stamp
+
+# --- Cache Definition
+class StatusCache:
+    """Latest-value cache of decoded client status.
+    Readers never block or touch the bus: they read the current snapshot reference, which
+    is replaced (not mutated) on every publish. The raw status is recorded if a telemetry
+    channel is given.
+    """
+    def __init__(self, recorder: TelemetryChannel = None):
+        """Constructor
+        """
+        self._snapshot: StatusSnapshot = None
+        self._recorder: TelemetryChannel = recorder
+        # Serialises writers only (the scheduler and poller may both publish)
+        self._lock: Lock = Lock()
+        self._updated: Condition = Condition()
+
+    def publish(self, status, raw: list = None) -> StatusSnapshot:
+        """Publishes a new decoded status as the latest snapshot (raw is the status as read)
+        """
+        if raw is not None and self._recorder is not None:
+            self._recorder.status(raw)
+        with self._lock:
+            seq = self._snapshot.seq + 1 if self._snapshot is not None else 1
+            snapshot = StatusSnapshot(seq=seq, status=status)
+            self._snapshot = snapshot
+        with self._updated:
+            self._updated.notify_all()
+        return snapshot
+
+    def latest(self) -> StatusSnapshot:
+        """Returns the latest snapshot (None if nothing has been published)
+        """
+        return self._snapshot
+
+    def wait(self, after_seq: int = 0, timeout: float = None) -> StatusSnapshot:
+        """Blocks until a snapshot newer than after_seq is published or the timeout expires
+        """
+        with self._updated:
+            self._updated.wait_for(
+                lambda: self._snapshot is not None and self._snapshot.seq > after_seq,
+                timeout=timeout
+            )
+        return self._snapshot
+
+    def wait_until(self, condition: Callable[[Any], bool], timeout: float = None) -> StatusSnapshot:
+        """Blocks until a published status satisfies the condition or the timeout expires
+        (does not access the client). Returns the latest snapshot either way
+        """
+        with self._updated:
+            self._updated.wait_for(
+                lambda: self._snapshot is not None and condition(self._snapshot.status),
+                timeout=timeout
+            )
+        return self._snapshot
+
+# --- Poller Definition
+class StatusPoller:
+    """Background status poller publishing into a StatusCache.
+    Polls at the active rate while the interpreter reports the client in motion and
+    at the (slower) idle rate otherwise. A poll is skipped when the cache was already
+    refreshed within the period (e.g., by a combined command write and status read).
+    """
+    def __init__(
+            self,
+            client: Client,
+            cache: StatusCache,
+            rate: float = 20.0,
+            idle_rate: float = 2.0
+        ):
+        """Constructor
+        """
+        self._client: Client = client
+        self._cache: StatusCache = cache
+        self._active_period: float = 1.0 / rate
+        self._idle_period: float = 1.0 / idle_rate
+        self._running: bool = False
+        self._wake: Event = Event()
+        self._thread: Thread = None
+        # Counters
+        self._polls: int = 0
+        self._errors: int = 0
+        self._skipped: int = 0
+
+    # -- Private Methods
+    def _period(self) -> float:
+        """The period until the next poll based on the latest snapshot
+        """
+        snapshot = self._cache.latest()
+        if snapshot is not None and self._client.get_interpreter().is_moving(snapshot.status):
+            return self._active_period
+        return self._idle_period
+
+    def _run(self):
+        """Thread method polling the client status
+        """
+        log.info("Status Poller Running")
+        while self._running:
+            start = time.monotonic()
+            snapshot = self._cache.latest()
+            fresh = snapshot is not None and snapshot.age() < self._period()
+            if self._client._connected and not fresh:
+                self.poll()
+            else:
+                self._skipped += 1
+
+            # Sleep for the remainder of the period (or until woken)
+            remaining = self._period() - (time.monotonic() - start)
+            if remaining > 0:
+                self._wake.wait(remaining)
+            self._wake.clear()
+        log.info("Status Poller Stopped")
+
+    # -- Public Methods
+    def set_rates(self, rate: float, idle_rate: float):
+        """Sets the active and idle polling rates (Hz) in place (from the next poll)
+        """
+        self._active_period = 1.0 / rate
+        self._idle_period = 1.0 / idle_rate
+
+    def poll(self) -> StatusSnapshot:
+        """Reads and publishes the client status once
+        """
+        raw = self._client.get_status()
+        if not raw:
+            self._errors += 1
+            return None
+        self._polls += 1
+        return self._cache.publish(self._client.get_interpreter().interpret_input(raw), raw=raw)
+
+    def wake(self):
+        """Wakes the poller to re-evaluate its period immediately (e.g., after a command has been sent)
+        """
+        self._wake.set()
+
+    def start(self):
+        """Starts the poller thread
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = Thread(target=self._run, daemon=True, name="Thread-Status-Poller")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stops the poller thread
+        """
+        self._running = False
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    # -- Properties
+    @property
+    def stats(self) -> dict:
+        """Poller counters
+        """
+        return {
+            'polls': self._polls,
+            'errors': self._errors,
+            'skipped': self._skipped,
+            'period': self._period(),
+        }
+
+class AsyncStatusPoller(StatusPoller):
+    """Asyncio variant of the StatusPoller for use with an AsyncClient.
+    Runs as a task on the owning event loop instead of a thread
+    """
+    def __init__(
+            self,
+            client,
+            cache: StatusCache,
+            rate: float = 20.0,
+            idle_rate: float = 2.0
+        ):
+        """Constructor
+        """
+        super().__init__(client=client, cache=cache, rate=rate, idle_rate=idle_rate)
+        self._wake: asyncio.Event = asyncio.Event()
+        self._task: asyncio.Task = None
+
+    # -- Private Methods
+    async def _run(self):
+        """Task method polling the client status
+        """
+        log.info("Async Status Poller Running")
+        while self._running:
+            start = time.monotonic()
+            snapshot = self._cache.latest()
+            fresh = snapshot is not None and snapshot.age() < self._period()
+            if self._client._connected and not fresh:
+                await self.poll()
+            else:
+                self._skipped += 1
+
+            # Sleep for the remainder of the period (or until woken)
+            remaining = self._period() - (time.monotonic() - start)
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+        log.info("Async Status Poller Stopped")
+
+    # -- Public Methods
+    async def poll(self) -> StatusSnapshot:
+        """Reads and publishes the client status once
+        """
+        raw = await self._client.get_status()
+        if not raw:
+            self._errors += 1
+            return None
+        self._polls += 1
+        return self._cache.publish(self._client.get_interpreter().interpret_input(raw), raw=raw)
+
+    def start(self):
+        """Starts the poller task on the running event loop
+        """
+        if self._task is not None and not self._task.done():
+            return
+        self._running = True
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="Task-Status-Poller")
+
+    def stop(self, timeout: float = 1.0):
+        """Stops the poller task
+        """
+        self._running = False
+        self._wake.set()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.client import Client
+from base.status import StatusCache
+from threading import Thread, Event
+from typing import Callable
+import asyncio, random, time, logging
+
+log = logging.getLogger(__name__)
+
+# Outage policies for commands arriving while the link is down: hold them (latest wins) until the
+# link is restored or the hold timeout expires, or reject them at once
+POLICY_HOLD = 'hold'
+POLICY_REJECT = 'reject'
+
+# --- Supervisor Definition
+class ConnectionSupervisor:
+    """Monitors the link to a client and restores it in the background.
+    A heartbeat status read is made whenever the cached status is older than the heartbeat
+    period (so it costs nothing while the poller or dispatch keep the cache fresh). The link
+    is declared down when the client disconnects or after consecutive failed heartbeats, and
+    reconnection is retried with exponential backoff and jitter. The gripper is only set up
+    again (reset and activated) if its status shows activation was lost (see the interpreter's
+    is_activation_lost), whether after an outage or a power cycle too quick to drop the link.
+    The setup is run by the setup method, if given, so the owner can serialise it with its own
+    bus traffic (e.g., run it on its dispatch thread), otherwise by the client directly.
+    """
+    def __init__(
+            self,
+            client: Client,
+            cache: StatusCache,
+            name: str = 'default',
+            heartbeat: float = 1.0,
+            failures: int = 2,
+            backoff: float = 0.5,
+            backoff_max: float = 10.0,
+            setup: Callable[[], bool] = None
+        ):
+        """Constructor (setup, if given, sets the client up again and returns its result)
+        """
+        self._client: Client = client
+        self._cache: StatusCache = cache
+        self._name: str = name
+        self._setup_method: Callable[[], bool] = setup
+        self.configure(heartbeat=heartbeat, failures=failures, backoff=backoff, backoff_max=backoff_max)
+        # Set while the link is up
+        self._up: Event = Event()
+        self._stop: Event = Event()
+        self._thread: Thread = None
+        # Consecutive failures (heartbeats while up, reconnect attempts while down)
+        self._missed: int = 0
+        self._attempt: int = 0
+        # Consecutive checks showing lost activation
+        self._suspect: int = 0
+        self._down_since: float = None
+        # Counters
+        self._heartbeats: int = 0
+        self._heartbeat_failures: int = 0
+        self._outages: int = 0
+        self._reconnects: int = 0
+        self._reactivations: int = 0
+        self._attempts: int = 0
+        self._downtime: float = 0.0
+
+    # -- Private Methods
+    def _stale(self) -> bool:
+        """True if the cached status is older than the heartbeat period
+        """
+        snapshot = self._cache.latest()
+        return snapshot is None or snapshot.age() >= self._heartbeat
+
+    def _delay(self) -> float:
+        """The backoff before the next reconnect attempt (exponential with equal jitter)
+        """
+        delay = min(self._backoff_max, self._backoff * (2 ** self._attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _publish(self, raw) -> bool:
+        """Publishes a raw status read to the cache (True if the read succeeded)
+        """
+        if not raw:
+            return False
+        self._cache.publish(self._client.get_interpreter().interpret_input(raw), raw=raw)
+        return True
+
+    def _beat(self, ok: bool):
+        """Records the result of a heartbeat read
+        """
+        self._heartbeats += 1
+        if ok:
+            self._missed = 0
+            return
+        self._heartbeat_failures += 1
+        self._missed += 1
+
+    def _activation_lost(self) -> bool:
+        """True once the cached status has shown lost activation on two consecutive checks
+        (a status read between an activation being generated and written is not a loss)
+        """
+        snapshot = self._cache.latest()
+        lost = snapshot is not None and self._client.get_interpreter().is_activation_lost(snapshot.status)
+        self._suspect = self._suspect + 1 if lost else 0
+        return self._suspect >= 2
+
+    def _link_lost(self) -> bool:
+        return not self._client._connected or self._missed >= self._failures
+
+    def _setup(self) -> bool:
+        """Sets the client up again (through the setup method if given)
+        """
+        if self._setup_method is not None:
+            return bool(self._setup_method())
+        return bool(self._client.setup())
+
+    def _mark_down(self):
+        log.warning(f"{self._name} Link Down (reconnecting in the background)")
+        self._up.clear()
+        self._outages += 1
+        self._attempt = 0
+        self._down_since = time.monotonic()
+
+    def _mark_up(self, reactivated: bool):
+        log.info(f"{self._name} Link Restored{' (re-activated)' if reactivated else ''}")
+        self._missed = 0
+        self._attempt = 0
+        self._reconnects += 1
+        self._reactivations += int(reactivated)
+        if self._down_since is not None:
+            self._downtime += time.monotonic() - self._down_since
+            self._down_since = None
+        self._up.set()
+
+    def _recover(self) -> tuple:
+        """One reconnect attempt. Returns (restored, reactivated)
+        """
+        self._attempts += 1
+        if self._client._connected:
+            self._client.disconnect()
+        if not self._client.connect():
+            return False, False
+        raw = self._client.get_status()
+        if not self._publish(raw):
+            return False, False
+        if not self._client.get_interpreter().is_activation_lost(self._cache.latest().status):
+            return True, False
+        log.warning(f"{self._name} Lost Activation. Setting Up Again")
+        return self._setup(), True
+
+    def _reactivate(self):
+        """Sets the client up again while the link is up (commands are held meanwhile)
+        """
+        log.warning(f"{self._name} Lost Activation. Setting Up Again")
+        self._up.clear()
+        self._suspect = 0
+        self._reactivations += 1
+        self._setup()
+        self._up.set()
+
+    def _run(self):
+        """Thread method supervising the link
+        """
+        log.info(f"{self._name} Supervisor Running")
+        while not self._stop.is_set():
+            if self._up.is_set():
+                if self._stale():
+                    self._beat(self._publish(self._client.get_status()))
+                if self._link_lost():
+                    self._mark_down()
+                    continue
+                if self._activation_lost():
+                    self._reactivate()
+                self._stop.wait(self._heartbeat)
+            else:
+                restored, reactivated = self._recover()
+                if restored:
+                    self._mark_up(reactivated)
+                    continue
+                delay = self._delay()
+                self._attempt += 1
+                log.info(f"{self._name} Reconnect Attempt {self._attempt} Failed. Retrying in {delay:.2f}s")
+                self._stop.wait(delay)
+        log.info(f"{self._name} Supervisor Stopped")
+
+    # -- Public Methods
+    def configure(self, heartbeat: float = 1.0, failures: int = 2, backoff: float = 0.5, backoff_max: float = 10.0):
+        """Sets the heartbeat, failure and backoff options (applied in place while running)
+        """
+        self._heartbeat: float = heartbeat
+        self._failures: int = max(1, failures)
+        self._backoff: float = backoff
+        self._backoff_max: float = backoff_max
+
+    def start(self):
+        """Starts the supervisor thread (the link is assumed up if the client is connected)
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self._client._connected:
+            self._up.set()
+        else:
+            self._mark_down()
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True, name=f"Thread-Supervisor-{self._name}")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def wait_until_up(self, timeout: float = None) -> bool:
+        """Blocks until the link is up or the timeout expires
+        """
+        return self._up.wait(timeout)
+
+    # -- Properties
+    @property
+    def up(self) -> bool:
+        """True while the link is up (also False once the client has marked itself disconnected)
+        """
+        return self._up.is_set() and self._client._connected
+
+    @property
+    def stats(self) -> dict:
+        downtime = self._downtime
+        if self._down_since is not None:
+            downtime += time.monotonic() - self._down_since
+        return {
+            'up': self.up,
+            'heartbeats': self._heartbeats,
+            'heartbeat_failures': self._heartbeat_failures,
+            'outages': self._outages,
+            'reconnects': self._reconnects,
+            'reactivations': self._reactivations,
+            'attempts': self._attempts,
+            'downtime': downtime,
+        }
+
+class AsyncConnectionSupervisor(ConnectionSupervisor):
+    """Asyncio variant of the ConnectionSupervisor for use with an AsyncClient.
+    Runs as a task on the owning event loop instead of a thread
+    """
+    def __init__(self, client, cache: StatusCache, **kwargs):
+        """Constructor
+        """
+        super().__init__(client, cache, **kwargs)
+        self._task: asyncio.Task = None
+
+    # -- Private Methods
+    async def _recover(self) -> tuple:
+        """One reconnect attempt. Returns (restored, reactivated)
+        """
+        self._attempts += 1
+        if self._client._connected:
+            await self._client.disconnect()
+        if not await self._client.connect():
+            return False, False
+        raw = await self._client.get_status()
+        if not self._publish(raw):
+            return False, False
+        if not self._client.get_interpreter().is_activation_lost(self._cache.latest().status):
+            return True, False
+        log.warning(f"{self._name} Lost Activation. Setting Up Again")
+        return await self._setup(), True
+
+    async def _setup(self) -> bool:
+        """Sets the client up again (through the setup coroutine method if given)
+        """
+        if self._setup_method is not None:
+            return bool(await self._setup_method())
+        return bool(await self._client.setup())
+
+    async def _reactivate(self):
+        """Sets the client up again while the link is up (commands are held meanwhile)
+        """
+        log.warning(f"{self._name} Lost Activation. Setting Up Again")
+        self._up.clear()
+        self._suspect = 0
+        self._reactivations += 1
+        await self._setup()
+        self._up.set()
+
+    async def _run(self):
+        """Task method supervising the link
+        """
+        log.info(f"{self._name} Async Supervisor Running")
+        while not self._stop.is_set():
+            if self._up.is_set():
+                if self._stale():
+                    self._beat(self._publish(await self._client.get_status()))
+                if self._link_lost():
+                    self._mark_down()
+                    continue
+                if self._activation_lost():
+                    await self._reactivate()
+                await asyncio.sleep(self._heartbeat)
+            else:
+                restored, reactivated = await self._recover()
+                if restored:
+                    self._mark_up(reactivated)
+                    continue
+                delay = self._delay()
+                self._attempt += 1
+                log.info(f"{self._name} Reconnect Attempt {self._attempt} Failed. Retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        log.info(f"{self._name} Async Supervisor Stopped")
+
+    # -- Public Methods
+    def start(self):
+        """Starts the supervisor task on the running event loop
+        """
+        if self._task is not None and not self._task.done():
+            return
+        if self._client._connected:
+            self._up.set()
+        else:
+            self._mark_down()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=f"Task-Supervisor-{self._name}")
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def wait_until_up(self, timeout: float = None, period: float = 0.02) -> bool:
+        """Waits until the link is up or the timeout expires (None waits indefinitely)
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self._up.is_set():
+            if deadline is not None and time.monotonic() + period > deadline:
+                return False
+            await asyncio.sleep(period)
+        return True
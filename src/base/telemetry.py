@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+# Binary telemetry: fixed width records of the register bytes of every dispatched command and
+# status sample, appended to a memory mapped ring file (the oldest records are overwritten once
+# it is full, so disk use is bounded). A recording is read back as records or, with NumPy, as
+# column arrays of a time window (NumPy is only imported when a window is loaded).
+
+from threading import Lock
+import mmap, os, struct, time, logging
+
+log = logging.getLogger(__name__)
+
+# File header: magic, version, record size, capacity (records) and records written
+MAGIC = b'GTLM'
+VERSION = 1
+_HEADER: struct.Struct = struct.Struct('<4sHHQQ')
+HEADER_SIZE = 64
+# Record: wall time, sequence number (from 1, so an empty slot is 0), kind, data length,
+# gripper id and data (register bytes)
+_RECORD: struct.Struct = struct.Struct('<dQBB14s16s')
+RECORD_SIZE = _RECORD.size
+GRIPPER_BYTES = 14
+DATA_BYTES = 16
+# Record kinds
+KIND_COMMAND = 1
+KIND_STATUS = 2
+
+# --- Recorder Definition
+class TelemetryRecorder:
+    """Appends telemetry records to a memory mapped ring file of at most max_bytes.
+    An existing recording of the same capacity is appended to (e.g., after a restart), otherwise
+    the file is started afresh. Records are written to the page cache, so they survive a crash of
+    the process (but not of the host unless flushed)
+    """
+    def __init__(self, path: str, max_bytes: int = 64 * 2**20):
+        """Constructor
+        """
+        self._path: str = path
+        self._capacity: int = (max_bytes - HEADER_SIZE) // RECORD_SIZE
+        if self._capacity <= 0:
+            raise ValueError(f"telemetry file of {max_bytes} bytes cannot hold a record")
+        self._lock: Lock = Lock()
+        size = HEADER_SIZE + self._capacity * RECORD_SIZE
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            resume = os.fstat(fd).st_size == size
+            if not resume:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._map: mmap.mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        magic, version, record_size, capacity, written = _HEADER.unpack_from(self._map, 0)
+        if resume and (magic, version, record_size, capacity) == (MAGIC, VERSION, RECORD_SIZE, self._capacity):
+            self._written: int = written
+            log.info(f"Appending Telemetry to {path} ({written} records written)")
+        else:
+            if resume:
+                # A file of the same size in another format
+                self._map[:] = bytes(size)
+            self._written = 0
+            _HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD_SIZE, self._capacity, 0)
+            log.info(f"Recording Telemetry to {path} ({self._capacity} records)")
+
+    # -- Public Methods
+    def append(self, kind: int, gripper: bytes, data: list, stamp: float = None):
+        """Appends a record (register bytes beyond DATA_BYTES are not kept)
+        """
+        data = bytes(data[:DATA_BYTES])
+        with self._lock:
+            if self._map is None:
+                return
+            offset = HEADER_SIZE + (self._written % self._capacity) * RECORD_SIZE
+            self._written += 1
+            _RECORD.pack_into(self._map, offset, time.time() if stamp is None else stamp,
+                              self._written, kind, len(data), gripper, data)
+            # The header is updated after the record so a reader never sees a partial one
+            _HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD_SIZE, self._capacity, self._written)
+
+    def channel(self, gripper_id: str) -> 'TelemetryChannel':
+        """Returns the channel recording one gripper's commands and status
+        """
+        return TelemetryChannel(self, gripper_id)
+
+    def flush(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def close(self):
+        """Flushes and unmaps the file (later records are ignored)
+        """
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            self._map.close()
+            self._map = None
+
+    # -- Properties
+    @property
+    def stats(self) -> dict:
+        return {
+            'records': self._written,
+            'capacity': self._capacity,
+            'overwritten': max(0, self._written - self._capacity),
+        }
+
+class TelemetryChannel:
+    """Records the commands and status of one gripper
+    """
+    __slots__ = ('_recorder', '_gripper')
+
+    def __init__(self, recorder: TelemetryRecorder, gripper_id: str):
+        """Constructor
+        """
+        self._recorder: TelemetryRecorder = recorder
+        self._gripper: bytes = str(gripper_id).encode()[:GRIPPER_BYTES]
+
+    def command(self, output: list):
+        """Records an output message sent to the gripper
+        """
+        self._recorder.append(KIND_COMMAND, self._gripper, output)
+
+    def status(self, raw: list):
+        """Records a status read from the gripper
+        """
+        self._recorder.append(KIND_STATUS, self._gripper, raw)
+
+# --- Reader Definition
+class TelemetryReader:
+    """Reads a telemetry recording (also while it is being recorded)
+    """
+    def __init__(self, path: str):
+        """Constructor
+        """
+        with open(path, 'rb') as f:
+            self._map: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self._capacity, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a telemetry recording (version {VERSION})")
+
+    # -- Private Methods
+    def _span(self) -> range:
+        """Sequence numbers of the records held (oldest first)
+        """
+        written = _HEADER.unpack_from(self._map, 0)[4]
+        return range(max(1, written - self._capacity + 1), written + 1)
+
+    # -- Public Methods
+    def records(self, start: float = None, end: float = None):
+        """Yields the records (stamp, kind, gripper id, register bytes) in order, optionally
+        within a time window (wall time, as time.time)
+        """
+        for seq in self._span():
+            offset = HEADER_SIZE + ((seq - 1) % self._capacity) * RECORD_SIZE
+            stamp, record_seq, kind, length, gripper, data = _RECORD.unpack_from(self._map, offset)
+            # Overwritten since the span was read
+            if record_seq != seq:
+                continue
+            if (start is not None and stamp < start) or (end is not None and stamp > end):
+                continue
+            yield stamp, kind, gripper.rstrip(b'\0').decode(), list(data[:length])
+
+    def window(self, start: float = None, end: float = None, gripper: str = None, kind: int = None) -> dict:
+        """Loads the records of a time window (optionally of one gripper and kind) into NumPy
+        arrays: time (N), kind (N), gripper (N), length (N) and data (N x DATA_BYTES)
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("numpy is required to load telemetry windows (records() does not need it)") from None
+        dtype = np.dtype([('time', '<f8'), ('seq', '<u8'), ('kind', 'u1'), ('length', 'u1'),
+                          ('gripper', f'S{GRIPPER_BYTES}'), ('data', 'u1', (DATA_BYTES,))])
+        span = self._span()
+        table = np.frombuffer(self._map, dtype=dtype, count=self._capacity, offset=HEADER_SIZE)
+        # Oldest first (the ring is rotated once it has wrapped)
+        table = np.roll(table, -((span.start - 1) % self._capacity))[:len(span)]
+        mask = table['seq'] == np.arange(span.start, span.stop, dtype=np.uint64)
+        if start is not None:
+            mask &= table['time'] >= start
+        if end is not None:
+            mask &= table['time'] <= end
+        if gripper is not None:
+            mask &= table['gripper'] == str(gripper).encode()[:GRIPPER_BYTES]
+        if kind is not None:
+            mask &= table['kind'] == kind
+        selected = table[mask]
+        return {
+            'time': selected['time'].copy(),
+            'kind': selected['kind'].copy(),
+            'gripper': selected['gripper'].astype(str),
+            'length': selected['length'].copy(),
+            'data': selected['data'].copy(),
+        }
+
+    def close(self):
+        self._map.close()
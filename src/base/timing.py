@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+# Maximum factor a timeout is doubled to after consecutive expiries
+MAX_BACKOFF = 8
+
+# --- Timeout Definition
+class AdaptiveTimeout:
+    """Transaction timeout derived from measured round-trip times.
+    The timeout is the smoothed round-trip time plus k times its mean deviation (as for TCP
+    retransmission, RFC 6298), bounded by a floor (e.g., the wire time of the frames at the
+    baud rate) and a ceiling (the configured timeout, also used until the first measurement).
+    Each expiry doubles the timeout until the next successful measurement.
+    """
+    def __init__(self, floor: float, ceiling: float, k: float = 4.0):
+        """Constructor
+        """
+        self._floor: float = floor
+        self._ceiling: float = max(ceiling, floor)
+        self._k: float = k
+        self._srtt: float = None
+        self._rttvar: float = 0.0
+        self._backoff: int = 1
+
+    def observe(self, rtt: float):
+        """Records the round-trip time of a successful transaction
+        """
+        if self._srtt is None:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+            self._srtt = 0.875 * self._srtt + 0.125 * rtt
+        self._backoff = 1
+
+    def expire(self):
+        """Records a transaction that timed out (backs the timeout off)
+        """
+        self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+
+    def timeout(self) -> float:
+        """The current timeout (seconds)
+        """
+        if self._srtt is None:
+            return self._ceiling
+        estimate = (self._srtt + self._k * self._rttvar) * self._backoff
+        return min(self._ceiling, max(self._floor, estimate))
+
+    # -- Properties
+    @property
+    def stats(self) -> dict:
+        return {
+            'rtt': self._srtt or 0.0,
+            'rttvar': self._rttvar,
+            'timeout': self.timeout(),
+            'floor': self._floor,
+        }
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.metrics import registry, Histogram
+from typing import Callable
+import time, logging
+
+log = logging.getLogger(__name__)
+
+# --- Trajectory Definition
+class Trajectory:
+    """A timed sequence of waypoints executed by a client worker.
+    Each waypoint is a command (e.g., {'position': 128, 'speed': 200}) with a 't' key giving its
+    planned time in seconds from the start. The worker dispatches every waypoint that is due and
+    sleeps until the next deadline, so waypoints are written at their planned times (bounded by
+    the command rate). Events (started, progress, completed, preempted, stopped, rejected)
+    are reported through the reply method as dicts.
+    """
+    def __init__(self, waypoints: list, trajectory_id: str = None, reply: Callable[[dict], None] = None):
+        """Constructor (raises ValueError for malformed waypoints)
+        """
+        if not isinstance(waypoints, list) or not waypoints:
+            raise ValueError("a trajectory needs a non-empty list of waypoints")
+        plan: list = []
+        for waypoint in waypoints:
+            if not isinstance(waypoint, dict) or not isinstance(waypoint.get('t'), (int, float)):
+                raise ValueError(f"waypoint has no time 't' -> {waypoint}")
+            command = {key: value for key, value in waypoint.items() if key != 't'}
+            plan.append((float(waypoint['t']), command))
+        # Stable sort keeps the order of waypoints planned for the same time
+        self._plan: list = sorted(plan, key=lambda item: item[0])
+        self._id: str = trajectory_id
+        self._reply: Callable[[dict], None] = reply
+        self._start: float = None
+        self._next: int = 0
+        # Lateness of each dispatched waypoint (seconds)
+        self._jitter: list = []
+
+    # -- Public Methods
+    def start(self, now: float = None):
+        """Starts the trajectory clock
+        """
+        self._start = time.monotonic() if now is None else now
+        self.report('started', total=len(self._plan))
+
+    def time_to_next(self, now: float = None) -> float:
+        """Seconds until the next waypoint is due (None when finished)
+        """
+        if self.done:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._start + self._plan[self._next][0] - now)
+
+    def due(self, now: float = None) -> list:
+        """Takes the waypoints due by now as (index, planned time, command)
+        """
+        now = time.monotonic() if now is None else now
+        due: list = []
+        while not self.done and self._start + self._plan[self._next][0] <= now:
+            planned, command = self._plan[self._next]
+            due.append((self._next, self._start + planned, command))
+            self._next += 1
+        return due
+
+    def record(self, index: int, planned: float, dispatched: float):
+        """Records the lateness of a dispatched waypoint and reports progress
+        """
+        jitter = dispatched - planned
+        self._jitter.append(jitter)
+        self.report('progress', index=index, total=len(self._plan), jitter=jitter)
+        if self.done and index == len(self._plan) - 1:
+            self.report('completed', **self.jitter_stats())
+
+    def cancel(self, reason: str):
+        """Cancels the remaining waypoints (reason is the reported event, e.g., 'preempted')
+        """
+        remaining = len(self._plan) - self._next
+        self._next = len(self._plan)
+        self.report(reason, remaining=remaining)
+
+    def jitter_stats(self) -> dict:
+        """Lateness of the dispatched waypoints relative to their planned times
+        """
+        if not self._jitter:
+            return {'jitter_mean': 0.0, 'jitter_max': 0.0}
+        return {
+            'jitter_mean': sum(self._jitter) / len(self._jitter),
+            'jitter_max': max(self._jitter),
+        }
+
+    def report(self, event: str, **fields):
+        """Sends an event to the requesting client (if any)
+        """
+        if self._reply is None:
+            return
+        try:
+            self._reply({'type': 'trajectory', 'id': self._id, 'event': event, **fields})
+        except Exception as e:
+            log.warning(f"Cannot Report Trajectory {self._id} {event} -> {e}")
+
+    # -- Properties
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def done(self) -> bool:
+        return self._next >= len(self._plan)
+
+# --- Executor Definition
+class TrajectoryExecutor:
+    """Runs at most one trajectory per client worker. A new trajectory or a stop pre-empts the
+    current one. Waypoint lateness is recorded in the metrics registry
+    """
+    def __init__(self, name: str = 'default'):
+        """Constructor
+        """
+        self._current: Trajectory = None
+        self._jitter: Histogram = registry.histogram(
+            'gripper_trajectory_jitter_seconds', 'Lateness of trajectory waypoint writes', gripper=name)
+        self._started: int = 0
+        self._completed: int = 0
+        self._preempted: int = 0
+
+    def start(self, trajectory: Trajectory):
+        """Starts a trajectory, pre-empting the current one
+        """
+        self.cancel('preempted')
+        self._current = trajectory
+        self._started += 1
+        trajectory.start()
+
+    def cancel(self, reason: str = 'stopped') -> bool:
+        """Cancels the current trajectory. Returns True if one was running
+        """
+        if self._current is None or self._current.done:
+            self._current = None
+            return False
+        self._current.cancel(reason)
+        self._current = None
+        self._preempted += 1
+        return True
+
+    def time_to_next(self) -> float:
+        """Seconds until the next waypoint is due (None when idle)
+        """
+        if self._current is None:
+            return None
+        return self._current.time_to_next()
+
+    def due(self) -> list:
+        """Takes the due waypoints of the current trajectory
+        """
+        if self._current is None:
+            return []
+        return self._current.due()
+
+    def record(self, waypoints: list, dispatched: float):
+        """Records the dispatch time of waypoints taken with due()
+        """
+        trajectory = self._current
+        if trajectory is None:
+            return
+        for index, planned, _ in waypoints:
+            self._jitter.observe(max(0.0, dispatched - planned))
+            trajectory.record(index, planned, dispatched)
+        if trajectory.done:
+            self._current = None
+            self._completed += 1
+
+    # -- Properties
+    @property
+    def stats(self) -> dict:
+        return {
+            'active': self._current is not None,
+            'started': self._started,
+            'completed': self._completed,
+            'preempted': self._preempted,
+        }
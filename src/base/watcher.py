@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from threading import Thread, Event
+from typing import Callable
+import asyncio, os, logging
+import yaml
+
+log = logging.getLogger(__name__)
+
+class ConfigWatcher:
+    """Watches a configuration file and passes each changed configuration to a callback.
+    The file's modification time and size are checked every interval, and a change is only
+    loaded once the file has stopped changing for a check (so a partly written file is not
+    applied). A file that cannot be loaded is logged and skipped, keeping the running
+    configuration. The callback returns True if it applied the configuration
+    """
+    def __init__(
+            self,
+            path: str,
+            load: Callable[[str], dict],
+            callback: Callable[[dict], bool],
+            config: dict = None,
+            interval: float = 1.0
+        ):
+        """Constructor (config is the configuration already running)
+        """
+        self._path: str = path
+        self._load: Callable[[str], dict] = load
+        self._callback: Callable[[dict], bool] = callback
+        self._config: dict = config
+        self._interval: float = interval
+        # The file state last loaded and a change waiting to settle
+        self._stamp: tuple = self._stat()
+        self._pending: tuple = None
+        self._stop: Event = Event()
+        self._thread: Thread = None
+        # Counters
+        self._checks: int = 0
+        self._reloads: int = 0
+        self._rejected: int = 0
+        self._errors: int = 0
+
+    # -- Private Methods
+    def _stat(self) -> tuple:
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _failed(self, e: Exception):
+        """Counts a callback that raised (the configuration is treated as rejected, and the
+        watcher keeps running)
+        """
+        log.error(f"Cannot Apply Changed Config {self._path} -> {type(e).__name__}: {e}")
+        self._errors += 1
+
+    def _applied(self, config: dict, applied: bool):
+        """Counts the callback's result (an applied configuration is the new reference)
+        """
+        if applied:
+            self._config = config
+            self._reloads += 1
+        else:
+            self._rejected += 1
+
+    def _run(self):
+        """Thread method checking the file at the configured interval
+        """
+        log.info(f"Watching {self._path} for Changes")
+        while not self._stop.wait(self._interval):
+            config = self.check()
+            if config is None:
+                continue
+            try:
+                self._applied(config, self._callback(config))
+            except Exception as e:
+                self._failed(e)
+
+    # -- Public Methods
+    def check(self) -> dict:
+        """Checks the file once. Returns its configuration if it changed (and has settled) and
+        differs from the running one, None otherwise
+        """
+        self._checks += 1
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            self._pending = None
+            return None
+        if stamp != self._pending:
+            self._pending = stamp
+            return None
+        self._stamp = stamp
+        self._pending = None
+        try:
+            config = self._load(self._path)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            log.error(f"Cannot Load Changed Config {self._path} -> {e}")
+            self._errors += 1
+            return None
+        if not isinstance(config, dict):
+            log.error(f"Ignoring Changed Config {self._path} (not a mapping)")
+            self._errors += 1
+            return None
+        if config == self._config:
+            return None
+        log.info(f"Config {self._path} Changed")
+        return config
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True, name="Thread-Config-Watcher")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    # -- Properties
+    @property
+    def stats(self) -> dict:
+        return {
+            'checks': self._checks,
+            'reloads': self._reloads,
+            'rejected': self._rejected,
+            'errors': self._errors,
+        }
+
+class AsyncConfigWatcher(ConfigWatcher):
+    """Asyncio variant of the ConfigWatcher that runs as a task on the event loop and awaits
+    its (coroutine) callback. The file is read in a worker thread
+    """
+    def __init__(self, *args, **kwargs):
+        """Constructor
+        """
+        super().__init__(*args, **kwargs)
+        self._task: asyncio.Task = None
+
+    async def _run(self):
+        """Task method checking the file at the configured interval
+        """
+        log.info(f"Watching {self._path} for Changes")
+        while not self._stop.is_set():
+            await asyncio.sleep(self._interval)
+            config = await asyncio.to_thread(self.check)
+            if config is None:
+                continue
+            try:
+                self._applied(config, await self._callback(config))
+            except Exception as e:
+                self._failed(e)
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="Task-Config-Watcher")
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
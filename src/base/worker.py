@@ -0,0 +1,610 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.client import Client, AsyncClient
+from base.scheduler import CommandScheduler, AsyncCommandScheduler
+from base.status import StatusCache, StatusPoller, AsyncStatusPoller, StatusSnapshot
+from base.trajectory import Trajectory, TrajectoryExecutor
+from base.control import ControlLoop
+from base.lanes import LaneQueue, AsyncLaneQueue, PRIORITY_SAFETY, PRIORITY_MODE, PRIORITY_MOTION
+from base.supervisor import ConnectionSupervisor, AsyncConnectionSupervisor, POLICY_HOLD, POLICY_REJECT
+from base.telemetry import TelemetryRecorder
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from threading import Thread
+import asyncio, time, logging
+
+log = logging.getLogger(__name__)
+
+# Period (seconds) at which held commands are re-checked against the link state
+HOLD_POLL = 0.05
+# Time (seconds) the supervisor waits for the worker to set the client up again (reset and activate)
+SETUP_TIMEOUT = 10.0
+# Options that can be changed in place (see ClientWorker.configure) and their lower bounds
+# as (minimum, minimum allowed). Status rates must be positive, a command rate of 0 is unbounded
+_RATE_OPTIONS: dict = {
+    'command_rate': (0.0, True),
+    'status_rate': (0.0, False),
+    'status_idle_rate': (0.0, False),
+    'hold_timeout': (0.0, True),
+}
+_SUPERVISOR_OPTIONS: dict = {
+    'heartbeat': (0.0, False),
+    'failures': (1, True),
+    'backoff': (0.0, True),
+    'backoff_max': (0.0, True),
+}
+_CONTROL_OPTIONS: dict = {
+    'max_failures': (1, True),
+    'spin': (0.0, True),
+}
+
+def _check_number(name: str, value, bound: tuple):
+    """Raises ValueError unless the value is a number within its (minimum, minimum allowed) bound
+    """
+    minimum, inclusive = bound
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number -> {value!r}")
+    if value < minimum or (value == minimum and not inclusive):
+        raise ValueError(f"{name} must be {'at least' if inclusive else 'above'} {minimum} -> {value}")
+
+def _check_section(name: str, options, bounds: dict):
+    """Raises ValueError for an option section that is not a mapping of known, valid options
+    """
+    if options is None:
+        return
+    if not isinstance(options, dict):
+        raise ValueError(f"{name} must be a mapping -> {options!r}")
+    for key, value in options.items():
+        if key not in bounds:
+            raise ValueError(f"unknown {name} option -> {key}")
+        _check_number(f"{name}.{key}", value, bounds[key])
+
+class ClientWorker:
+    """Independent I/O worker for one client (gripper).
+    Owns the client's command queue, dispatch scheduler, status poller and status cache, and
+    dispatches in its own thread so a slow or faulted client never stalls any other client.
+    Timed trajectories are executed in the same loop: it waits for commands only until the
+    next waypoint is due. The command queue has priority lanes (see base.lanes), so a stop or
+    a mode change (e.g., reset) is served ahead of, and cancels, queued motion commands.
+    The link is watched by a connection supervisor; commands arriving while it is down are
+    held or rejected according to the outage policy instead of waiting on a reconnect. When
+    the supervisor finds activation lost, the setup is queued to this loop (as a mode item)
+    so it never interleaves with dispatch or control ticks.
+    A closed-loop controller (see base.control) also runs in this loop at its fixed period,
+    one bus transaction per tick: the status read back with a tick's write feeds the next
+    tick, which reads the status itself only when the previous tick wrote nothing. Any other
+    command, trajectory or stop ends it.
+    """
+    # The queue and the I/O components (replaced by their asyncio variants in the AsyncClientWorker)
+    _queue_type = LaneQueue
+    _scheduler_type = CommandScheduler
+    _poller_type = StatusPoller
+    _supervisor_type = ConnectionSupervisor
+
+    def __init__(
+            self,
+            name: str,
+            client: Client,
+            command_rate: float = 50.0,
+            status_rate: float = 20.0,
+            status_idle_rate: float = 2.0,
+            policy: str = POLICY_HOLD,
+            hold_timeout: float = 5.0,
+            supervisor: dict = None,
+            recorder: TelemetryRecorder = None,
+            control: dict = None
+        ):
+        """Constructor (supervisor holds the ConnectionSupervisor options, e.g., heartbeat, control
+        the ControlLoop options, and the recorder, if given, records the commands and status of
+        this client)
+        """
+        self._name: str = name
+        self._client: Client = client
+        self._input_q: LaneQueue = self._queue_type(self._priority, cancel=self._cancelled)
+        channel = recorder.channel(name) if recorder is not None else None
+        self._cache: StatusCache = StatusCache(recorder=channel)
+        self._scheduler: CommandScheduler = self._scheduler_type(
+            client=client,
+            rate=command_rate,
+            cache=self._cache,
+            name=name,
+            recorder=channel
+        )
+        self._poller: StatusPoller = self._poller_type(
+            client=client,
+            cache=self._cache,
+            rate=status_rate,
+            idle_rate=status_idle_rate
+        )
+        self._executor: TrajectoryExecutor = TrajectoryExecutor(name=name)
+        self._control: ControlLoop = ControlLoop(name=name, **(control or {}))
+        self._supervisor: ConnectionSupervisor = self._supervisor_type(
+            client=client,
+            cache=self._cache,
+            name=name,
+            setup=self._request_setup,
+            **(supervisor or {})
+        )
+        self._init_policy(policy, hold_timeout)
+        self._running: bool = False
+        self._thread: Thread = None
+
+    # -- Private Methods
+    def _init_policy(self, policy: str, hold_timeout: float):
+        """Sets the outage policy (shared by both runtimes)
+        """
+        if policy not in (POLICY_HOLD, POLICY_REJECT):
+            raise ValueError(f"unknown outage policy -> {policy}")
+        self._policy: str = policy
+        self._hold_timeout: float = hold_timeout
+        # Commands held during an outage as (commands, stamps, priorities) and when holding began
+        self._held: tuple = None
+        self._held_since: float = None
+        # Futures of the supervisor's setup requests drained but not yet served
+        self._setups: list = []
+        # Counters
+        self._rejected: int = 0
+        self._expired: int = 0
+
+    def _timeout(self) -> float:
+        """How long to wait for interface data (until the next waypoint or control tick, or
+        the next check of the link while commands are held)
+        """
+        timeout = self._executor.time_to_next()
+        tick = self._control.time_to_next()
+        if tick is not None:
+            timeout = tick if timeout is None else min(timeout, tick)
+        if self._held is not None:
+            timeout = HOLD_POLL if timeout is None else min(timeout, HOLD_POLL)
+        return timeout
+
+    def _admit(self, commands: list, stamps: list, priorities: list) -> tuple:
+        """Applies the outage policy. Returns the (commands, stamps, priorities) to dispatch now,
+        which include any held commands once the link is back (empty while it is down)
+        """
+        if self._held is not None and time.monotonic() - self._held_since > self._hold_timeout:
+            log.warning(f"{self._name} Discarding {len(self._held[0])} Held Commands (link still down)")
+            self._expired += len(self._held[0])
+            self._held = None
+        if self._supervisor.up:
+            if self._held is not None:
+                held_commands, held_stamps, held_priorities = self._held
+                self._held = None
+                return held_commands + commands, held_stamps + stamps, held_priorities + priorities
+            return commands, stamps, priorities
+        if not commands:
+            return [], [], []
+
+        # A timed trajectory cannot be held (its waypoints would all be late)
+        self._executor.cancel('link_down')
+        if self._policy == POLICY_REJECT:
+            log.warning(f"{self._name} Rejected {len(commands)} Commands (link down)")
+            self._rejected += len(commands)
+        elif self._held is None:
+            self._held = (commands, stamps, priorities)
+            self._held_since = time.monotonic()
+        else:
+            self._held = tuple(held + new for held, new in zip(self._held, (commands, stamps, priorities)))
+        return [], [], []
+
+    def _priority(self, data: dict) -> int:
+        """The priority class of queued interface data (stops and worker control are safety)
+        """
+        if data is None or 'stop' in data:
+            return PRIORITY_SAFETY
+        if 'setup' in data:
+            return PRIORITY_MODE
+        if 'command' in data:
+            return self._client.get_interpreter().priority(data['command'])
+        return PRIORITY_MOTION
+
+    def _cancelled(self, data: dict):
+        """Reports a queued trajectory or controller cancelled by an urgent command before it started
+        """
+        if data.get('reply') is None:
+            return
+        if 'trajectory' in data:
+            data['reply']({'type': 'trajectory', 'id': data['trajectory'].get('id'), 'event': 'preempted'})
+        elif data.get('control') is not None:
+            data['reply']({'type': 'control', 'id': data['control'].get('id'), 'event': 'preempted'})
+
+    def _collect(self, batch: list) -> tuple:
+        """Splits drained interface data into the (commands, stamps, priorities) to dispatch,
+        starting or stopping trajectories and controllers on the way, then appends any trajectory
+        waypoints now due. A stop discards the commands before it and holds the gripper where it is
+        """
+        commands: list = []
+        stamps: list = []
+        priorities: list = []
+        for data in batch:
+            if data is None:
+                continue
+            try:
+                # Anything else addressed to the gripper takes over from a running controller
+                if 'control' not in data:
+                    self._control.cancel('stopped' if 'stop' in data else 'preempted')
+                if 'stop' in data:
+                    self._executor.cancel('stopped')
+                    snapshot = self._cache.latest()
+                    command = self._client.get_interpreter().stop_command(
+                        snapshot.status if snapshot is not None else None)
+                    commands, stamps, priorities = [], [], []
+                    if command is not None:
+                        commands.append(command)
+                        stamps.append(data['stamps']['received'] if 'stamps' in data else None)
+                        priorities.append(PRIORITY_SAFETY)
+                elif 'setup' in data:
+                    # The supervisor is setting the gripper up again (a reset), so the commands
+                    # before it and any trajectory are dropped
+                    self._executor.cancel('preempted')
+                    commands, stamps, priorities = [], [], []
+                    self._setups.append(data['setup'])
+                elif 'trajectory' in data:
+                    trajectory = data['trajectory']
+                    try:
+                        self._executor.start(Trajectory(
+                            trajectory.get('waypoints'),
+                            trajectory_id=trajectory.get('id'),
+                            reply=data.get('reply')
+                        ))
+                    except ValueError as e:
+                        log.error(f"{self._name} Rejected Trajectory -> {e}")
+                        if data.get('reply') is not None:
+                            data['reply']({'type': 'trajectory', 'id': trajectory.get('id'), 'event': 'rejected', 'error': str(e)})
+                elif 'control' in data:
+                    # A controller request takes over from the commands before it (None ends the
+                    # running controller, keeping its last output)
+                    control = data['control']
+                    self._executor.cancel('preempted')
+                    commands, stamps, priorities = [], [], []
+                    if control is None:
+                        self._control.cancel('stopped')
+                    else:
+                        self._control.start(control['controller'], control['rate'], control_id=control.get('id'),
+                                            reply=data.get('reply'))
+                else:
+                    stamp = data['stamps']['received'] if 'stamps' in data else None
+                    priority = self._priority(data)
+                    commands.append(data['command'])
+                    stamps.append(stamp)
+                    priorities.append(priority)
+            except Exception as e:
+                # A malformed item is dropped rather than ending the worker loop
+                log.error(f"{self._name} Dropped Interface Data -> {type(e).__name__}: {e}")
+
+        waypoints = self._executor.due()
+        commands += [command for _, _, command in waypoints]
+        stamps += [None] * len(waypoints)
+        priorities += [PRIORITY_MOTION] * len(waypoints)
+        return commands, stamps, priorities, waypoints
+
+    def _resume(self) -> bool:
+        """Reads (and publishes) the status. True if the interpreter takes the gripper over as it
+        is (see its resume)
+        """
+        raw = self._client.get_status()
+        if not raw:
+            return False
+        interpreter = self._client.get_interpreter()
+        return interpreter.resume(self._cache.publish(interpreter.interpret_input(raw), raw=raw).status)
+
+    def _request_setup(self) -> bool:
+        """Has the worker thread set the client up again and waits for the result (called by the
+        supervisor thread, so the setup is serialised with the worker's own bus traffic)
+        """
+        future = Future()
+        self._input_q.put({'setup': future})
+        try:
+            return future.result(timeout=SETUP_TIMEOUT)
+        except FutureTimeout:
+            log.error(f"{self._name} Timed Out Waiting for the Worker to Set Up")
+            return False
+
+    def _serve_setups(self):
+        """Sets the client up for the pending setup requests (one setup serves them all)
+        """
+        setups, self._setups = self._setups, []
+        result = bool(self._client.setup())
+        for future in setups:
+            if not future.done():
+                future.set_result(result)
+
+    def _tick(self):
+        """Runs a control loop tick: runs the controller on the status (read unless the previous
+        tick's write read it back) and writes its output (if changed) with a status read
+        """
+        dt = self._control.begin()
+        interpreter = self._client.get_interpreter()
+        if self._control.refreshed:
+            status = self._cache.latest().status
+        else:
+            raw = self._client.get_status()
+            status = self._cache.publish(interpreter.interpret_input(raw), raw=raw).status if raw else None
+        output = self._control.step(status, interpreter, dt)
+        self._control.end(output is not None and self._scheduler.write(output))
+
+    def _run(self, resume: bool = False):
+        """Thread method setting up the client and dispatching its commands
+        """
+        self.setup(resume)
+        while self._running:
+            batch = self._scheduler.drain(self._input_q, timeout=self._timeout())
+            if not self._running:
+                break
+            commands, stamps, priorities, waypoints = self._collect(batch)
+            if self._setups:
+                self._serve_setups()
+            if self._control.due():
+                try:
+                    self._tick()
+                except Exception as e:
+                    log.error(f"{self._name} Control Tick Failed -> {type(e).__name__}: {e}")
+                    self._control.cancel('failed')
+            # Hold or reject the commands while the link is down (the supervisor restores it)
+            commands, stamps, priorities = self._admit(commands, stamps, priorities)
+            if not commands:
+                continue
+
+            # Coalesce the commands and send the newest target to the gripper
+            try:
+                self._scheduler.dispatch(commands, stamps, priorities)
+            except Exception as e:
+                log.error(f"{self._name} Dropped Commands -> {type(e).__name__}: {e}")
+                continue
+            self._executor.record(waypoints, self._scheduler.last_dispatch)
+            # The dispatch refreshed the status, so let the poller pick up any change in motion
+            self._poller.wake()
+        log.info(f"{self._name} Stopped")
+
+    # -- Public Methods
+    def put(self, interface_data: dict):
+        """Queues interface data (a dict with a 'command', 'trajectory' or 'stop' key) for this client
+        """
+        self._input_q.put(interface_data)
+
+    @staticmethod
+    def validate(
+            command_rate: float = 50.0,
+            status_rate: float = 20.0,
+            status_idle_rate: float = 2.0,
+            policy: str = POLICY_HOLD,
+            hold_timeout: float = 5.0,
+            supervisor: dict = None,
+            control: dict = None
+        ):
+        """Checks the options taken by configure. Raises ValueError for an invalid option
+        """
+        for name, value in (('command_rate', command_rate), ('status_rate', status_rate),
+                            ('status_idle_rate', status_idle_rate), ('hold_timeout', hold_timeout)):
+            _check_number(name, value, _RATE_OPTIONS[name])
+        if policy not in (POLICY_HOLD, POLICY_REJECT):
+            raise ValueError(f"unknown outage policy -> {policy}")
+        _check_section('supervisor', supervisor, _SUPERVISOR_OPTIONS)
+        _check_section('control', control, _CONTROL_OPTIONS)
+
+    def configure(
+            self,
+            command_rate: float = 50.0,
+            status_rate: float = 20.0,
+            status_idle_rate: float = 2.0,
+            policy: str = POLICY_HOLD,
+            hold_timeout: float = 5.0,
+            supervisor: dict = None,
+            control: dict = None
+        ):
+        """Applies new rates, outage policy, supervisor and control loop options in place (the
+        client, its link and any held commands are kept). All options are checked before any is
+        applied, so an invalid option (ValueError) changes nothing
+        """
+        self.validate(command_rate, status_rate, status_idle_rate, policy, hold_timeout, supervisor, control)
+        self._supervisor.configure(**(supervisor or {}))
+        self._control.configure(**(control or {}))
+        self._scheduler.set_rate(command_rate)
+        self._poller.set_rates(status_rate, status_idle_rate)
+        self._policy = policy
+        self._hold_timeout = hold_timeout
+
+    def setup(self, resume: bool = False):
+        """Setup procedure for the client (the supervisor takes over if the link is not up).
+        When resuming, a gripper that is already set up (see the interpreter's resume) is kept as it is
+        """
+        log.info(f"{self._name} Initialising...")
+        if self._client.connect() and not (resume and self._resume()):
+            self._client.setup()
+        self._poller.start()
+        self._supervisor.start()
+
+    def start(self, resume: bool = False):
+        """Starts the worker thread (which sets up the client first, see setup)
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = Thread(target=self._run, args=(resume,), daemon=True, name=f"Thread-Worker-{self._name}")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stops the worker thread and its poller
+        """
+        self._running = False
+        # Unblock the scheduler drain
+        self._input_q.put(None)
+        self._poller.stop()
+        self._supervisor.stop()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def get_client(self) -> Client:
+        return self._client
+
+    def get_status(self) -> StatusSnapshot:
+        """Returns the latest cached status snapshot (does not access the client)
+        """
+        return self._cache.latest()
+
+    def wait_for_status(self, condition, timeout: float = 5.0) -> StatusSnapshot:
+        """Waits on the status cache until the interpreted status satisfies the condition
+        """
+        return self._cache.wait_until(condition, timeout=timeout)
+
+    # -- Properties
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def stats(self) -> dict:
+        """Client, dispatch, status polling and link counters
+        """
+        return {
+            'client': self._client.stats,
+            'link': dict(self._supervisor.stats, held=len(self._held[0]) if self._held else 0,
+                         rejected=self._rejected, expired=self._expired),
+            'scheduler': self._scheduler.stats,
+            'poller': self._poller.stats,
+            'trajectory': self._executor.stats,
+            'control': self._control.stats,
+            'cancelled': self._input_q.cancelled,
+        }
+
+class AsyncClientWorker(ClientWorker):
+    """Asyncio variant of the ClientWorker for use with an AsyncClient.
+    Dispatches in its own task on the owning event loop
+    """
+    # The asyncio variants of the queue and the I/O components (the rest is shared)
+    _queue_type = AsyncLaneQueue
+    _scheduler_type = AsyncCommandScheduler
+    _poller_type = AsyncStatusPoller
+    _supervisor_type = AsyncConnectionSupervisor
+
+    def __init__(self, name: str, client: AsyncClient, **options):
+        """Constructor (takes the options of the ClientWorker)
+        """
+        super().__init__(name, client, **options)
+        self._task: asyncio.Task = None
+
+    # -- Private Methods
+    async def _resume(self) -> bool:
+        """Reads (and publishes) the status. True if the interpreter takes the gripper over as it
+        is (see its resume)
+        """
+        raw = await self._client.get_status()
+        if not raw:
+            return False
+        interpreter = self._client.get_interpreter()
+        return interpreter.resume(self._cache.publish(interpreter.interpret_input(raw), raw=raw).status)
+
+    async def _request_setup(self) -> bool:
+        """Has the worker task set the client up again and waits for the result (called by the
+        supervisor task, so the setup is serialised with the worker's own bus traffic)
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._input_q.put_nowait({'setup': future})
+        try:
+            return await asyncio.wait_for(future, SETUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.error(f"{self._name} Timed Out Waiting for the Worker to Set Up")
+            return False
+
+    async def _serve_setups(self):
+        """Sets the client up for the pending setup requests on the event loop
+        """
+        setups, self._setups = self._setups, []
+        result = bool(await self._client.setup())
+        for future in setups:
+            if not future.done():
+                future.set_result(result)
+
+    async def _tick(self):
+        """Runs a control loop tick on the event loop
+        """
+        dt = self._control.begin()
+        interpreter = self._client.get_interpreter()
+        if self._control.refreshed:
+            status = self._cache.latest().status
+        else:
+            raw = await self._client.get_status()
+            status = self._cache.publish(interpreter.interpret_input(raw), raw=raw).status if raw else None
+        output = self._control.step(status, interpreter, dt)
+        self._control.end(output is not None and await self._scheduler.write(output))
+
+    async def _run(self, resume: bool = False):
+        """Task method setting up the client and dispatching its commands
+        """
+        await self.setup(resume)
+        while self._running:
+            batch = await self._scheduler.drain(self._input_q, timeout=self._timeout())
+            if not self._running:
+                break
+            commands, stamps, priorities, waypoints = self._collect(batch)
+            if self._setups:
+                await self._serve_setups()
+            if self._control.due():
+                try:
+                    await self._tick()
+                except Exception as e:
+                    log.error(f"{self._name} Control Tick Failed -> {type(e).__name__}: {e}")
+                    self._control.cancel('failed')
+            commands, stamps, priorities = self._admit(commands, stamps, priorities)
+            if not commands:
+                continue
+
+            try:
+                await self._scheduler.dispatch(commands, stamps, priorities)
+            except Exception as e:
+                log.error(f"{self._name} Dropped Commands -> {type(e).__name__}: {e}")
+                continue
+            self._executor.record(waypoints, self._scheduler.last_dispatch)
+            self._poller.wake()
+        log.info(f"{self._name} Stopped")
+
+    # -- Public Methods
+    def put(self, interface_data: dict):
+        """Queues interface data (a dict with a 'command', 'trajectory' or 'stop' key) for this client
+        """
+        self._input_q.put_nowait(interface_data)
+
+    async def setup(self, resume: bool = False):
+        """Setup procedure for the client (the supervisor takes over if the link is not up).
+        When resuming, a gripper that is already set up is kept as it is
+        """
+        log.info(f"{self._name} Initialising...")
+        if await self._client.connect() and not (resume and await self._resume()):
+            await self._client.setup()
+        self._poller.start()
+        self._supervisor.start()
+
+    def start(self, resume: bool = False):
+        """Starts the worker task on the running event loop (which sets up the client first)
+        """
+        if self._task is not None and not self._task.done():
+            return
+        self._running = True
+        self._task = asyncio.get_running_loop().create_task(self._run(resume), name=f"Task-Worker-{self._name}")
+
+    async def stop(self, timeout: float = 1.0):
+        """Stops the worker task, its poller and disconnects the client
+        """
+        self._running = False
+        self._poller.stop()
+        self._supervisor.stop()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        if self._client._connected:
+            await self._client.disconnect()
+
+    async def wait_for_status(self, condition, timeout: float = 5.0, period: float = 0.02) -> StatusSnapshot:
+        """Polls the status cache until the interpreted status satisfies the condition or the
+        timeout expires (does not access the client). Returns the latest snapshot either way
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._cache.latest()
+            if snapshot is not None and condition(snapshot.status):
+                return snapshot
+            if time.monotonic() + period > deadline:
+                return snapshot
+            await asyncio.sleep(period)
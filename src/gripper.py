@@ -6,14 +6,220 @@ __email__ = 'robotics.ref@qut.edu.au'
 
 # -- Imports from Base Definition and Custom Extensions
 from base import *
-from grippers import *
+from base.control import MAX_CONTROL_RATE
+from base.metrics import registry, render_stats
+from base.log import configure_logging, logging_stats, set_levels, check_levels
+from base.plugins import PluginRegistry
+from base.telemetry import TelemetryRecorder
+from base.sessions import POLICIES, POLICY_LAST_WRITER
+# Gripper types are imported on demand from the plugin entry points
+from grippers import PLUGINS
 # -- General imports
 from threading import Thread, Lock
 from queue import Queue
-import time, yaml, os, importlib, signal, sys
+import asyncio, time, yaml, os, signal, sys, math, logging
+
+log = logging.getLogger('gripper')
+
+# Maximum status updates pending for the interface
+OUTPUT_QUEUE_SIZE = 64
+# Settings only read on start up (a reload that changes them logs that a restart is needed)
+RESTART_KEYS: tuple = ('runtime', 'interface', 'async_interface', 'plugins', 'server', 'telemetry', 'metrics', 'reload')
 
 # Set the path to be the root of this package
 __path__ = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_PATH: str = __path__ + "/config/gripper.yaml"
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """Reads the gripper configuration file
+    """
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+def gripper_configs(config: dict) -> list:
+    """Returns the list of gripper entries (id plus connection parameters) from the config.
+    Fleet mode lists them under 'grippers'; otherwise a single 'default' gripper uses 'connection'
+    """
+    if config.get('grippers'):
+        return [dict(entry) for entry in config['grippers']]
+    return [dict(config.get('connection') or {}, id='default')]
+
+def plugin_registry(config: dict) -> PluginRegistry:
+    """The plugin registry of the built in gripper types, the types installed packages provide,
+    and any configured under 'plugins' (name: 'module:attribute')
+    """
+    plugins = PluginRegistry(PLUGINS)
+    plugins.discover()
+    for name, target in (config.get('plugins') or {}).items():
+        plugins.register(name, target)
+    return plugins
+
+def shared_ports(entries: list) -> set:
+    """The ports listed by more than one gripper entry (daisy-chained slaves sharing a bus)
+    """
+    ports = [entry.get('port') for entry in entries]
+    return {port for port in ports if port is not None and ports.count(port) > 1}
+
+def client_spec(config: dict, entry: dict, client_key: str) -> dict:
+    """The client and interpreter types and the client options of a gripper entry (a gripper
+    needs a new client if any of them change)
+    """
+    spec = dict(entry)
+    spec.pop('id', None)
+    # Per gripper type overrides (defaults to the top level types)
+    spec.setdefault('client', config[client_key])
+    spec.setdefault('interpreter', config['interpreter'])
+    return spec
+
+def create_worker(
+        plugins: PluginRegistry,
+        config: dict,
+        entry: dict,
+        worker_cls: type,
+        client_key: str,
+        recorder: TelemetryRecorder = None,
+        interpreter: Interpreter = None,
+        **client_kwargs
+    ):
+    """Creates a client (with its own interpreter, unless an existing one is carried over) and
+    its worker for one gripper entry (recording its commands and status if a telemetry recorder
+    is given)
+    """
+    spec = client_spec(config, entry, client_key)
+    client_name = spec.pop('client')
+    interpreter_name = spec.pop('interpreter')
+    # Create the interpreter for the gripper client comms
+    if interpreter is None:
+        interpreter = plugins.load(interpreter_name)()
+    # Create the client for the gripper (comms to gripper)
+    client = plugins.load(client_name)(
+        interpreter=interpreter,
+        **spec,
+        **client_kwargs
+    )
+    return worker_cls(
+        name=str(entry['id']),
+        client=client,
+        recorder=recorder,
+        **worker_options(config)
+    )
+
+def worker_options(config: dict) -> dict:
+    """Worker rates, outage policy and supervisor options from the config (these can change
+    while the worker runs, see ClientWorker.configure)
+    """
+    return {
+        'command_rate': config.get('command_rate', 50.0),
+        'status_rate': config.get('status_rate', 20.0),
+        'status_idle_rate': config.get('status_idle_rate', 2.0),
+        **supervisor_kwargs(config),
+        'control': control_kwargs(config),
+    }
+
+def control_kwargs(config: dict) -> dict:
+    """Control loop options from the config (the default rate is applied per request)
+    """
+    control = dict(config.get('control') or {})
+    control.pop('rate', None)
+    return control
+
+def create_control(plugins: PluginRegistry, config: dict, spec: dict) -> dict:
+    """Creates the controller of a control request ({'controller': name, 'rate': Hz, 'id': ...,
+    and the controller options}). Returns the request as the worker takes it. Only registered
+    controllers are created (the name comes from a client, so it is never imported as an entry
+    point). Raises ValueError for an unknown controller, invalid options or rate
+    """
+    options = dict(spec)
+    name = options.pop('controller', None)
+    control_id = options.pop('id', None)
+    rate = options.pop('rate', (config.get('control') or {}).get('rate', 50.0))
+    if not name or not isinstance(name, str):
+        raise ValueError(f"no controller named -> {name!r}")
+    if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 < rate <= MAX_CONTROL_RATE:
+        raise ValueError(f"control rate must be above 0 and at most {MAX_CONTROL_RATE} Hz -> {rate!r}")
+    for key, value in options.items():
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"{key} must be finite -> {value}")
+    controller_cls = plugins.load(name, strict=True)
+    if not isinstance(controller_cls, type) or not issubclass(controller_cls, Controller):
+        raise ValueError(f"'{name}' is not a controller")
+    try:
+        controller = controller_cls(**options)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"invalid options for {name} -> {e}")
+    return {'controller': controller, 'rate': float(rate), 'id': control_id}
+
+def supervisor_kwargs(config: dict) -> dict:
+    """Worker outage policy and connection supervisor options from the config
+    """
+    supervisor = dict(config.get('supervisor') or {})
+    kwargs: dict = {}
+    for key in ('policy', 'hold_timeout'):
+        if key in supervisor:
+            kwargs[key] = supervisor.pop(key)
+    kwargs['supervisor'] = supervisor
+    return kwargs
+
+def interface_kwargs(config: dict) -> dict:
+    """Interface options from the config (the websocket server and session options, and the per
+    client status update queue size). Raises ValueError for an unknown arbitration policy
+    """
+    broadcast = config.get('broadcast') or {}
+    server = dict(config.get('server') or {})
+    if server.get('policy', POLICY_LAST_WRITER) not in POLICIES:
+        raise ValueError(f"unknown arbitration policy -> {server['policy']}")
+    return {'queue_size': broadcast.get('queue_size', 8), **server}
+
+def broadcast_rate(config: dict) -> float:
+    """The rate (Hz) the gripper status is published to subscribed interface clients
+    """
+    return (config.get('broadcast') or {}).get('rate', 10.0)
+
+def reload_plan(old: dict, new: dict, client_key: str) -> tuple:
+    """Compares the grippers of a running and a changed config. Returns (build, removed, ports):
+    the ids of the grippers that need a new client (added, or their client spec changed), the ids
+    of those removed, and the shared ports affected. Grippers on a shared port share a transport,
+    so a change to any of them rebuilds them all (with a new bus scheduler)
+    """
+    old_entries: dict = {str(entry['id']): entry for entry in gripper_configs(old)}
+    new_entries: dict = {str(entry['id']): entry for entry in gripper_configs(new)}
+    removed = [name for name in old_entries if name not in new_entries]
+    build = [name for name, entry in new_entries.items() if name not in old_entries
+             or client_spec(old, old_entries[name], client_key) != client_spec(new, entry, client_key)]
+    shared = shared_ports(old_entries.values()) | shared_ports(new_entries.values())
+    ports = {entries[name].get('port') for entries in (old_entries, new_entries)
+             for name in build + removed if name in entries} & shared
+    build += [name for name, entry in new_entries.items() if entry.get('port') in ports and name not in build]
+    return build, removed, ports
+
+def restart_changes(old: dict, new: dict) -> list:
+    """The changed settings that only apply after a restart
+    """
+    changed = [key for key in RESTART_KEYS if old.get(key) != new.get(key)]
+    if (old.get('broadcast') or {}).get('queue_size') != (new.get('broadcast') or {}).get('queue_size'):
+        changed.append('broadcast.queue_size')
+    if (old.get('logging') or {}).get('queue_size') != (new.get('logging') or {}).get('queue_size'):
+        changed.append('logging.queue_size')
+    return changed
+
+def start_recorder(config: dict) -> TelemetryRecorder:
+    """Opens the telemetry recording if a path is configured (None otherwise). A relative path
+    is taken from the package root
+    """
+    telemetry = config.get('telemetry') or {}
+    if not telemetry.get('path'):
+        return None
+    path = os.path.join(__path__, telemetry['path'])
+    return TelemetryRecorder(path, max_bytes=int(telemetry.get('max_mb', 64) * 2**20))
+
+def start_metrics_server(config: dict, render_method) -> MetricsServer:
+    """Starts the Prometheus text endpoint if a metrics port is configured (None otherwise)
+    """
+    metrics = config.get('metrics') or {}
+    if not metrics.get('port'):
+        return None
+    server = MetricsServer(render_method, host=metrics.get('host', 'localhost'), port=metrics['port'])
+    return server if server.start() else None
 
 # NOTE: this should be a generic class that is configured for a particular interpreter and client from config
 class GripperHandler:
@@ -24,27 +230,44 @@ class GripperHandler:
         signal.signal(signal.SIGINT, self._exit_gracefully)
         signal.signal(signal.SIGTERM, self._exit_gracefully)
         # -- Prepare main object varibales for use
-        # The main client (gripper) object
-        self._client: Client = None
+        # The I/O worker for each configured gripper (client) keyed by gripper id
+        self._workers: dict = {}
+        # The gripper id used for commands that do not carry one
+        self._default_id: str = None
+        # The bus scheduler of each serial port shared by several grippers (slave ids)
+        self._buses: dict = {}
+        # Loads the configured gripper types (see create)
+        self._plugins: PluginRegistry = None
+        # The loaded configuration
+        self._config: dict = {}
         # Prepare comms between threads 
         self._input_q: Queue = Queue()
-        self._output_q: Queue = Queue()
+        # Status updates for the interface (bounded, the oldest is dropped when full)
+        self._output_q: Queue = Queue(maxsize=OUTPUT_QUEUE_SIZE)
         self._lock: Lock = Lock()
         # This will be updated to control thread for websocket
         self._interface_run: bool = True 
         self._interface_connection: bool = False
         self._interface_thread: Thread = None
+        # Prometheus text endpoint (if configured)
+        self._metrics_server: MetricsServer = None
+        # Records the commands and status of every gripper (if configured)
+        self._recorder: TelemetryRecorder = None
+        # Publishes the gripper status to the interface
+        self._publisher: StatusPublisher = None
+        # Applies changes to the config file (if watched)
+        self._watcher: ConfigWatcher = None
 
     def __del__(self):
         """Destructor
         """
-        print(f"[GRIPPER] Destructor Terminating Gracefully")
+        log.info("Destructor Terminating Gracefully")
         self._stop_threads()
 
     def _exit_gracefully(self, signum, frame):
         """Signal exit handling
         """
-        print(f"[GRIPPER] Terminating Gracefully")
+        log.info("Terminating Gracefully")
         self._stop_threads()
         sys.exit(0)
 
@@ -61,89 +284,458 @@ class GripperHandler:
         with self._lock:
             self._interface_connection = value
 
-    # TODO: If desired
-    def _client_connection_check(self): 
-        # attempt to connect to client
-        # If client is connected, update main thread
-        # If the client is disconnected, update main thread 
-        # Handle loop of 1 second (on checks)
-        pass
-
     def _stop_threads(self):
         """Stops any running threads
         """
-        print(f"[GRIPPER] Stopping Threads")
+        log.info("Stopping Threads")
+        if self._watcher is not None:
+            self._watcher.stop()
+        if self._publisher is not None:
+            self._publisher.stop()
+        for worker in self._workers.values():
+            worker.stop()
+        for bus in self._buses.values():
+            bus.stop()
+        if self._recorder is not None:
+            self._recorder.close()
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
         if self._interface_thread is not None and self._interface_thread.is_alive():
-            print(f"[GRIPPER] Stopping {self._interface_thread.name}")
+            log.info(f"Stopping {self._interface_thread.name}")
             self._interface_thread.join(1)
 
+    def _resolve_gripper(self, gripper_id: str = None) -> str:
+        """The id of the gripper interface data addressed to an id (None for unaddressed) is routed to
+        """
+        return gripper_id or self._default_id
+
+    def _route(self, interface_data: dict):
+        """Routes interface data to the worker of the addressed gripper (data that cannot be
+        routed is logged and dropped, so it never ends the routing loop)
+        """
+        for key in interface_data.keys():
+            try:
+                self._route_key(key, interface_data)
+            except Exception as e:
+                log.error(f"Dropped Interface Data ({key}) -> {type(e).__name__}: {e}")
+
+    def _route_key(self, key: str, interface_data: dict):
+        """Routes one key of the interface data
+        """
+        if key == 'termination':
+            # Handle interface temination (i.e., resetup for next connection)
+            log.info("Interface has Terminated. Handling Initialisation for new Connections")
+            # NOTE: placeholder for any additional functionaliy as desired
+        elif key in ('command', 'trajectory', 'stop', 'control'):
+            gripper_id = self._resolve_gripper(interface_data.get('gripper'))
+            worker = self._workers.get(gripper_id)
+            if worker is None:
+                log.error(f"Unknown Gripper {gripper_id}")
+                return
+            data = {key: interface_data[key]}
+            if key == 'control' and data['control'] is not None:
+                # Controllers are created here so an invalid request is rejected at once
+                try:
+                    data['control'] = create_control(self._plugins, self._config, data['control'])
+                except ValueError as e:
+                    log.error(f"Rejected Control Request -> {e}")
+                    if interface_data.get('reply') is not None:
+                        interface_data['reply']({'type': 'control', 'id': interface_data['control'].get('id'),
+                                                 'event': 'rejected', 'error': str(e)})
+                    return
+            if 'stamps' in interface_data:
+                data['stamps'] = interface_data['stamps']
+                data['stamps']['routed'] = time.monotonic()
+            if 'reply' in interface_data:
+                data['reply'] = interface_data['reply']
+            worker.put(data)
+        elif key in ('gripper', 'stamps', 'reply', 'session'):
+            # Routing, timing, reply and session information for a command
+            pass
+        else:
+            log.error(f"Unknown Interface State {key}")
+
+    def _build_workers(self, config: dict, worker_cls: type, client_key: str, buses: dict) -> tuple:
+        """Builds the workers of a changed config without touching the running ones: a new worker
+        for each gripper whose client changed (carrying its interpreter over if the type is
+        unchanged) and the running worker otherwise. Returns (workers, build, removed). Raises if
+        the config cannot be applied (the new workers are then discarded before starting)
+        """
+        # Every setting is checked before a worker is built or changed, so a rejected config
+        # leaves everything running as it was
+        options = worker_options(config)
+        worker_cls.validate(**options)
+        check_levels(config)
+        rate = broadcast_rate(config)
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)):
+            raise ValueError(f"broadcast.rate must be a number -> {rate!r}")
+        build, removed, _ = reload_plan(self._config, config, client_key)
+        old_specs: dict = {str(entry['id']): client_spec(self._config, entry, client_key) for entry in gripper_configs(self._config)}
+        workers: dict = {}
+        for entry in gripper_configs(config):
+            name = str(entry['id'])
+            if name not in build:
+                workers[name] = self._workers[name]
+                continue
+            interpreter = None
+            if name in self._workers and old_specs[name]['interpreter'] == client_spec(config, entry, client_key)['interpreter']:
+                interpreter = self._workers[name].get_client().get_interpreter()
+            bus_kwargs = {'bus': buses[entry['port']]} if entry.get('port') in buses else {}
+            workers[name] = create_worker(self._plugins, config, entry, worker_cls, client_key, self._recorder,
+                                          interpreter=interpreter, **bus_kwargs)
+        # Applies the (checked) options to the running workers
+        for name, worker in workers.items():
+            if name not in build:
+                worker.configure(**options)
+        return workers, build, removed
+
+    def _apply_settings(self, config: dict):
+        """Applies the logging levels and broadcast rate of a changed config, and logs the
+        changed settings that need a restart
+        """
+        for key in restart_changes(self._config, config):
+            log.warning(f"Config Reload: {key} changed (applies after a restart)")
+        set_levels(config, previous=self._config)
+        if self._publisher is not None:
+            self._publisher.set_rate(broadcast_rate(config))
+
     # -- Public Methods
     def run(self):
         while True:
             try:
                 # Blocking wait for interface data from interface thread implementation
-                print(f"[GRIPPER] Waiting for Interface Data")
                 interface_data = self._input_q.get(block=True)
-                print(f"[GRIPPER] Interface Data is {interface_data}")
                 # The interface data can be of any length as a dict 
-                for key in interface_data.keys():
-                    if key == 'termination':
-                        # Handle interface temination (i.e., resetup for next connection)
-                        print(f"[GRIPPER] Interface has Terminated. Handling Initialisation for new Connections")
-                        # NOTE: placeholder for any additional functionaliy as desired
-                    elif key == 'command':
-                        # check if the gripper is connected or not prior to proceeding
-                        if not self._client._connected:
-                            # Reset Procedure Actioned by Gripper
-                            self.setup()
-                        
-                        # Generate the command to send to the gripper and send said command (now in main thread)
-                        gripper_command = self._client.get_interpreter().generate_output(interface_data[key])
-                        self._client.send(gripper_command)
-                    else:
-                        print(f"[GRIPPER ERROR] Unknown Interface State {key}")
-
-                time.sleep(1)
+                self._route(interface_data)
             except KeyboardInterrupt:
                 break
+            except Exception as e:
+                log.error(f"Dropped Interface Data -> {type(e).__name__}: {e}")
 
         # If here, exit
-        self._exit_gracefully()
+        self._exit_gracefully(None, None)
 
-    def create(self):
+    def create(self, config: dict = None):
         # Read config and extract names
-        with open(__path__ + "/config/gripper.yaml", 'r') as f:
-            config = yaml.safe_load(f)
+        if config is None:
+            config = load_config()
+        self._config = config
         
-        # The main module for all object creators
-        module = importlib.import_module('grippers')
+        # Only the configured gripper types are imported
+        self._plugins = plugin_registry(config)
+        self._recorder = start_recorder(config)
 
-        # Create the client for the gripper (comms to gripper)
-        # Create the interpreter for the gripper client comms
-        self._client = getattr(module, config['client'])(
-            interpreter=getattr(module, config['interpreter'])()
-        )
+        # Grippers sharing a serial port (daisy-chained slaves) share one bus scheduler
+        entries = gripper_configs(config)
+        for port in shared_ports(entries):
+            self._buses[port] = BusScheduler(name=str(port))
+
+        # Create an independent I/O worker per gripper (one in single gripper mode)
+        for entry in entries:
+            bus_kwargs = {'bus': self._buses[entry['port']]} if entry.get('port') in self._buses else {}
+            worker = create_worker(self._plugins, config, entry, ClientWorker, 'client', self._recorder, **bus_kwargs)
+            self._workers[worker.name] = worker
+        self._default_id = next(iter(self._workers))
+        log.info(f"Configured Grippers: {list(self._workers.keys())}")
 
         # Create the control interface and start its thread
         self._interface_thread = Thread(
-            target=getattr(module, config['interface']), 
+            target=self._plugins.load(config['interface']),
             args=(
                 self._input_q,
                 self._output_q,
                 self._run_check_method,
                 self._connection_check_method,
                 ),
+            kwargs={'stats_method': self.get_report, 'resolve_method': self._resolve_gripper, **interface_kwargs(config)},
             daemon=True
         )
         self._interface_thread.start()
         self._interface_thread.name = "Thread-Control-Interface"
+        self._publisher = StatusPublisher(lambda: self._workers, self._output_q, rate=broadcast_rate(config))
+
+        # Serve the metrics for scraping if configured
+        self._metrics_server = start_metrics_server(config, self.get_metrics)
+
+    def watch(self, path: str = CONFIG_PATH):
+        """Watches the config file and applies its changes while running (see reload). Checked
+        at the configured reload interval (0 disables)
+        """
+        interval = (self._config.get('reload') or {}).get('interval', 1.0)
+        if not interval:
+            return
+        self._watcher = ConfigWatcher(path, load_config, self.reload, config=self._config, interval=interval)
+        self._watcher.start()
+
+    def reload(self, config: dict) -> bool:
+        """Applies a changed config while running. Rates, outage policy, supervisor options, the
+        broadcast rate and logging levels change in place. Only grippers whose client changed
+        (see reload_plan) get a new client, which takes over a gripper that is still activated;
+        added and removed grippers are started and stopped. The interface and its connections
+        are kept. Returns False (keeping the running config) if the config cannot be applied
+        """
+        try:
+            _, _, ports = reload_plan(self._config, config, 'client')
+            buses: dict = {port: self._buses[port] if port in self._buses and port not in ports else BusScheduler(name=str(port))
+                           for port in shared_ports(gripper_configs(config))}
+            workers, build, removed = self._build_workers(config, ClientWorker, 'client', buses)
+        except Exception as e:
+            # Any failure rejects the config (the watcher keeps running)
+            log.error(f"Config Reload Rejected -> {type(e).__name__}: {e}")
+            return False
+        self._apply_settings(config)
+
+        # Route to the new workers, then release the replaced clients (and their buses)
+        retired: list = [self._workers[name] for name in build + removed if name in self._workers]
+        retired_buses: list = [bus for port, bus in self._buses.items() if buses.get(port) is not bus]
+        self._workers = workers
+        self._buses = buses
+        self._default_id = next(iter(workers))
+        self._config = config
+        for worker in retired:
+            worker.stop()
+            worker.get_client().close()
+        for bus in retired_buses:
+            bus.close()
+        for name in build:
+            workers[name].start(resume=True)
+        log.info(f"Config Reloaded (new clients: {build}, removed: {removed})")
+        return True
+
+    def get_stats(self) -> dict:
+        """Returns the client, command dispatch and status polling counters per gripper
+        (and the utilisation of any shared bus)
+        """
+        stats: dict = {name: worker.stats for name, worker in self._workers.items()}
+        if self._buses:
+            stats['buses'] = {port: bus.stats for port, bus in self._buses.items()}
+        if self._publisher is not None:
+            stats['publisher'] = self._publisher.stats
+        stats['logging'] = logging_stats()
+        if self._plugins is not None:
+            stats['plugins'] = self._plugins.stats
+        if self._recorder is not None:
+            stats['telemetry'] = self._recorder.stats
+        if self._watcher is not None:
+            stats['config'] = self._watcher.stats
+        return stats
+
+    def get_report(self) -> dict:
+        """Returns the counters and a summary of the stage latency histograms (the 'stats' query)
+        """
+        return {'stats': self.get_stats(), 'latency': registry.snapshot()}
+
+    def get_metrics(self) -> str:
+        """Returns the stage latency histograms and counters in the Prometheus text format
+        """
+        return registry.render() + render_stats(self.get_stats())
+
+    def get_status(self, gripper_id: str = None) -> StatusSnapshot:
+        """Returns the latest cached status snapshot (does not access the client)
+        """
+        return self._workers[gripper_id or self._default_id].get_status()
+
+    def wait_for_status(self, condition, timeout: float = 5.0, gripper_id: str = None) -> StatusSnapshot:
+        """Waits on the status cache until the interpreted status satisfies the condition
+        (e.g., the interpreter's is_motion_complete). Returns the latest snapshot
+        """
+        return self._workers[gripper_id or self._default_id].wait_for_status(condition, timeout=timeout)
 
     def setup(self):
-        """Setup procedure for the gripper
+        """Setup procedure for the grippers (each worker sets up its gripper in its own thread)
+        """
+        log.info("Initialising...")
+        for worker in self._workers.values():
+            worker.start()
+        if self._publisher is not None:
+            self._publisher.start()
+
+# NOTE: asyncio runtime variant where a single event loop owns the interface, clients, pollers and dispatch
+class AsyncGripperHandler:
+    def __init__(self):
+        """Constructor
+        """
+        # -- Prepare main object varibales for use
+        # The I/O worker (task) for each configured gripper keyed by gripper id
+        self._workers: dict = {}
+        # Bus schedulers by shared port, as in the threaded handler. Buses are only shared in the
+        # threaded runtime (each async client owns its transport), so the map stays empty here
+        self._buses: dict = {}
+        # Loads the configured gripper types (see create)
+        self._plugins: PluginRegistry = None
+        self._default_id: str = None
+        # The control interface (served on the same event loop)
+        self._interface: AsyncInterface = None
+        # Prometheus text endpoint (if configured)
+        self._metrics_server: MetricsServer = None
+        # Records the commands and status of every gripper (if configured)
+        self._recorder: TelemetryRecorder = None
+        # Publishes the gripper status to the interface
+        self._publisher: AsyncStatusPublisher = None
+        # Applies changes to the config file (if watched, started on the running loop)
+        self._watcher: AsyncConfigWatcher = None
+        self._watch_path: str = None
+        # The loaded configuration
+        self._config: dict = {}
+        # Prepare comms between tasks (created on the running loop)
+        self._input_q: asyncio.Queue = None
+        self._output_q: asyncio.Queue = None
+        # This will be updated to control the interface handlers
+        self._interface_run: bool = True 
+        self._interface_connection: bool = False
+
+    # -- Private Methods (or abstraction methods)
+    def _run_check_method(self):
+        """Task method for getting class web socket run boolean
+        """
+        return self._interface_run
+
+    def _connection_check_method(self, value: bool):
+        """Task method for updating class web socket connection boolean
+        """
+        self._interface_connection = value
+
+    # Routing is shared with the threaded handler (worker.put does not block in either runtime)
+    _route = GripperHandler._route
+    _resolve_gripper = GripperHandler._resolve_gripper
+    # As is building the workers and applying the settings of a changed config
+    _build_workers = GripperHandler._build_workers
+    _apply_settings = GripperHandler._apply_settings
+
+    async def _stop(self):
+        """Stops any running tasks and the interface
+        """
+        log.info("Stopping Tasks")
+        self._interface_run = False
+        if self._watcher is not None:
+            self._watcher.stop()
+        if self._publisher is not None:
+            self._publisher.stop()
+        for worker in self._workers.values():
+            await worker.stop()
+        if self._recorder is not None:
+            self._recorder.close()
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
+        if self._interface is not None:
+            await self._interface.close()
+
+    # -- Public Methods
+    def create(self, config: dict = None):
+        # Read config and extract names
+        if config is None:
+            config = load_config()
+        self._config = config
+
+        # Only the configured gripper types are imported
+        self._plugins = plugin_registry(config)
+        self._recorder = start_recorder(config)
+        ports = shared_ports(gripper_configs(config))
+        if ports:
+            log.warning(f"Grippers Share Ports {sorted(map(str, ports))} Without a Bus Scheduler (threaded runtime only)")
+        # The interface is created on the running loop (see run)
+        self._interface_cls: type = self._plugins.load(config['async_interface'])
+
+    def watch(self, path: str = CONFIG_PATH):
+        """Watches the config file once running and applies its changes (see reload). Checked
+        at the configured reload interval (0 disables)
+        """
+        self._watch_path = path
+
+    async def reload(self, config: dict) -> bool:
+        """Applies a changed config on the running loop (see GripperHandler.reload). Returns
+        False (keeping the running config) if the config cannot be applied
+        """
+        try:
+            workers, build, removed = self._build_workers(config, AsyncClientWorker, 'async_client', self._buses)
+        except Exception as e:
+            log.error(f"Config Reload Rejected -> {type(e).__name__}: {e}")
+            return False
+        self._apply_settings(config)
+
+        retired: list = [self._workers[name] for name in build + removed if name in self._workers]
+        self._workers = workers
+        self._default_id = next(iter(workers))
+        self._config = config
+        for worker in retired:
+            await worker.stop()
+            await worker.get_client().close()
+        for name in build:
+            workers[name].start(resume=True)
+        log.info(f"Config Reloaded (new clients: {build}, removed: {removed})")
+        return True
+
+    def get_stats(self) -> dict:
+        """Returns the client, command dispatch and status polling counters per gripper
+        """
+        stats: dict = {name: worker.stats for name, worker in self._workers.items()}
+        if self._publisher is not None:
+            stats['publisher'] = self._publisher.stats
+        stats['logging'] = logging_stats()
+        if self._plugins is not None:
+            stats['plugins'] = self._plugins.stats
+        if self._recorder is not None:
+            stats['telemetry'] = self._recorder.stats
+        if self._watcher is not None:
+            stats['config'] = self._watcher.stats
+        return stats
+
+    get_report = GripperHandler.get_report
+    get_metrics = GripperHandler.get_metrics
+
+    def get_status(self, gripper_id: str = None) -> StatusSnapshot:
+        """Returns the latest cached status snapshot (does not access the client)
+        """
+        return self._workers[gripper_id or self._default_id].get_status()
+
+    async def wait_for_status(self, condition, timeout: float = 5.0, gripper_id: str = None) -> StatusSnapshot:
+        """Waits on the status cache until the interpreted status satisfies the condition
+        (e.g., the interpreter's is_motion_complete). Returns the latest snapshot
+        """
+        return await self._workers[gripper_id or self._default_id].wait_for_status(condition, timeout=timeout)
+
+    async def run(self):
+        """Serves the interface and routes commands to the gripper workers on the running event loop
         """
-        print(f"[GRIPPER] Initialising...")
-        self._client.connect()
-        self._client.setup()
+        # Async clients and queues are bound to the running loop so are created here
+        for entry in gripper_configs(self._config):
+            worker = create_worker(self._plugins, self._config, entry, AsyncClientWorker, 'async_client', self._recorder)
+            self._workers[worker.name] = worker
+        self._default_id = next(iter(self._workers))
+        log.info(f"Configured Grippers: {list(self._workers.keys())}")
+
+        self._input_q = asyncio.Queue()
+        self._output_q = asyncio.Queue(maxsize=OUTPUT_QUEUE_SIZE)
+        self._interface = self._interface_cls(
+            self._input_q,
+            self._output_q,
+            self._run_check_method,
+            self._connection_check_method,
+            stats_method=self.get_report,
+            resolve_method=self._resolve_gripper,
+            **interface_kwargs(self._config)
+        )
+        await self._interface._setup()
+        self._metrics_server = start_metrics_server(self._config, self.get_metrics)
+        log.info("Initialising...")
+        for worker in self._workers.values():
+            worker.start()
+        self._publisher = AsyncStatusPublisher(lambda: self._workers, self._output_q, rate=broadcast_rate(self._config))
+        self._publisher.start()
+        interval = (self._config.get('reload') or {}).get('interval', 1.0)
+        if self._watch_path is not None and interval:
+            self._watcher = AsyncConfigWatcher(self._watch_path, load_config, self.reload, config=self._config, interval=interval)
+            self._watcher.start()
+
+        try:
+            while True:
+                interface_data = await self._input_q.get()
+                try:
+                    self._route(interface_data)
+                except Exception as e:
+                    log.error(f"Dropped Interface Data -> {type(e).__name__}: {e}")
+        finally:
+            await self._stop()
 
 if __name__ == "__main__":
     # EXPECTED FUNCTIONALITY
@@ -151,11 +743,26 @@ if __name__ == "__main__":
     # [MAIN THREAD] Run a thread to handle connection to the gripper (client)
     # [NEW THREAD] Run a thread to handle connection to Interface (interface) 
     # If either thread has a connection issue, the other should run independently
+    config = load_config()
+    configure_logging(config)
+    if config.get('runtime', 'threaded') == 'asyncio':
+        # Single event loop owning the interface, client, poller and dispatch
+        gripper = AsyncGripperHandler()
+        gripper.create(config)
+        gripper.watch()
+        try:
+            asyncio.run(gripper.run())
+        except KeyboardInterrupt:
+            log.info("Terminating Gracefully")
+        sys.exit(0)
+
     # Setup the gripper and Object types 
     gripper = GripperHandler()
     # Initialise gripper through factory method
-    gripper.create()
+    gripper.create(config)
     # Setup the Gripper
     gripper.setup()
+    # Apply changes to the config file while running
+    gripper.watch()
     # Run the Gripper
     gripper.run()
@@ -1 +1,24 @@
-from grippers.robotiq import *
+from base.plugins import load_entry_point
+
+# Entry points ('module:attribute') of the gripper types that can be named in the config.
+# Modules are only imported when a type is first loaded (see base.plugins.PluginRegistry),
+# so add a new extension here rather than importing it.
+PLUGINS: dict = {
+    'RobotiqModbusSerialClient': 'grippers.robotiq.client:RobotiqModbusSerialClient',
+    'RobotiqAsyncModbusSerialClient': 'grippers.robotiq.client:RobotiqAsyncModbusSerialClient',
+    'RobotiqProcessClient': 'grippers.robotiq.process:RobotiqProcessClient',
+    'RobotiqInterpreter': 'grippers.robotiq.client:RobotiqInterpreter',
+    'GrasshopperInterface': 'grippers.robotiq.interface:GrasshopperInterface',
+    'AsyncGrasshopperInterface': 'grippers.robotiq.interface:AsyncGrasshopperInterface',
+    'CompliantGraspController': 'grippers.robotiq.control:CompliantGraspController',
+    'SlipReactionController': 'grippers.robotiq.control:SlipReactionController',
+}
+
+def __getattr__(name: str):
+    """Lazily loads a gripper type on attribute access (e.g., getattr(grippers, 'RobotiqInterpreter'))
+    """
+    if name in PLUGINS:
+        return load_entry_point(PLUGINS[name])
+    raise AttributeError(f"module 'grippers' has no attribute '{name}'")
+
+__all__ = list(PLUGINS)
@@ -1,8 +1,13 @@
-from grippers.robotiq.client import RobotiqModbusSerialClient, RobotiqInterpreter
-from grippers.robotiq.interface import GrasshopperInterface
-__all__ = [
-    'RobotiqModbusSerialClient', 
-    'GrasshopperInterface', 
-    'RobotiqInterpreter'
-]
+from base.plugins import load_entry_point
+from grippers import PLUGINS
 
+# The gripper types of this package (see grippers.PLUGINS), imported on first access so that
+# loading the client does not import the interface (and vice versa)
+_EXPORTS: dict = {name: target for name, target in PLUGINS.items() if target.startswith(f"{__name__}.")}
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return load_entry_point(_EXPORTS[name])
+    raise AttributeError(f"module 'grippers.robotiq' has no attribute '{name}'")
+
+__all__ = list(_EXPORTS)
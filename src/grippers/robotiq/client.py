@@ -37,167 +37,775 @@
 # Modifed from the orginal comModbusTcp by Kelsey Hawkins @ Georgia Tech
 # Modifed from the orginal by Dasun Gunasinghe (Adaptation to Generic Class Model)
 
-from base.client import Client, Interpreter
-from pymodbus.client import ModbusSerialClient
+from base.client import Client, AsyncClient, Interpreter
+from base.bus import BusScheduler
+from base.lanes import PRIORITY_MODE, PRIORITY_MOTION, PRIORITY_QUERY
+from base.timing import AdaptiveTimeout
+from grippers.robotiq.codec import InputMsg, OutputMsg, MESSAGE_BYTES, encode_output, to_registers, from_registers, decode_input
+from pymodbus.client import ModbusSerialClient, AsyncModbusSerialClient
 from pymodbus import ModbusException
-from dataclasses import dataclass
+from pymodbus.exceptions import ModbusIOException
 from math import ceil
+import asyncio, time, logging
+
+log = logging.getLogger(__name__)
+
+# InputMsg and OutputMsg (with their register codec) are defined in grippers.robotiq.codec
+
+# -- Command Tables
+# Legacy single character commands as (register, operation, value) updates
+_LEGACY_COMMANDS: dict = {
+    'a': (('rACT', 'set', 1), ('rGTO', 'set', 1), ('rSP', 'set', 255), ('rFR', 'set', 150)),
+    'r': (('rACT', 'set', 0),),
+    'c': (('rPR', 'set', 255),),
+    'o': (('rPR', 'set', 0),),
+    'f': (('rSP', 'add', 25),),
+    'l': (('rSP', 'add', -25),),
+    'i': (('rFR', 'add', 25),),
+    'd': (('rFR', 'add', -25),),
+}
+# Structured command actions (mapped onto the legacy commands)
+_ACTIONS: dict = {
+    'activate': 'a',
+    'reset': 'r',
+    'close': 'c',
+    'open': 'o',
+    'faster': 'f',
+    'slower': 'l',
+    'stronger': 'i',
+    'weaker': 'd',
+}
+# Structured command fields and the output register each sets
+_FIELDS: dict = {
+    'position': 'rPR',
+    'speed': 'rSP',
+    'force': 'rFR',
+    'go': 'rGTO',
+    'auto_release': 'rATR',
+}
+# Upper limit of each output register
+_LIMITS: dict = {'rACT': 1, 'rGTO': 1, 'rATR': 1, 'rPR': 255, 'rSP': 255, 'rFR': 255}
+
+# -- Transaction Timing
+# RTU frame sizes in bytes (request, response) of each operation on the 3 output/status registers
+_FRAME_BYTES: dict = {
+    'read': (8, 11),        # FC3 Read Holding Registers
+    'write': (15, 8),       # FC16 Write Multiple Registers
+    'readwrite': (19, 11),  # FC23 Read/Write Multiple Registers
+}
+# Exception codes worth retrying (0 is no response in the async client, 5/6 are acknowledge/busy)
+_TRANSIENT_CODES: tuple = (0, 5, 6)
+
+def _frame_floor(op: str, baudrate: int, bytesize: int, parity: str, stopbits: int, turnaround: float) -> float:
+    """The least time an operation can take: both frames on the wire, the 3.5 character silent
+    interval after each, and the device turnaround
+    """
+    character = (1 + bytesize + int(parity != 'N') + stopbits) / baudrate
+    request, response = _FRAME_BYTES[op]
+    return (request + response + 7) * character + turnaround
+
+def _is_transient(resp) -> bool:
+    """True for failures worth retrying: no valid response (a timeout or CRC error) or a busy device
+    """
+    if isinstance(resp, ModbusIOException):
+        return True
+    return resp is not None and resp.isError() and getattr(resp, 'exception_code', None) in _TRANSIENT_CODES
+
+def _changed_span(shadow: tuple, message: tuple) -> tuple:
+    """Returns the (first, last) slice of registers in message that differ from the shadow,
+    the full message if the shadow is unknown, or None if nothing changed
+    """
+    if shadow is None or len(shadow) != len(message):
+        return (0, len(message))
+    first, last = 0, len(message)
+    while first < last and message[first] == shadow[first]:
+        first += 1
+    if first == last:
+        return None
+    while message[last - 1] == shadow[last - 1]:
+        last -= 1
+    return (first, last)
+
+# --- Shared Client State
+class _RobotiqModbusState:
+    """The register shadow, counters and transaction bookkeeping shared by the sync and async
+    clients (which only differ in how they await the bus)
+    """
+    def _init_state(
+            self,
+            port: str,
+            slave_id: int,
+            baudrate: int,
+            bytesize: int,
+            parity: str,
+            stopbits: int,
+            timeout: float,
+            retries: int,
+            turnaround: float
+        ):
+        """Initialises the state common to both clients
+        """
+        # Serial parameters (from config)
+        self._port: str = port
+        self._slave_id: int = slave_id
+        # Read/Write Multiple Registers (FC23) support (disabled once the device answers it with
+        # Illegal Function)
+        self._fc23_supported: bool = True
+        # Shadow of the last acknowledged output registers (None when unknown)
+        self._shadow: tuple = None
+        # Write suppression counters
+        self._writes: int = 0
+        self._suppressed: int = 0
+        self._partial: int = 0
+        self._registers_saved: int = 0
+        # Modbus error counters (exception responses, transport exceptions and resends)
+        self._errors: int = 0
+        self._exceptions: int = 0
+        self._retries: int = 0
+        # Adaptive timeout per operation and the retry policy
+        self._timeout: float = timeout
+        self._timing: dict = {
+            op: AdaptiveTimeout(floor=_frame_floor(op, baudrate, bytesize, parity, stopbits, turnaround), ceiling=timeout)
+            for op in _FRAME_BYTES
+        }
+        self._max_retries: int = retries
+        self._timeouts: int = 0
+        self._retry_exhausted: int = 0
+
+    def _plan_write(self, command, force: bool) -> tuple:
+        """Returns the output registers of a command with the (first, last) span that differs from
+        the last acknowledged write (None if nothing changed, which is counted as suppressed), or
+        None if the command cannot be sent
+        """
+        if command is None:
+            log.error("Cannot Send as command is None")
+            return None
 
-# -- Message Definition
-@dataclass
-class InputMsg():
-    gACT: int = 0
-    gGTO: int = 0
-    gSTA: int = 0
-    gOBJ: int = 0
-    gFLT: int = 0
-    gPR: int = 0
-    gPO: int = 0
-    gCU: int = 0
-    
-@dataclass
-class OutputMsg():
-    rACT: int = 0
-    rGTO: int = 0
-    rATR: int = 0
-    rPR: int = 0
-    rSP: int = 0
-    rFR: int = 0
+        if not self._connected:
+            log.error("Cannot Send as Client is Not Connected")
+            return None
+
+        message = to_registers(command)
+        span = _changed_span(None if force else self._shadow, message)
+        if span is None:
+            self._suppressed += 1
+        return message, span
+
+    def _status_count(self, num_bytes: int) -> int:
+        """Returns the number of status registers to read for num_bytes (0 if the status cannot be read)
+        """
+        if num_bytes is None or num_bytes <= 0:
+            log.error(f"Cannot get status as num_bytes is invalid -> {num_bytes}")
+            return 0
+
+        if not self._connected:
+            log.error("Cannot get status as Client is Not Connected")
+            return 0
+        return int(ceil(num_bytes/2.0))
+
+    def _expired(self, timing: AdaptiveTimeout, attempt: int, op: str, resp):
+        """Records a transient failure of a transaction attempt (resent while retries remain)
+        """
+        self._timeouts += 1
+        timing.expire()
+        if attempt < self._max_retries:
+            self._retries += 1
+            log.debug("Transient %s Failure (%s). Resending", op, resp)
+
+    def _exhausted(self, op: str, resp) -> ModbusIOException:
+        """Returns the exception raised once a transaction has used up its retries
+        """
+        self._retry_exhausted += 1
+        return ModbusIOException(f"No valid {op} response after {self._max_retries} retries ({resp})")
+
+    def _link_failed(self, what: str, e: Exception, write: bool = True):
+        """Takes the link as down after a transport exception (a failed write leaves the device
+        output unknown)
+        """
+        log.error(f"ModbusException on {what} -> {e}")
+        self._exceptions += 1
+        self._connected = False
+        if write:
+            self._shadow = None
+
+    def _rejected(self, what: str, resp, write: bool = True):
+        """Records an error response (a rejected write leaves the device output unknown)
+        """
+        log.error(f"{what} Returned an Error -> {resp}")
+        self._errors += 1
+        if write:
+            self._shadow = None
+
+    def _fc23_rejected(self, resp) -> bool:
+        """True (and FC23 is given up) if the device answered it with Illegal Function (exception code 1)
+        """
+        if getattr(resp, 'exception_code', None) != 1:
+            return False
+        log.warning("FC23 not Supported. Falling Back to Separate Write/Read")
+        self._errors += 1
+        self._fc23_supported = False
+        return True
+
+    def _commit(self, message: tuple, first: int, last: int):
+        """Records an acknowledged write as the shadow of the output registers
+        """
+        self._shadow = message
+        self._writes += 1
+        if last - first < len(message):
+            self._partial += 1
+            self._registers_saved += len(message) - (last - first)
+
+    # -- Properties
+    @property
+    def stats(self) -> dict:
+        """Write suppression and Modbus error counters
+        """
+        return {
+            'writes': self._writes,
+            'suppressed': self._suppressed,
+            'partial': self._partial,
+            'registers_saved': self._registers_saved,
+            'errors': self._errors,
+            'exceptions': self._exceptions,
+            'retries': self._retries,
+            'timeouts': self._timeouts,
+            'retry_exhausted': self._retry_exhausted,
+            'timing': {op: timing.stats for op, timing in self._timing.items()},
+        }
 
 # --- Client Definition
-class RobotiqModbusSerialClient(Client):
-    def __init__(self, interpreter: Interpreter):
-        """Robotiq Client Initialiser
+class RobotiqModbusSerialClient(_RobotiqModbusState, Client):
+    def __init__(
+            self, 
+            interpreter: Interpreter, 
+            port: str = 'COM4', 
+            slave_id: int = 9, 
+            baudrate: int = 115200, 
+            bytesize: int = 8, 
+            parity: str = 'N', 
+            stopbits: int = 1, 
+            timeout: float = 0.5,
+            retries: int = 2,
+            turnaround: float = 0.01,
+            bus: BusScheduler = None
+        ):
+        """Robotiq Client Initialiser. The timeout is the longest a transaction is waited on
+        (transactions are timed out sooner once round-trip times are measured), retries bound the
+        resends of a transaction after a transient failure, and turnaround is the allowance for the
+        device to respond (added to the wire time of the frames for the least timeout)
         """
         super().__init__(interpreter=interpreter)
-        print(f"[CLIENT] Robotiq ModbusSerialClient Type Instantiated")
-        # TODO: config read in to get these params
-        self._client = ModbusSerialClient(
-            framer='rtu',
-            port='COM4',
-            stopbits=1,
-            bytesize=8,
-            baudrate=115200,
-            timeout=0.5,        
-        )
+        log.info(f"Robotiq ModbusSerialClient Type Instantiated on {port} (slave {slave_id})")
+        self._init_state(port, slave_id, baudrate, bytesize, parity, stopbits, timeout, retries, turnaround)
+        # The bus scheduler if the port is shared by several slaves (they share one transport)
+        self._bus: BusScheduler = bus
+        if bus is not None and bus.transport is not None:
+            self._client = bus.transport
+        else:
+            self._client = ModbusSerialClient(
+                framer='rtu',
+                port=port,
+                stopbits=stopbits,
+                bytesize=bytesize,
+                parity=parity,
+                baudrate=baudrate,
+                timeout=timeout,
+            )
+            if bus is not None:
+                bus.transport = self._client
+        self._applied: float = timeout
 
     def setup(self) -> bool:
         """Conducts required setup for the client
         """
         # Send the required initialise params
-        print(f"[CLIENT] Setup Procedure Starting...")
-        if not self.send(self._interpreter.generate_output('r')):
-            print(f"[CLIENT ERROR] Setup Procedure Failed to Send [r]")
+        log.info("Setup Procedure Starting...")
+        if not self.send(self._interpreter.generate_output('r'), force=True, priority=PRIORITY_MODE):
+            log.error("Setup Procedure Failed to Send [r]")
             return False
 
-        # TODO: Timeout needed?
-        time.sleep(1)
+        if not self._interpreter.is_reset(self.wait_until_reset()):
+            log.error("Setup Procedure Timed Out Waiting for Reset")
+            return False
     
-        if not self.send(self._interpreter.generate_output('a')):
-            print(f"[CLIENT ERROR] Setup Procedure Failed to Send [a]")
+        if not self.send(self._interpreter.generate_output('a'), force=True, priority=PRIORITY_MODE):
+            log.error("Setup Procedure Failed to Send [a]")
             return False
 
-        # TODO: Timeout needed?
-        time.sleep(1)
-        print(f"[CLIENT] Setup Procedure Completed")
+        if not self._interpreter.is_activated(self.wait_until_activated()):
+            log.error("Setup Procedure Timed Out Waiting for Activation")
+            return False
+        log.info("Setup Procedure Completed")
         return True
 
+    def wait_until_reset(self, timeout: float = 2.0) -> InputMsg:
+        """Waits until the gripper reports it is reset (gACT and gSTA cleared)
+        """
+        return self.wait_for(self._interpreter.is_reset, timeout=timeout)
+
+    def wait_until_activated(self, timeout: float = 5.0) -> InputMsg:
+        """Waits until the gripper reports activation is complete (gSTA of 3)
+        """
+        return self.wait_for(self._interpreter.is_activated, timeout=timeout)
+
+    def wait_until_motion_complete(self, timeout: float = 5.0) -> InputMsg:
+        """Waits until the requested position is reached or an object is detected (gOBJ)
+        """
+        return self.wait_for(self._interpreter.is_motion_complete, timeout=timeout)
+
+    def wait_until_fault_cleared(self, timeout: float = 2.0) -> InputMsg:
+        """Waits until the gripper reports no fault (gFLT of 0)
+        """
+        return self.wait_for(self._interpreter.is_fault_cleared, timeout=timeout)
+
     def connect(self) -> bool:
+        # A transport left open by a failed transaction is closed so the port is reopened
+        # (a shared transport is left to the other slaves on the bus)
+        if not self._connected and self._bus is None:
+            self._client.close()
+        # Connect with the configured timeout (transactions then adapt it)
+        self._apply_timeout(self._timeout)
         self._connected = self._client.connect()
-        print(f"[CLIENT CONNECTION] Status is {self._connected}")
+        # The device state is unknown after (re)connecting so the next write is always full
+        self._shadow = None
+        log.info("Connection Status is %s", self._connected)
         return self._connected
 
     def disconnect(self):
         if not self._connected:
-            print(f"[CLIENT ERROR] Cannot disconnect as not connected")
+            log.error("Cannot disconnect as not connected")
             return
 
-        self._client.close()
+        # A shared transport stays open for the other slaves on the bus
+        if self._bus is None:
+            self._client.close()
         self._connected = False
+        self._shadow = None
 
-    def send(self, command) -> bool:
-        if command is None:
-            print(f"[CLIENT ERROR] Cannot Send as command is None")
+    def _apply_timeout(self, timeout: float):
+        """Sets the response timeout of the transport (the port is only reconfigured on change)
+        """
+        self._client.comm_params.timeout_connect = timeout
+        if self._client.socket is not None and timeout != self._applied:
+            self._client.socket.timeout = timeout
+        self._applied = timeout
+
+    def _bus_wait(self) -> float:
+        """Longest wait for a transaction on a shared bus: this client's whole retry budget, plus
+        one transaction of another slave running ahead of it
+        """
+        return self._timeout * (self._max_retries + 2)
+
+    def _transact(self, fn, priority: int = PRIORITY_QUERY, op: str = 'read'):
+        """Runs a bus transaction with a timeout adapted to the measured round-trip time of the
+        operation. Transient failures (no response, CRC errors, a busy device) are resent up to
+        the retry limit, after which ModbusIOException is raised (the link is taken as down).
+        Runs through the bus scheduler when the port is shared with other slaves (served by
+        priority class, see base.lanes)
+        """
+        timing = self._timing[op]
+        for attempt in range(self._max_retries + 1):
+            timeout = timing.timeout()
+
+            def _attempt() -> tuple:
+                self._apply_timeout(timeout)
+                start = time.perf_counter()
+                try:
+                    resp = fn()
+                except ModbusIOException as e:
+                    resp = e
+                return resp, time.perf_counter() - start
+
+            if self._bus is not None:
+                try:
+                    resp, rtt = self._bus.submit(self._slave_id, _attempt, priority=priority, timeout=self._bus_wait())
+                except (RuntimeError, TimeoutError) as e:
+                    # The bus is stopped, or too busy to run the transaction in time
+                    raise ModbusIOException(f"{op} not run on the shared bus -> {e}")
+            else:
+                with self._lock:
+                    resp, rtt = _attempt()
+            if not _is_transient(resp):
+                if resp is not None and not resp.isError():
+                    timing.observe(rtt)
+                return resp
+
+            self._expired(timing, attempt, op, resp)
+        raise self._exhausted(op, resp)
+
+    def send(self, command, force: bool = False, priority: int = PRIORITY_MOTION) -> bool:
+        """Sends the command to the gripper, writing only the registers that differ from the 
+        last acknowledged write (no-op writes are suppressed unless forced)
+        """
+        plan = self._plan_write(command, force)
+        if plan is None:
             return False
+        message, span = plan
+        if span is None:
+            return True
 
-        if not self._connected:
-            print(f"[CLIENT ERROR] Cannot Send as Client is Not Connected")
+        first, last = span
+        resp = None
+        try:
+            # NOTE: value is the value to write
+            # NOTE: slave is the Modbus Slave ID
+            resp = self._transact(
+                lambda: self._client.write_registers(
+                    address=0x03E8 + first, 
+                    values=message[first:last], 
+                    slave=self._slave_id
+                ),
+                priority=priority,
+                op='write'
+            )
+        except ModbusException as e:
+            self._link_failed("Send", e)
+            return False
+
+        if resp is not None and resp.isError():
+            self._rejected("Send", resp)
             return False
 
-        if len(command) % 2 == 1:
-            command.append(0)
-        
-        # Initiate message and fill by combining two bytes in one register
-        message: list = []
-        for i in range(0, int(len(command)/2)):
-            message.append((command[2*i] << 8) + command[2*i+1])
+        self._commit(message, first, last)
+        return True
+
+    def get_status(self, num_bytes: int = 6, priority: int = PRIORITY_QUERY) -> bytes:
+        """Gets the status (bytes) from a connected Robotiq Gripper (empty on failure)
+        """
+        num_regs: int = self._status_count(num_bytes)
+        if not num_regs:
+            return b''
 
+        # Get the status from the device
+        resp = None
         try:
-            # NOTE: value is the value to write
+            # NOTE: count is the number of coils to read
             # NOTE: slave is the Modbus Slave ID
-            self._client.write_registers(
-                address=0x03E8, 
-                values=message, 
-                slave=9
+            resp = self._transact(
+                lambda: self._client.read_holding_registers(
+                    address=0x07D0,
+                    count=num_regs,
+                    slave=self._slave_id
+                ),
+                priority=priority,
+                op='read'
+            )
+        except ModbusException as e:
+            self._link_failed("Status Read", e, write=False)
+            return b''
+
+        if resp is None or resp.isError():
+            self._rejected("Status Read", resp, write=False)
+            return b''
+
+        log.debug("GOT: %s", resp)
+        # Output the result
+        return from_registers(resp.registers, num_regs)
+
+    def send_and_get_status(self, command, num_bytes: int = 6, force: bool = False, priority: int = PRIORITY_MOTION) -> bytes:
+        """Writes the command and reads the status in a single Read/Write Multiple 
+        Registers (FC23) transaction. Falls back to separate write and read transactions
+        if the device does not support FC23. An unchanged command only reads the status
+        """
+        if not self._fc23_supported:
+            if not self.send(command, force=force, priority=priority):
+                return b''
+            return self.get_status(num_bytes, priority=priority)
+
+        plan = self._plan_write(command, force)
+        if plan is None:
+            return b''
+        message, span = plan
+        if span is None:
+            return self.get_status(num_bytes, priority=priority)
+
+        first, last = span
+        num_regs: int = int(ceil(num_bytes/2.0))
+
+        resp = None
+        try:
+            # NOTE: the write is performed by the device before the read
+            resp = self._transact(
+                lambda: self._client.readwrite_registers(
+                    read_address=0x07D0,
+                    read_count=num_regs,
+                    write_address=0x03E8 + first,
+                    values=message[first:last],
+                    slave=self._slave_id
+                ),
+                priority=priority,
+                op='readwrite'
             )
-            return True
         except ModbusException as e:
-            print(f"[CLIENT ERROR] ModbusException on Send -> {e}")
-            self._connected = False
+            # No answer is a link failure (FC23 is only given up on an Illegal Function response)
+            self._link_failed("Send/Status", e)
+            return b''
+
+        if resp is None or resp.isError():
+            if self._fc23_rejected(resp):
+                return self.send_and_get_status(command, num_bytes, force=force, priority=priority)
+            self._rejected("Send/Status", resp)
+            return b''
+
+        self._commit(message, first, last)
+        return from_registers(resp.registers, num_regs)
+
+# --- Async Client Definition
+class RobotiqAsyncModbusSerialClient(_RobotiqModbusState, AsyncClient):
+    def __init__(
+            self, 
+            interpreter: Interpreter, 
+            port: str = 'COM4', 
+            slave_id: int = 9, 
+            baudrate: int = 115200, 
+            bytesize: int = 8, 
+            parity: str = 'N', 
+            stopbits: int = 1, 
+            timeout: float = 0.5,
+            retries: int = 2,
+            turnaround: float = 0.01
+        ):
+        """Robotiq Async Client Initialiser (see the RobotiqModbusSerialClient for the timing options)
+        """
+        super().__init__(interpreter=interpreter)
+        log.info(f"Robotiq AsyncModbusSerialClient Type Instantiated on {port} (slave {slave_id})")
+        self._init_state(port, slave_id, baudrate, bytesize, parity, stopbits, timeout, retries, turnaround)
+        self._client = AsyncModbusSerialClient(
+            framer='rtu',
+            port=port,
+            stopbits=stopbits,
+            bytesize=bytesize,
+            parity=parity,
+            baudrate=baudrate,
+            timeout=timeout,
+            # Requests are resent by this client after transient failures (see _transact)
+            retries=0,
+        )
+        # Serialises bus transactions between tasks (e.g., command dispatch and status polling)
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def setup(self) -> bool:
+        """Conducts required setup for the client
+        """
+        # Send the required initialise params
+        log.info("Setup Procedure Starting...")
+        if not await self.send(self._interpreter.generate_output('r'), force=True, priority=PRIORITY_MODE):
+            log.error("Setup Procedure Failed to Send [r]")
+            return False
+
+        if not self._interpreter.is_reset(await self.wait_until_reset()):
+            log.error("Setup Procedure Timed Out Waiting for Reset")
+            return False
+    
+        if not await self.send(self._interpreter.generate_output('a'), force=True, priority=PRIORITY_MODE):
+            log.error("Setup Procedure Failed to Send [a]")
             return False
 
-    def get_status(self, num_bytes: int = 6) -> list:
-        """Gets the status from a connected Robotiq Gripper 
+        if not self._interpreter.is_activated(await self.wait_until_activated()):
+            log.error("Setup Procedure Timed Out Waiting for Activation")
+            return False
+        log.info("Setup Procedure Completed")
+        return True
+
+    async def wait_until_reset(self, timeout: float = 2.0) -> InputMsg:
+        """Waits until the gripper reports it is reset (gACT and gSTA cleared)
         """
-        if num_bytes is None or num_bytes <= 0:
-            print(f"[CLIENT ERROR] Cannot get status as num_bytes is invalid -> {num_bytes}")
-            return [] 
-            
+        return await self.wait_for(self._interpreter.is_reset, timeout=timeout)
+
+    async def wait_until_activated(self, timeout: float = 5.0) -> InputMsg:
+        """Waits until the gripper reports activation is complete (gSTA of 3)
+        """
+        return await self.wait_for(self._interpreter.is_activated, timeout=timeout)
+
+    async def wait_until_motion_complete(self, timeout: float = 5.0) -> InputMsg:
+        """Waits until the requested position is reached or an object is detected (gOBJ)
+        """
+        return await self.wait_for(self._interpreter.is_motion_complete, timeout=timeout)
+
+    async def wait_until_fault_cleared(self, timeout: float = 2.0) -> InputMsg:
+        """Waits until the gripper reports no fault (gFLT of 0)
+        """
+        return await self.wait_for(self._interpreter.is_fault_cleared, timeout=timeout)
+
+    async def connect(self) -> bool:
+        # A transport left open by a failed transaction is closed so the port is reopened
         if not self._connected:
-            print(f"[CLIENT ERROR] Cannot get status as Client is Not Connected")
-            return [] 
+            self._client.close()
+        # Connect with the configured timeout (transactions then adapt it)
+        self._client.ctx.comm_params.timeout_connect = self._timeout
+        self._connected = await self._client.connect()
+        # The device state is unknown after (re)connecting so the next write is always full
+        self._shadow = None
+        log.info("Connection Status is %s", self._connected)
+        return self._connected
 
-        num_regs: int = int(ceil(num_bytes/2.0))
+    async def disconnect(self):
+        if not self._connected:
+            log.error("Cannot disconnect as not connected")
+            return
+
+        self._client.close()
+        self._connected = False
+        self._shadow = None
+
+    async def _transact(self, fn, op: str = 'read'):
+        """Awaits a bus transaction with a timeout adapted to the measured round-trip time of the
+        operation, resending after transient failures up to the retry limit (then raises
+        ModbusIOException). Transactions are serialised by the client lock
+        """
+        timing = self._timing[op]
+        for attempt in range(self._max_retries + 1):
+            async with self._lock:
+                self._client.ctx.comm_params.timeout_connect = timing.timeout()
+                start = time.perf_counter()
+                try:
+                    resp = await fn()
+                except ModbusIOException as e:
+                    resp = e
+                rtt = time.perf_counter() - start
+            if not _is_transient(resp):
+                if resp is not None and not resp.isError():
+                    timing.observe(rtt)
+                return resp
+
+            self._expired(timing, attempt, op, resp)
+        raise self._exhausted(op, resp)
+
+    async def send(self, command, force: bool = False, priority: int = PRIORITY_MOTION) -> bool:
+        """Sends the command to the gripper, writing only the registers that differ from the 
+        last acknowledged write (no-op writes are suppressed unless forced)
+        """
+        plan = self._plan_write(command, force)
+        if plan is None:
+            return False
+        message, span = plan
+        if span is None:
+            return True
+
+        first, last = span
+        resp = None
+        try:
+            # NOTE: value is the value to write
+            # NOTE: slave is the Modbus Slave ID
+            resp = await self._transact(
+                lambda: self._client.write_registers(
+                    address=0x03E8 + first, 
+                    values=message[first:last], 
+                    slave=self._slave_id
+                ),
+                op='write'
+            )
+        except ModbusException as e:
+            self._link_failed("Send", e)
+            return False
+
+        if resp is not None and resp.isError():
+            self._rejected("Send", resp)
+            return False
+
+        self._commit(message, first, last)
+        return True
+
+    async def get_status(self, num_bytes: int = 6, priority: int = PRIORITY_QUERY) -> bytes:
+        """Gets the status (bytes) from a connected Robotiq Gripper (empty on failure)
+        """
+        num_regs: int = self._status_count(num_bytes)
+        if not num_regs:
+            return b''
 
         # Get the status from the device
         resp = None
         try:
             # NOTE: count is the number of coils to read
             # NOTE: slave is the Modbus Slave ID
-            resp = self._client.read_holding_registers(
-                address=0x07D0,
-                count=num_regs,
-                slave=9
+            resp = await self._transact(
+                lambda: self._client.read_holding_registers(
+                    address=0x07D0,
+                    count=num_regs,
+                    slave=self._slave_id
+                ),
+                op='read'
             )
         except ModbusException as e:
-            print(f"[CLIENT ERROR] ModbusException on Status Read -> {e}")
-            self._connected = False
-            return list()
-
-        # Setup output and fill with bytes in correct order
-        # Two byte extraction
-        print(f"[CLIENT] GOT: {resp}")
-        output: list = []
-        for i in range(0, num_regs) :
-            output.append((resp.getRegister(i) & 0xFF00) >> 8)
-            output.append(resp.getRegister(i) & 0xFF00)
+            self._link_failed("Status Read", e, write=False)
+            return b''
+
+        if resp is None or resp.isError():
+            self._rejected("Status Read", resp, write=False)
+            return b''
+
         # Output the result
-        return output
+        return from_registers(resp.registers, num_regs)
+
+    async def send_and_get_status(self, command, num_bytes: int = 6, force: bool = False, priority: int = PRIORITY_MOTION) -> bytes:
+        """Writes the command and reads the status in a single Read/Write Multiple 
+        Registers (FC23) transaction. Falls back to separate write and read transactions
+        if the device does not support FC23. An unchanged command only reads the status
+        """
+        if not self._fc23_supported:
+            if not await self.send(command, force=force, priority=priority):
+                return b''
+            return await self.get_status(num_bytes, priority=priority)
+
+        plan = self._plan_write(command, force)
+        if plan is None:
+            return b''
+        message, span = plan
+        if span is None:
+            return await self.get_status(num_bytes, priority=priority)
+
+        first, last = span
+        num_regs: int = int(ceil(num_bytes/2.0))
+
+        resp = None
+        try:
+            # NOTE: the write is performed by the device before the read
+            resp = await self._transact(
+                lambda: self._client.readwrite_registers(
+                    read_address=0x07D0,
+                    read_count=num_regs,
+                    write_address=0x03E8 + first,
+                    values=message[first:last],
+                    slave=self._slave_id
+                ),
+                op='readwrite'
+            )
+        except ModbusException as e:
+            # No answer is a link failure (FC23 is only given up on an Illegal Function response)
+            self._link_failed("Send/Status", e)
+            return b''
+
+        if resp is None or resp.isError():
+            if self._fc23_rejected(resp):
+                return await self.send_and_get_status(command, num_bytes, force=force, priority=priority)
+            self._rejected("Send/Status", resp)
+            return b''
+
+        self._commit(message, first, last)
+        return from_registers(resp.registers, num_regs)
 
 # --- Interpreter Definition
 class RobotiqInterpreter(Interpreter):
     def __init__(self):
         super().__init__()
-        print(f"[INTERPRETER] Robotiq Type Instantiated")
+        log.info("Robotiq Type Instantiated")
         self._command: OutputMsg = OutputMsg()
+        # Output messages are packed into one reused buffer, returned as a read-only view
+        self._buffer: bytearray = bytearray(MESSAGE_BYTES)
+        self._view: memoryview = memoryview(self._buffer).toreadonly()
 
     def verify_output(self, command: OutputMsg) -> OutputMsg:
         """Confirms if the output message is within required bounds
         """
         if not isinstance(command, OutputMsg):
-            print(f"[INTERPRETER ERROR] Cannot verify unknown type -> {command}. Expecting type {type(OutputMsg)}")
+            log.error(f"Cannot verify unknown type -> {command}. Expecting type {type(OutputMsg)}")
             return None
 
+        # Commands are almost always in range, so only clamp when one is not
+        if (0 <= command.rACT <= 1 and 0 <= command.rGTO <= 1 and 0 <= command.rATR <= 1
+                and 0 <= command.rPR <= 255 and 0 <= command.rSP <= 255 and 0 <= command.rFR <= 255):
+            return command
+
         # Verify if each variable is in the correct range
         command.rACT = max(0, command.rACT)
         command.rACT = min(1, command.rACT)
@@ -220,91 +828,161 @@ class RobotiqInterpreter(Interpreter):
         # Return the verified command
         return command 
 
-    def refresh_output(self, command: OutputMsg) -> list:
-        """Refreshes/prepares output message into required type for sending 
+    def refresh_output(self, command: OutputMsg) -> memoryview:
+        """Refreshes/prepares output message into required type for sending. Returns a read-only
+        view of the reused output buffer (no copy), valid until the next output is generated:
+        take bytes() of it to keep it
         """
         if not isinstance(command, OutputMsg):
-            print(f"[INTERPRETER ERROR] Cannot refresh command as it is incorrect type {type(command)}")
-            return []
+            log.error(f"Cannot refresh command as it is incorrect type {type(command)}")
+            return b''
 
         # Limit the value of each variable
         command = self.verify_output(command)
 
-        # Create message list from verified command
-        message: list = []
-        message.append(command.rACT + (command.rGTO << 3) + (command.rATR << 4))
-        message.append(0)
-        message.append(0)
-        message.append(command.rPR)
-        message.append(command.rSP)
-        message.append(command.rFR)  
-
-        return message
-
-    def interpret_input(self, value: list = []) -> InputMsg:
-        message = InputMsg()
-        if value is None or value == list():
-            print(f"[INTERPRETER ERROR] Client Message is Empty")
-            return message
-
-        message.gACT = (value[0] >> 0) & 0x01
-        message.gGTO = (value[0] >> 3) & 0x01
-        message.gSTA = (value[0] >> 4) & 0x03
-        message.gOBJ = (value[0] >> 6) & 0x03
-        message.gFLT =  value[2]
-        message.gPR  =  value[3]
-        message.gPO  =  value[4]
-        message.gCU  =  value[5]
-
-        return message
-
-    def generate_output(self, value: str) -> list:
-        # The following is existing functionality
-        if value == 'a':
-            self._command.rACT = 1
-            self._command.rGTO = 1
-            self._command.rSP  = 255
-            self._command.rFR  = 150
-        elif value == 'r':
-            self._command.rACT = 0
-
-        if value == 'c':
-            self._command.rPR = 255
-
-        if value == 'o':
-            self._command.rPR = 0   
-
-        #If the command entered is a int, assign this value to rPRA
-        if value.isnumeric():
-            self._command.rPR = int(value)
-            # Clamping behaviour
-            if self._command.rPR > 255:
-                self._command.rPR = 255
-            if self._command.rPR < 0:
-                self._command.rPR = 0
-            
-        if value == 'f':
-            self._command.rSP += 25
-            if self._command.rSP > 255:
-                self._command.rSP = 255
-                
-        if value == 'l':
-            self._command.rSP -= 25
-            if self._command.rSP < 0:
-                self._command.rSP = 0
-
-        if value == 'i':
-            self._command.rFR += 25
-            if self._command.rFR > 255:
-                self._command.rFR = 255
-                
-        if value == 'd':
-            self._command.rFR -= 25
-            if self._command.rFR < 0:
-                self._command.rFR = 0
+        # Pack the verified command into the reused buffer
+        encode_output(command, self._buffer)
+        return self._view
+
+    def decode_output(self, message: bytes) -> dict:
+        """Returns the structured command that reproduces an output message (e.g., a recorded
+        write): its fields, with a reset action if activation is not requested
+        """
+        if message is None or len(message) < 6:
+            log.error(f"Cannot decode output message -> {message}")
+            return None
+        command: dict = {
+            'go': (message[0] >> 3) & 0x01,
+            'auto_release': (message[0] >> 4) & 0x01,
+            'position': message[3],
+            'speed': message[4],
+            'force': message[5],
+        }
+        if not message[0] & 0x01:
+            command['action'] = 'reset'
+        return command
+
+    def interpret_input(self, value: bytes = b'') -> InputMsg:
+        if not value:
+            log.error("Client Message is Empty")
+            return InputMsg()
+
+        return decode_input(value)
+
+    def is_reset(self, status: InputMsg) -> bool:
+        """The gripper is reset once activation and the activation status are cleared
+        """
+        return isinstance(status, InputMsg) and status.gACT == 0 and status.gSTA == 0
+
+    def is_activated(self, status: InputMsg) -> bool:
+        """The gripper is activated once the activation status reports complete
+        """
+        return isinstance(status, InputMsg) and status.gACT == 1 and status.gSTA == 3
+
+    def is_activation_lost(self, status: InputMsg) -> bool:
+        """Activation was lost (e.g., the gripper was power cycled) if the gripper reports reset
+        while the last output still requests activation (a requested reset is not a loss)
+        """
+        return self._command.rACT == 1 and self.is_reset(status)
+
+    def resume(self, status: InputMsg) -> bool:
+        """An activated gripper is taken over as it is. An output not yet requesting activation
+        is set as the setup would leave it, holding the position the gripper reports as requested
+        """
+        if not self.is_activated(status):
+            return False
+        if self._command.rACT != 1:
+            self.generate_output('a')
+            self._command.rPR = status.gPR
+        return True
+
+    def is_motion_complete(self, status: InputMsg) -> bool:
+        """Motion is complete once the fingers stop at the requested position or on an object
+        (gOBJ of 1/2 is an object detected while opening/closing, 3 is the requested position)
+        """
+        return isinstance(status, InputMsg) and status.gOBJ in (1, 2, 3)
+
+    def is_fault_cleared(self, status: InputMsg) -> bool:
+        """The gripper reports no fault
+        """
+        return isinstance(status, InputMsg) and status.gFLT == 0
+
+    def is_moving(self, status: InputMsg) -> bool:
+        """The gripper is in motion while activating or while going to a requested position
+        (gOBJ of 0 indicates fingers are in motion with no object detected)
+        """
+        if not isinstance(status, InputMsg):
+            return False
+        return status.gSTA == 1 or (status.gGTO == 1 and status.gOBJ == 0)
+
+    def stop_command(self, status: InputMsg):
+        """Holds the fingers at their current position
+        """
+        if not isinstance(status, InputMsg):
+            return None
+        return {'position': status.gPO}
+
+    def is_barrier(self, value) -> bool:
+        """Reset and activate change the gripper state and must be sent in order
+        (a structured command or batch is a barrier if it contains either)
+        """
+        if isinstance(value, str):
+            return value in ('r', 'a')
+        if isinstance(value, dict):
+            action = value.get('action')
+            return isinstance(action, str) and _ACTIONS.get(action, action) in ('r', 'a')
+        if isinstance(value, (list, tuple)):
+            return any(self.is_barrier(item) for item in value)
+        return False
+
+    def _operations(self, value) -> list:
+        """Resolves a command into its (register, operation, value) updates. A command is a
+        legacy string ('a', 'o', '128', ...), a structured dict of fields (position, speed,
+        force, ...) with an optional action, or a list (batch) of commands applied in order
+        """
+        if isinstance(value, str):
+            if value.isdecimal():
+                try:
+                    return [('rPR', 'set', int(value))]
+                except ValueError:
+                    # Beyond the integer string conversion limit
+                    log.error(f"Ignoring invalid position -> {value[:16]}...")
+                    return []
+            return list(_LEGACY_COMMANDS.get(value, ()))
+        if isinstance(value, dict):
+            operations: list = []
+            if 'action' in value:
+                action = value['action']
+                if isinstance(action, str):
+                    operations += self._operations(_ACTIONS.get(action, action))
+                else:
+                    log.error(f"Ignoring invalid action -> {action!r}")
+            for field, register in _FIELDS.items():
+                if field in value:
+                    try:
+                        operations.append((register, 'set', int(value[field])))
+                    except (TypeError, ValueError, OverflowError):
+                        log.error(f"Ignoring invalid {field} -> {value[field]}")
+            return operations
+        if isinstance(value, (list, tuple)):
+            return [operation for item in value for operation in self._operations(item)]
+        log.error(f"Cannot generate output for unknown command type {type(value)}")
+        return []
+
+    def generate_output(self, value) -> memoryview:
+        """Applies a command (or a batch of commands) to the current output message and
+        returns the resulting message, so a whole batch results in a single write (a view valid
+        until the next output is generated, see refresh_output)
+        """
+        for register, operation, operand in self._operations(value):
+            current = getattr(self._command, register)
+            result = operand if operation == 'set' else current + operand
+            # Clamping behaviour (applied per operation)
+            setattr(self._command, register, min(max(result, 0), _LIMITS[register]))
 
         output = self.refresh_output(self._command)
-        print(f"[CLIENT] Generated Output: {output} | value: {value}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Generated Output: %s | value: %s", output.hex(), value)
         return output
 
 
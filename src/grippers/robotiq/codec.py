@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+# Robotiq register codec. Output (request) and input (status) messages are 6 bytes, held by the
+# gripper as 3 big-endian registers:
+#   output: [rACT | rGTO << 3 | rATR << 4, 0, 0, rPR, rSP, rFR]
+#   input:  [gACT | gGTO << 3 | gSTA << 4 | gOBJ << 6, 0, gFLT, gPR, gPO, gCU]
+# Messages are packed with precompiled structs (into a caller's buffer where given) and decoded
+# from bytes or registers without intermediate lists. Many status samples (e.g., a telemetry
+# window) can be decoded at once with NumPy (imported on first use).
+
+from dataclasses import dataclass
+import struct
+
+MESSAGE_BYTES = 6
+NUM_REGISTERS = 3
+_MESSAGE: struct.Struct = struct.Struct('>6B')
+_REGISTERS: struct.Struct = struct.Struct('>3H')
+# Status byte, reserved byte, gFLT, gPR, gPO and gCU
+_INPUT: struct.Struct = struct.Struct('>BxBBBB')
+
+# -- Message Definition
+@dataclass(slots=True)
+class InputMsg():
+    gACT: int = 0
+    gGTO: int = 0
+    gSTA: int = 0
+    gOBJ: int = 0
+    gFLT: int = 0
+    gPR: int = 0
+    gPO: int = 0
+    gCU: int = 0
+
+@dataclass(slots=True)
+class OutputMsg():
+    rACT: int = 0
+    rGTO: int = 0
+    rATR: int = 0
+    rPR: int = 0
+    rSP: int = 0
+    rFR: int = 0
+
+# -- Encoding
+def encode_output(message: OutputMsg, buffer: bytearray = None) -> bytearray:
+    """Packs an output message into a 6 byte buffer (a new one unless given). Fields are
+    expected within their limits (see RobotiqInterpreter.verify_output)
+    """
+    if buffer is None:
+        buffer = bytearray(MESSAGE_BYTES)
+    _MESSAGE.pack_into(buffer, 0, message.rACT | (message.rGTO << 3) | (message.rATR << 4), 0, 0,
+                       message.rPR, message.rSP, message.rFR)
+    return buffer
+
+def to_registers(message) -> tuple:
+    """The registers holding a 6 byte message (bytes-like, or a list of byte values)
+    """
+    if not isinstance(message, (bytes, bytearray, memoryview)):
+        message = _MESSAGE.pack(*message)
+    return _REGISTERS.unpack(message)
+
+def from_registers(registers, count: int = NUM_REGISTERS) -> bytes:
+    """The message held by the first count registers (6 bytes by default)
+    """
+    if count == NUM_REGISTERS:
+        return _REGISTERS.pack(registers[0], registers[1], registers[2])
+    return struct.pack(f'>{count}H', *registers[:count])
+
+# -- Decoding
+# (gACT, gGTO, gSTA, gOBJ) of each status byte value
+_STATUS: tuple = tuple((status & 0x01, (status >> 3) & 0x01, (status >> 4) & 0x03, (status >> 6) & 0x03)
+                       for status in range(256))
+
+def _decode_status(message: InputMsg, status: int, fault: int, position_request: int, position: int, current: int) -> InputMsg:
+    if message is None:
+        return InputMsg(*_STATUS[status], fault, position_request, position, current)
+    message.gACT, message.gGTO, message.gSTA, message.gOBJ = _STATUS[status]
+    message.gFLT = fault
+    message.gPR = position_request
+    message.gPO = position
+    message.gCU = current
+    return message
+
+def decode_input(value, message: InputMsg = None) -> InputMsg:
+    """Decodes a 6 byte status (bytes-like, or a list of byte values) into an input message
+    (a new one unless given)
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _decode_status(message, *_INPUT.unpack_from(value))
+    return _decode_status(message, value[0], value[2], value[3], value[4], value[5])
+
+def decode_registers(registers, message: InputMsg = None) -> InputMsg:
+    """Decodes the 3 status registers (e.g., a read response's registers) into an input message
+    """
+    return _decode_status(message, registers[0] >> 8, registers[1] >> 8, registers[1] & 0x00FF,
+                          registers[2] >> 8, registers[2] & 0x00FF)
+
+def decode_inputs(samples, registers: bool = False) -> dict:
+    """Decodes many status samples at once into NumPy arrays (one per InputMsg field). Samples
+    are rows of at least 6 status bytes (e.g., the data of a telemetry window), or of at least
+    3 status registers if registers is set. Raises ValueError for samples that are not integers
+    within the byte (or register) range
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("numpy is required to decode status samples in bulk") from None
+    samples = np.asarray(samples)
+    if samples.ndim != 2:
+        raise ValueError(f"expected a 2D array of samples, got shape {samples.shape}")
+    width, dtype = (NUM_REGISTERS, np.uint16) if registers else (MESSAGE_BYTES, np.uint8)
+    if samples.shape[1] < width:
+        raise ValueError(f"expected rows of at least {width} {'registers' if registers else 'bytes'}, got {samples.shape[1]}")
+    if samples.dtype != dtype:
+        limit = np.iinfo(dtype).max
+        if samples.dtype.kind not in 'iu' or (samples.size and (samples.min() < 0 or samples.max() > limit)):
+            raise ValueError(f"expected {'registers' if registers else 'bytes'} (integers within 0-{limit}), got {samples.dtype}")
+    if registers:
+        # Big-endian on the wire
+        samples = samples[:, :NUM_REGISTERS].astype('>u2').view(np.uint8)
+    elif samples.dtype != dtype:
+        samples = samples.astype(dtype)
+    status = samples[:, 0]
+    return {
+        'gACT': status & 0x01,
+        'gGTO': (status >> 3) & 0x01,
+        'gSTA': (status >> 4) & 0x03,
+        'gOBJ': (status >> 6) & 0x03,
+        'gFLT': samples[:, 2].copy(),
+        'gPR': samples[:, 3].copy(),
+        'gPO': samples[:, 4].copy(),
+        'gCU': samples[:, 5].copy(),
+    }
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+from base.control import Controller
+from grippers.robotiq.codec import InputMsg
+
+# Most ticks a grasp may wait for contact to settle
+MAX_SETTLE_TICKS = 10000
+
+def _option(name: str, value, minimum: int = 0, maximum: int = 255) -> int:
+    """Returns a controller option as an int. Raises ValueError unless it is a number within
+    [minimum, maximum] (a register value by default)
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not minimum <= value <= maximum:
+        raise ValueError(f"{name} must be a number within [{minimum}, {maximum}] -> {value!r}")
+    return int(value)
+
+# --- Controller Definitions
+class CompliantGraspController(Controller):
+    """Force limited grasp: the requested position is stepped towards the target each tick
+    (rather than requested at once) while the motor current (gCU) stays below current_limit.
+    On contact (the limit reached, or an object detected) the fingers are held where they are
+    with hold_force, and the grasp completes once contact has held for settle_ticks. The grasp
+    also completes if the fingers reach the target without contact
+    """
+    def __init__(
+            self,
+            position: int = 255,
+            speed: int = 255,
+            force: int = 100,
+            current_limit: int = 40,
+            step: int = 4,
+            hold_force: int = 20,
+            settle_ticks: int = 5
+        ):
+        """Constructor (positions, speed and force are register values, current_limit is gCU)
+        """
+        super().__init__()
+        self._target: int = _option('position', position)
+        self._speed: int = _option('speed', speed)
+        self._force: int = _option('force', force)
+        self._current_limit: int = _option('current_limit', current_limit)
+        self._step: int = _option('step', step, minimum=1)
+        self._hold_force: int = _option('hold_force', hold_force)
+        self._settle_ticks: int = _option('settle_ticks', settle_ticks, minimum=1, maximum=MAX_SETTLE_TICKS)
+        self._setpoint: int = 0
+        # Position the fingers are held at once contact is made
+        self._contact: int = None
+        self._held: int = 0
+        self._peak_current: int = 0
+        self._status: InputMsg = None
+
+    # -- Public Methods
+    def start(self, status: InputMsg):
+        self._setpoint = status.gPO
+
+    def update(self, status: InputMsg, dt: float):
+        self._status = status
+        self._peak_current = max(self._peak_current, status.gCU)
+        if self._contact is None and (status.gCU >= self._current_limit or status.gOBJ in (1, 2)):
+            self._contact = status.gPO
+        if self._contact is not None:
+            self._held += 1
+            self.done = self._held >= self._settle_ticks
+            return {'position': self._contact, 'force': self._hold_force, 'go': 1}
+        if status.gOBJ == 3 and status.gPR == self._target:
+            self.done = True
+            return None
+        # Step the setpoint towards the target
+        if self._setpoint < self._target:
+            self._setpoint = min(self._target, self._setpoint + self._step)
+        else:
+            self._setpoint = max(self._target, self._setpoint - self._step)
+        return {'position': self._setpoint, 'speed': self._speed, 'force': self._force, 'go': 1}
+
+    # -- Properties
+    @property
+    def result(self) -> dict:
+        return {
+            'contact': self._contact is not None,
+            'position': self._status.gPO if self._status is not None else None,
+            'peak_current': self._peak_current,
+        }
+
+class SlipReactionController(Controller):
+    """Holds an object and reacts to slip: the fingers close on the object with force, and
+    whenever a held object slips (the fingers move on by more than tolerance, or object
+    contact is lost) the force is raised by force_step (up to max_force) and the grip is
+    re-closed. Runs until cancelled, or completes if the fingers reach the target without
+    an object (none grasped, or it was lost)
+    """
+    def __init__(
+            self,
+            position: int = 255,
+            speed: int = 255,
+            force: int = 50,
+            force_step: int = 25,
+            max_force: int = 255,
+            tolerance: int = 2
+        ):
+        """Constructor (positions, speed and forces are register values)
+        """
+        super().__init__()
+        self._target: int = _option('position', position)
+        self._speed: int = _option('speed', speed)
+        self._force: int = _option('force', force)
+        self._force_step: int = _option('force_step', force_step)
+        self._max_force: int = _option('max_force', max_force)
+        self._tolerance: int = _option('tolerance', tolerance)
+        # Finger position when the object was gripped (None while closing)
+        self._grip: int = None
+        self._closing: bool = False
+        self._slips: int = 0
+        self._lost: bool = False
+
+    # -- Private Methods
+    def _close(self) -> dict:
+        self._closing = True
+        return {'position': self._target, 'speed': self._speed, 'force': self._force, 'go': 1}
+
+    # -- Public Methods
+    def update(self, status: InputMsg, dt: float):
+        if not self._closing:
+            return self._close()
+        if self._grip is None:
+            if status.gOBJ == 2:
+                self._grip = status.gPO
+            elif status.gOBJ == 3 and status.gPR == self._target:
+                # Closed fully on nothing
+                self._lost = True
+                self.done = True
+            return None
+        if status.gOBJ != 2 or status.gPO > self._grip + self._tolerance:
+            self._slips += 1
+            self._grip = None
+            self._force = min(self._max_force, self._force + self._force_step)
+            return self._close()
+        return None
+
+    # -- Properties
+    @property
+    def result(self) -> dict:
+        return {'slips': self._slips, 'force': self._force, 'lost': self._lost}
@@ -6,11 +6,273 @@ __email__ = 'robotics.ref@qut.edu.au'
 
 import asyncio
 import websockets
+import json
+import logging
+import math
 import os
+import struct
+import time
 from threading import Thread
 from queue import Queue, Empty
 from typing import Callable 
-from base.interface import Interface 
+from urllib.parse import urlsplit, parse_qs
+from base.interface import Interface, AsyncInterface
+from base.broadcast import StatusBroadcaster, Subscriber
+from base.sessions import Session, SessionManager, POLICY_LAST_WRITER, ROLE_CONTROLLER
+
+log = logging.getLogger(__name__)
+
+# Message that queries the handler statistics instead of commanding a gripper
+STATS_QUERY = 'stats'
+# Messages that start ('subscribe' or 'subscribe changes' for change-only updates) or stop
+# the status updates pushed to a client
+SUBSCRIBE = 'subscribe'
+UNSUBSCRIBE = 'unsubscribe'
+# Message that stops the gripper (cancelling any running trajectory)
+STOP = 'stop'
+# Messages that query the client's session, or take and release control of a gripper (exclusive
+# policy, e.g., 'lock' for the default gripper or 'lock left'). A client connects as an observer
+# with the 'role=observer' query (e.g., ws://host:8001/?role=observer)
+SESSION_QUERY = 'session'
+LOCK = 'lock'
+UNLOCK = 'unlock'
+# Close code sent to a client that cannot be given a session (session limit reached, unknown role)
+CLOSE_TRY_AGAIN = 1013
+CLOSE_POLICY = 1008
+
+# Binary frames: a version byte, the gripper id length and id (utf-8, empty for the default
+# gripper), then records of (flags, position, speed, force) bytes. The flags select the fields
+# a record sets and its action (reset is applied before activate, both before the fields)
+BINARY_VERSION = 0x01
+_BINARY_RECORD = struct.Struct('BBBB')
+_BINARY_ACTIONS = ((0x20, 'reset'), (0x10, 'activate'))
+_BINARY_FIELDS = ((0x01, 'position', 1), (0x02, 'speed', 2), (0x04, 'force', 3))
+# Structured command fields and the (minimum, maximum) of their register values
+_COMMAND_RANGES: dict = {'position': (0, 255), 'speed': (0, 255), 'force': (0, 255), 'go': (0, 1), 'auto_release': (0, 1)}
+
+def _check_number(name: str, value, minimum: float = -math.inf, maximum: float = math.inf):
+    """Raises ValueError unless the value is a finite number within [minimum, maximum]
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number -> {value!r}")
+    if not minimum <= value <= maximum:
+        raise ValueError(f"{name} must be within [{minimum}, {maximum}] -> {value}")
+
+def _check_command(command):
+    """Raises ValueError for a structured command (or batch) with an action that is not a
+    string or a field value out of its register range (legacy string commands pass as they are)
+    """
+    if isinstance(command, str):
+        return
+    if isinstance(command, list):
+        for item in command:
+            _check_command(item)
+        return
+    if not isinstance(command, dict):
+        raise ValueError(f"unsupported command {command!r}")
+    if 'action' in command and not isinstance(command['action'], str):
+        raise ValueError(f"action must be a string -> {command['action']!r}")
+    for field, (minimum, maximum) in _COMMAND_RANGES.items():
+        if field in command:
+            _check_number(field, command[field], minimum, maximum)
+
+def _check_waypoints(waypoints):
+    """Raises ValueError for trajectory waypoints without a finite, non-negative time or with
+    an invalid command
+    """
+    if not isinstance(waypoints, list):
+        raise ValueError(f"unsupported trajectory {waypoints!r}")
+    for waypoint in waypoints:
+        if not isinstance(waypoint, dict):
+            raise ValueError(f"unsupported waypoint {waypoint!r}")
+        _check_number('t', waypoint.get('t'), minimum=0.0)
+        _check_command({key: value for key, value in waypoint.items() if key != 't'})
+
+def _parse_binary(frame: bytes) -> dict:
+    """Parses a binary frame into interface data carrying a batch of structured commands
+    """
+    if len(frame) < 2 or frame[0] != BINARY_VERSION:
+        raise ValueError(f"unsupported binary frame header {frame[:2]!r}")
+    id_end = 2 + frame[1]
+    records = frame[id_end:]
+    if len(records) % _BINARY_RECORD.size:
+        raise ValueError(f"binary frame records are not {_BINARY_RECORD.size} byte aligned")
+
+    commands: list = []
+    for record in _BINARY_RECORD.iter_unpack(records):
+        flags = record[0]
+        actions = [action for bit, action in _BINARY_ACTIONS if flags & bit]
+        fields = {field: record[index] for bit, field, index in _BINARY_FIELDS if flags & bit}
+        for action in actions[:-1]:
+            commands.append({'action': action})
+        if actions:
+            fields['action'] = actions[-1]
+        commands.append(fields)
+
+    data: dict = {'command': commands}
+    if frame[1]:
+        data['gripper'] = frame[2:id_end].decode('utf-8')
+    return data
+
+def _parse_json(message: str) -> dict:
+    """Parses a JSON frame into interface data. A frame is a command object of fields (e.g.,
+    {"position": 128, "speed": 200, "force": 50}), a {"commands": [...]} batch, a timed
+    {"trajectory": [{"t": 0.0, "position": 0}, ...], "id": "grasp"}, a closed-loop
+    {"control": {"controller": "CompliantGraspController", "rate": 100, ...}, "id": "grasp"}
+    ({"control": null} ends it) or {"stop": true}, optionally addressed with a "gripper" key,
+    or a bare list of commands for the default gripper. Command fields must be finite numbers
+    within their register range and actions strings, otherwise the frame is rejected
+    """
+    frame = json.loads(message)
+    if isinstance(frame, list):
+        _check_command(frame)
+        return {'command': frame}
+    if not isinstance(frame, dict):
+        raise ValueError(f"unsupported JSON frame {frame!r}")
+    if 'trajectory' in frame:
+        _check_waypoints(frame['trajectory'])
+        data: dict = {'trajectory': {'waypoints': frame['trajectory'], 'id': frame.get('id')}}
+    elif 'control' in frame:
+        control = frame['control']
+        if isinstance(control, str):
+            control = {'controller': control}
+        if control is not None and not isinstance(control, dict):
+            raise ValueError(f"unsupported control request {control!r}")
+        data = {'control': dict(control, id=frame.get('id')) if control is not None else None}
+    elif frame.get(STOP):
+        data = {'stop': True}
+    elif 'commands' in frame:
+        data = {'command': frame['commands']}
+    else:
+        data = {'command': {key: value for key, value in frame.items() if key != 'gripper'}}
+    if 'command' in data:
+        _check_command(data['command'])
+    if frame.get('gripper') is not None:
+        data['gripper'] = str(frame['gripper'])
+    return data
+
+def _parse_message(message, reply: Callable[[dict], None] = None) -> dict:
+    """Parses a received message into interface data (None if it is invalid). Messages are
+    binary frames, JSON frames or legacy commands. A legacy command may be addressed to a
+    gripper by prefixing its id (e.g., 'left:128'), otherwise the default gripper is used.
+    The data is stamped (time.monotonic) on receipt and at each later stage. Trajectories,
+    controllers and stops carry the reply method used to report their progress to the client
+    """
+    stamps = {'received': time.monotonic()}
+    try:
+        if isinstance(message, bytes):
+            data = _parse_binary(message)
+        elif message[:1] in ('{', '['):
+            data = _parse_json(message)
+        else:
+            gripper_id, sep, command = message.partition(':')
+            command = command if sep else message
+            data = {'stop': True} if command == STOP else {'command': command}
+            if sep:
+                data['gripper'] = gripper_id
+    except (ValueError, TypeError, OverflowError, RecursionError, UnicodeDecodeError) as e:
+        log.error(f"Ignoring Invalid Message -> {type(e).__name__}: {e}")
+        return None
+    data['stamps'] = stamps
+    if reply is not None and ('trajectory' in data or 'control' in data or 'stop' in data):
+        data['reply'] = reply
+    return data
+
+def _reply_method(websocket) -> Callable[[dict], None]:
+    """Returns a method (callable from any thread) that sends a JSON reply to the client
+    """
+    loop = asyncio.get_running_loop()
+
+    async def _send(message: dict):
+        try:
+            await websocket.send(json.dumps(message, default=str))
+        except websockets.ConnectionClosed:
+            pass
+
+    def _reply(message: dict):
+        asyncio.run_coroutine_threadsafe(_send(message), loop)
+    return _reply
+
+async def _send_stats(
+        websocket,
+        stats_method: Callable,
+        broadcaster: StatusBroadcaster = None,
+        sessions: SessionManager = None
+    ):
+    """Replies to a stats query with the handler statistics as JSON
+    """
+    stats = stats_method() if stats_method is not None else {}
+    if broadcaster is not None:
+        stats['broadcast'] = broadcaster.stats
+    if sessions is not None:
+        stats['sessions'] = sessions.stats
+    await websocket.send(json.dumps(stats, default=str))
+
+async def _send_updates(websocket, subscriber: Subscriber):
+    """Sends a subscriber's status updates to its client as they are queued
+    """
+    while True:
+        update = await subscriber.next()
+        await websocket.send(json.dumps(update))
+        subscriber.sent += 1
+
+def _subscription(broadcaster: StatusBroadcaster, websocket, message: str, current: tuple = None) -> tuple:
+    """Applies a subscribe/unsubscribe message to a client's current (subscriber, task) subscription.
+    Returns the new subscription (None when unsubscribed)
+    """
+    if current is not None:
+        subscriber, task = current
+        task.cancel()
+        broadcaster.unsubscribe(subscriber)
+    words = message.split()
+    if not words or words[0] != SUBSCRIBE:
+        return None
+    subscriber = broadcaster.subscribe(changes_only='changes' in words[1:])
+    task = asyncio.get_running_loop().create_task(_send_updates(websocket, subscriber))
+    return subscriber, task
+
+def _is_subscription(message) -> bool:
+    return isinstance(message, str) and message.split(' ', 1)[0] in (SUBSCRIBE, UNSUBSCRIBE)
+
+def _is_query(message) -> bool:
+    """True for messages answered by the interface itself (stats, subscriptions and session requests)
+    """
+    if not isinstance(message, str):
+        return False
+    return message in (STATS_QUERY, SESSION_QUERY) or message.split(' ', 1)[0] in (LOCK, UNLOCK, SUBSCRIBE, UNSUBSCRIBE)
+
+async def _open_session(sessions: SessionManager, websocket) -> Session:
+    """Opens a session for a new connection in the role requested by its path query. Returns
+    None (having closed the connection) if it cannot be given one
+    """
+    remote = websocket.remote_address
+    remote = f"{remote[0]}:{remote[1]}" if isinstance(remote, tuple) else str(remote)
+    # The legacy server exposes the request path directly, the newer one on its request
+    path = getattr(websocket, 'path', None) or getattr(getattr(websocket, 'request', None), 'path', '')
+    role = parse_qs(urlsplit(path or '').query).get('role', [ROLE_CONTROLLER])[0]
+    try:
+        session = sessions.open(remote, role)
+    except ValueError as e:
+        log.error(f"Refused Connection from {remote} -> {e}")
+        await websocket.close(CLOSE_POLICY, str(e))
+        return None
+    if session is None:
+        await websocket.close(CLOSE_TRY_AGAIN, 'session limit reached')
+        return None
+    session.reply = _reply_method(websocket)
+    return session
+
+def _session_request(sessions: SessionManager, session: Session, message: str):
+    """Applies a session query, lock or unlock message (replying with a session event)
+    """
+    words = message.split()
+    gripper = words[1] if len(words) > 1 else None
+    if words[0] == LOCK:
+        sessions.lock(session, gripper)
+    elif words[0] == UNLOCK:
+        sessions.unlock(session, gripper)
+    else:
+        session.notify('info', policy=sessions.policy, holders=sessions.holders, **session.info)
 
 class GrasshopperInterface(Interface):
     def __init__(
@@ -19,17 +281,35 @@ class GrasshopperInterface(Interface):
             output_q: Queue, 
             run_control_method: Callable, 
             connection_check_method: Callable, 
-            port: int = 8001
+            port: int = 8001,
+            stats_method: Callable = None,
+            queue_size: int = 8,
+            host: str = 'localhost',
+            policy: str = POLICY_LAST_WRITER,
+            max_sessions: int = 16,
+            rate: float = 100.0,
+            burst: int = 20,
+            retry_interval: float = 2.0,
+            resolve_method: Callable[[str], str] = None
         ):
-        print(f"[INTERFACE] Grasshopper Type Instantiated")
+        log.info("Grasshopper Type Instantiated")
         super().__init__(
             input_q=input_q,
             output_q=output_q,
             run_control_method=run_control_method, 
-            connection_check_method=connection_check_method
+            connection_check_method=connection_check_method,
+            stats_method=stats_method
         )
+        self._host = host
         self._port = port
         self._loop = None
+        # Seconds between attempts to bind the port (0 gives up after the first)
+        self._retry_interval: float = retry_interval
+        # Status updates (from the output queue) pushed to subscribed clients
+        self._broadcaster: StatusBroadcaster = StatusBroadcaster(queue_size=queue_size)
+        # Connected clients and which of them may command the grippers
+        self._sessions: SessionManager = SessionManager(
+            policy=policy, max_sessions=max_sessions, rate=rate, burst=burst, resolve=resolve_method)
 
         # Run the setup process
         self._setup()
@@ -39,43 +319,193 @@ class GrasshopperInterface(Interface):
         self._loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self._loop)
 
-        # Attempt to start socket serve
+        # Attempt to start socket serve (retrying while the port cannot be bound, e.g., held
+        # by a previous instance)
         started = False
-        while not started:
+        while not started and self._run_control_method():
             try:
-                print(f"[INTERFACE] Trying to Establish WebSocket Connection...")
-                server = websockets.serve(self._interface_handler, "localhost", self._port)
+                log.info(f"Trying to Establish WebSocket Server on {self._host}:{self._port}...")
+                server = websockets.serve(self._interface_handler, self._host, self._port)
                 self._loop.run_until_complete(server)
                 started = True
             except OSError as e:
-                print(f"[INTERFACE] Cannot Connect to Port {port} ")
-                break
+                log.error(f"Cannot Bind to {self._host}:{self._port} -> {e}")
+                if self._retry_interval <= 0:
+                    break
+                time.sleep(self._retry_interval)
 
         if not started:
-            print(f"[INTERFACE] Failed to Setup")
+            log.error("Failed to Setup")
         else:
+            self._broadcaster.forward(self._output_q, self._loop)
             self._loop.run_forever()
 
-        print(f"[INTERFACE] Reached end of Setup")
+        log.info("Reached end of Setup")
 
     async def _interface_handler(self, websocket):
         """This is the main interface input/output method
         Expected to be run in a Thread
         """
-        print(f"[INTERFACE] WebSocket Interface Initialising")
+        log.info("WebSocket Interface Initialising")
         self_termination: bool = False
         # Loop functionality under main thread control
-        print(f"[INTERFACE] Run control method: {self._run_control_method()}")
-        while self._run_control_method():
-            # Wait for a command from the Grasshopper interface
-            try:
-                message = await websocket.recv()
-                print(f"[INTERFACE] Received: {message}")
-                self._input_q.put({'command': message})
-            except websockets.ConnectionClosedOK:
-                self_termination = True
-                break
-
-        print(f"[INTERFACE] WebSocket Reached End...Self Termination Status: {self_termination}")
+        log.debug("Run control method: %s", self._run_control_method())
+        session = await _open_session(self._sessions, websocket)
+        if session is None:
+            return
+        subscription: tuple = None
+        try:
+            while self._run_control_method():
+                # Wait for a command from the Grasshopper interface
+                try:
+                    message = await websocket.recv()
+                    log.debug("Received: %s", message)
+                    if _is_query(message):
+                        if not self._sessions.allow(session):
+                            continue
+                        if message == STATS_QUERY:
+                            await _send_stats(websocket, self._stats_method, self._broadcaster, self._sessions)
+                        elif _is_subscription(message):
+                            subscription = _subscription(self._broadcaster, websocket, message, subscription)
+                        else:
+                            _session_request(self._sessions, session, message)
+                        continue
+                    interface_data = _parse_message(message, session.reply)
+                    if interface_data is not None and self._sessions.admit(session, interface_data):
+                        interface_data['session'] = session.id
+                        self._input_q.put(interface_data)
+                except websockets.ConnectionClosedOK:
+                    self_termination = True
+                    break
+        finally:
+            # Stop any status updates to this client and release its control
+            _subscription(self._broadcaster, websocket, UNSUBSCRIBE, subscription)
+            self._sessions.close(session)
+
+        log.info(f"WebSocket Reached End...Self Termination Status: {self_termination}")
         self._input_q.put({'termination': self_termination})
         return
+
+class AsyncGrasshopperInterface(AsyncInterface):
+    def __init__(
+            self,  
+            input_q: asyncio.Queue, 
+            output_q: asyncio.Queue, 
+            run_control_method: Callable, 
+            connection_check_method: Callable, 
+            port: int = 8001,
+            stats_method: Callable = None,
+            queue_size: int = 8,
+            host: str = 'localhost',
+            policy: str = POLICY_LAST_WRITER,
+            max_sessions: int = 16,
+            rate: float = 100.0,
+            burst: int = 20,
+            retry_interval: float = 2.0,
+            resolve_method: Callable[[str], str] = None
+        ):
+        log.info("Async Grasshopper Type Instantiated")
+        super().__init__(
+            input_q=input_q,
+            output_q=output_q,
+            run_control_method=run_control_method, 
+            connection_check_method=connection_check_method,
+            stats_method=stats_method
+        )
+        self._host = host
+        self._port = port
+        self._server = None
+        self._retry_interval: float = retry_interval
+        self._retry_task: asyncio.Task = None
+        self._broadcaster: StatusBroadcaster = StatusBroadcaster(queue_size=queue_size)
+        self._sessions: SessionManager = SessionManager(
+            policy=policy, max_sessions=max_sessions, rate=rate, burst=burst, resolve=resolve_method)
+        self._forward_task: asyncio.Task = None
+
+    async def _serve(self) -> bool:
+        """Binds the websocket server on the running event loop
+        """
+        try:
+            log.info(f"Trying to Establish WebSocket Server on {self._host}:{self._port}...")
+            self._server = await websockets.serve(self._interface_handler, self._host, self._port)
+        except OSError as e:
+            log.error(f"Cannot Bind to {self._host}:{self._port} -> {e}")
+            return False
+        return True
+
+    async def _retry(self):
+        """Task method retrying the bind until it succeeds (or the interface stops)
+        """
+        while self._run_control_method():
+            await asyncio.sleep(self._retry_interval)
+            if await self._serve():
+                return
+
+    async def _setup(self) -> bool:
+        """Starts the websocket server on the running event loop. If the port cannot be bound the
+        bind is retried in the background and False is returned
+        """
+        self._forward_task = self._broadcaster.forward(self._output_q, asyncio.get_running_loop())
+        if await self._serve():
+            return True
+        if self._retry_interval > 0:
+            self._retry_task = asyncio.get_running_loop().create_task(self._retry(), name="Task-Interface-Bind")
+        else:
+            log.error("Failed to Setup")
+        return False
+
+    async def close(self):
+        """Stops the websocket server
+        """
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            self._retry_task = None
+        if self._forward_task is not None:
+            self._forward_task.cancel()
+            self._forward_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _interface_handler(self, websocket):
+        """This is the main interface input/output method
+        Expected to be run as a task on the shared event loop
+        """
+        log.info("WebSocket Interface Initialising")
+        self_termination: bool = False
+        session = await _open_session(self._sessions, websocket)
+        if session is None:
+            return
+        subscription: tuple = None
+        try:
+            while self._run_control_method():
+                # Wait for a command from the Grasshopper interface
+                try:
+                    message = await websocket.recv()
+                    log.debug("Received: %s", message)
+                    if _is_query(message):
+                        if not self._sessions.allow(session):
+                            continue
+                        if message == STATS_QUERY:
+                            await _send_stats(websocket, self._stats_method, self._broadcaster, self._sessions)
+                        elif _is_subscription(message):
+                            subscription = _subscription(self._broadcaster, websocket, message, subscription)
+                        else:
+                            _session_request(self._sessions, session, message)
+                        continue
+                    interface_data = _parse_message(message, session.reply)
+                    if interface_data is not None and self._sessions.admit(session, interface_data):
+                        interface_data['session'] = session.id
+                        self._input_q.put_nowait(interface_data)
+                except websockets.ConnectionClosedOK:
+                    self_termination = True
+                    break
+        finally:
+            # Stop any status updates to this client and release its control
+            _subscription(self._broadcaster, websocket, UNSUBSCRIBE, subscription)
+            self._sessions.close(session)
+
+        log.info(f"WebSocket Reached End...Self Termination Status: {self_termination}")
+        self._input_q.put_nowait({'termination': self_termination})
+        return
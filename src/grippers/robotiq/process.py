@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+# Process split mode: the Modbus client runs in a dedicated I/O process so that the serial
+# transactions (and their timeouts) never share the GIL with the websocket and dispatch threads.
+# Each transaction is handed over as the output message (target) in a shared memory request
+# slot and answered with the status in a response slot (see base.shm.SeqlockSlot); only rare
+# control calls (connect, disconnect, stats) are pickled over a pipe.
+
+from base.client import Client, Interpreter
+from base.bus import BusScheduler
+from base.lanes import PRIORITY_MOTION, PRIORITY_QUERY
+from base.log import configure_logging
+from base.shm import SeqlockSlot
+from grippers.robotiq.client import RobotiqModbusSerialClient, RobotiqInterpreter
+from multiprocessing import get_context, parent_process
+from threading import Lock
+import signal, time, logging
+
+log = logging.getLogger(__name__)
+
+# Transaction operations
+OP_READ = 1
+OP_WRITE = 2
+OP_WRITE_READ = 3
+# Request slot: transaction number, operation, force (write even if unchanged), status bytes
+# wanted, output message length and bytes
+_REQUEST: str = 'IBBBB16s'
+# Response slot: transaction number answered, success, link state, status length and bytes
+_RESPONSE: str = 'IBBB16s'
+# Period (seconds) the I/O process checks its parent is still alive while idle
+IDLE_CHECK = 1.0
+# Allowance (seconds) for the I/O process to answer beyond its own transaction timeouts
+ANSWER_MARGIN = 0.5
+
+def _slots(buffer) -> tuple:
+    """The request and response slots laid out in the shared buffer
+    """
+    return SeqlockSlot(buffer, _REQUEST), SeqlockSlot(buffer, _RESPONSE, offset=SeqlockSlot.size(_REQUEST))
+
+def _serve(buffer, request_ready, response_ready, conn, client_kwargs: dict, log_level: int):
+    """I/O process main: owns the RobotiqModbusSerialClient and answers the transactions posted in
+    the request slot (and the control calls sent over the pipe) until the front end exits
+    """
+    # Interrupts are handled by the front end (this process exits with it)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging({'logging': {'level': log_level}})
+    # Setup is driven by the front end through its own interpreter (this one is unused)
+    client = RobotiqModbusSerialClient(interpreter=RobotiqInterpreter(), **client_kwargs)
+    request, response = _slots(buffer)
+    # The last request was answered by a previous process (it is not replayed)
+    served = request.read()[0]
+    log.info("Robotiq I/O Process Serving")
+    while True:
+        request_ready.clear()
+        if conn.poll():
+            call = conn.recv()
+            if call == 'connect':
+                conn.send(client.connect())
+            elif call == 'disconnect':
+                conn.send(client.disconnect())
+            elif call == 'stats':
+                conn.send(client.stats)
+            continue
+
+        number, op, force, num_bytes, length, target = request.read()
+        if number == served:
+            request_ready.wait(IDLE_CHECK)
+            if not parent_process().is_alive():
+                break
+            continue
+
+        served = number
+        command = target[:length]
+        raw: bytes = b''
+        if op == OP_READ:
+            raw = client.get_status(num_bytes)
+            ok = bool(raw)
+        elif op == OP_WRITE:
+            ok = client.send(command, force=bool(force))
+        else:
+            raw = client.send_and_get_status(command, num_bytes, force=bool(force))
+            ok = bool(raw)
+        response.write(number, ok, client._connected, len(raw), raw)
+        response_ready.set()
+    if client._connected:
+        client.disconnect()
+    log.info("Robotiq I/O Process Stopped")
+
+# --- Client Definition
+class RobotiqProcessClient(Client):
+    """Front end of a RobotiqModbusSerialClient running in a dedicated I/O process (spawned on
+    connect). Transactions are serialised and exchanged through shared memory slots, and the
+    process is started again by the next connect if it exits or stops answering (so the
+    connection supervisor restarts it along with the link). Setup runs here, through this
+    client's interpreter. Grippers sharing a port cannot be split (the bus is per process)
+    """
+    def __init__(
+            self,
+            interpreter: Interpreter,
+            port: str = 'COM4',
+            slave_id: int = 9,
+            baudrate: int = 115200,
+            bytesize: int = 8,
+            parity: str = 'N',
+            stopbits: int = 1,
+            timeout: float = 0.5,
+            retries: int = 2,
+            turnaround: float = 0.01,
+            bus: BusScheduler = None
+        ):
+        """Robotiq Process Client Initialiser (see the RobotiqModbusSerialClient for the options)
+        """
+        super().__init__(interpreter=interpreter)
+        if bus is not None:
+            raise ValueError(f"grippers sharing port {port} cannot use the process client")
+        log.info(f"Robotiq ProcessClient Type Instantiated on {port} (slave {slave_id})")
+        self._port: str = port
+        self._slave_id: int = slave_id
+        self._client_kwargs: dict = {
+            'port': port, 'slave_id': slave_id, 'baudrate': baudrate, 'bytesize': bytesize,
+            'parity': parity, 'stopbits': stopbits, 'timeout': timeout, 'retries': retries,
+            'turnaround': turnaround,
+        }
+        # Longest wait for an answer: a combined transaction may fall back to a write then a read,
+        # each with its resends
+        self._answer_timeout: float = 2 * timeout * (retries + 1) + ANSWER_MARGIN
+        # Shared memory and signalling (spawned processes do not inherit the front end's threads)
+        self._context = get_context('spawn')
+        self._share()
+        self._process = None
+        self._conn = None
+        # Serialises control calls on the pipe (transactions are serialised by the client lock)
+        self._control_lock: Lock = Lock()
+        self._number: int = 0
+        # Link state last reported by the I/O process
+        self._link: bool = False
+        # Counters
+        self._transactions: int = 0
+        self._unanswered: int = 0
+        self._restarts: int = 0
+
+    # -- Private Methods
+    def _alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _share(self):
+        """Creates the shared memory slots and events of an I/O process
+        """
+        self._buffer = self._context.RawArray('B', SeqlockSlot.size(_REQUEST) + SeqlockSlot.size(_RESPONSE))
+        self._request, self._response = _slots(self._buffer)
+        self._request_ready = self._context.Event()
+        self._response_ready = self._context.Event()
+
+    def _start(self):
+        """Starts the I/O process (again, if a previous one exited or was stopped)
+        """
+        if self._process is not None:
+            log.warning(f"Robotiq I/O Process Exited ({self._process.exitcode}). Restarting")
+            self._restarts += 1
+            self._conn.close()
+            # A process killed mid-write leaves a slot (or an event's lock) held, so the new
+            # process is given its own
+            self._share()
+        self._conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_serve,
+            args=(self._buffer, self._request_ready, self._response_ready, child_conn,
+                  self._client_kwargs, logging.getLogger().getEffectiveLevel()),
+            name=f"Process-IO-{self._port}-{self._slave_id}",
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+
+    def _abandon(self, reason: str):
+        """Stops an I/O process that no longer answers (the next connect starts a new one)
+        """
+        log.error(f"Robotiq I/O Process Not Answering ({reason}). Stopping It")
+        self._unanswered += 1
+        self._link = False
+        if self._alive():
+            self._process.terminate()
+            self._process.join(1.0)
+
+    def _call(self, call: str):
+        """Makes a control call to the I/O process (None if it did not answer)
+        """
+        with self._control_lock:
+            if not self._alive():
+                return None
+            try:
+                self._conn.send(call)
+                self._request_ready.set()
+                if self._conn.poll(self._answer_timeout):
+                    return self._conn.recv()
+            except (EOFError, OSError):
+                pass
+            self._abandon(call)
+            return None
+
+    def _transact(self, op: int, command: list = None, num_bytes: int = 0, force: bool = False) -> tuple:
+        """Posts a transaction to the I/O process and waits for its answer. Returns (ok, status bytes)
+        """
+        with self._lock:
+            if not self._alive():
+                return False, b''
+            self._number = (self._number + 1) & 0xFFFFFFFF
+            target = bytes(command or ())
+            self._response_ready.clear()
+            self._request.write(self._number, op, force, num_bytes, len(target), target)
+            self._request_ready.set()
+            self._transactions += 1
+
+            deadline = time.monotonic() + self._answer_timeout
+            while True:
+                number, ok, link, length, status = self._response.read()
+                if number == self._number:
+                    self._link = bool(link)
+                    return bool(ok), status[:length]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._alive():
+                    break
+                self._response_ready.wait(remaining)
+                self._response_ready.clear()
+            self._abandon(f"transaction {self._number}")
+            return False, b''
+
+    # -- Properties
+    @property
+    def _connected(self) -> bool:
+        """The link is up while the I/O process is running and its client is connected
+        """
+        return self._link and self._alive()
+
+    # -- Public Methods
+    # Setup is driven from the front end (through send and get_status below)
+    setup = RobotiqModbusSerialClient.setup
+    wait_until_reset = RobotiqModbusSerialClient.wait_until_reset
+    wait_until_activated = RobotiqModbusSerialClient.wait_until_activated
+    wait_until_motion_complete = RobotiqModbusSerialClient.wait_until_motion_complete
+    wait_until_fault_cleared = RobotiqModbusSerialClient.wait_until_fault_cleared
+
+    def connect(self) -> bool:
+        """Connects the client of the I/O process (starting the process if it is not running)
+        """
+        if not self._alive():
+            self._start()
+        self._link = bool(self._call('connect'))
+        log.info("Connection Status is %s", self._link)
+        return self._link
+
+    def disconnect(self):
+        if not self._connected:
+            log.error("Cannot disconnect as not connected")
+            return
+
+        self._call('disconnect')
+        self._link = False
+
+    def close(self):
+        """Disconnects and stops the I/O process (the client is not used again)
+        """
+        super().close()
+        if self._alive():
+            self._process.terminate()
+            self._process.join(1.0)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def send(self, command, force: bool = False, priority: int = PRIORITY_MOTION) -> bool:
+        """Sends the command to the gripper through the I/O process
+        """
+        if command is None:
+            log.error("Cannot Send as command is None")
+            return False
+
+        if not self._connected:
+            log.error("Cannot Send as Client is Not Connected")
+            return False
+
+        return self._transact(OP_WRITE, command, force=force)[0]
+
+    def get_status(self, num_bytes: int = 6, priority: int = PRIORITY_QUERY) -> bytes:
+        """Gets the status from the gripper through the I/O process
+        """
+        if num_bytes is None or num_bytes <= 0:
+            log.error(f"Cannot get status as num_bytes is invalid -> {num_bytes}")
+            return b''
+
+        if not self._connected:
+            log.error("Cannot get status as Client is Not Connected")
+            return b''
+
+        ok, status = self._transact(OP_READ, num_bytes=num_bytes)
+        return status if ok else b''
+
+    def send_and_get_status(self, command, num_bytes: int = 6, force: bool = False, priority: int = PRIORITY_MOTION) -> bytes:
+        """Writes the command and reads the status in one transaction of the I/O process
+        """
+        if command is None:
+            log.error("Cannot Send as command is None")
+            return b''
+
+        if not self._connected:
+            log.error("Cannot Send as Client is Not Connected")
+            return b''
+
+        ok, status = self._transact(OP_WRITE_READ, command, num_bytes=num_bytes, force=force)
+        return status if ok else b''
+
+    @property
+    def stats(self) -> dict:
+        """The counters of the I/O process client and of the process itself
+        """
+        stats = self._call('stats') or {}
+        stats['process'] = {
+            'alive': self._alive(),
+            'restarts': self._restarts,
+            'transactions': self._transactions,
+            'unanswered': self._unanswered,
+            'read_retries': self._response.retries,
+        }
+        return stats
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# Copyright 2024 - Dasun Gunasinghe
+# Research Engineering Facility, Queensland University of Technology (QUT)
+__author__ = 'Dasun Gunasinghe'
+__email__ = 'robotics.ref@qut.edu.au'
+
+# Simulated Robotiq 2F gripper(s) served as Modbus RTU over a TCP loopback socket.
+# The RobotiqModbusSerialClient connects unchanged by setting its port to 'socket://<host>:<port>'.
+# Run from the src directory: python -m grippers.robotiq.simulator --port 5020 --slaves 9
+
+from grippers.robotiq.client import InputMsg, OutputMsg
+from base.log import configure_logging
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusSlaveContext, ModbusServerContext
+from pymodbus.server import ModbusTcpServer
+from threading import Thread, Event
+import argparse, asyncio, time, logging
+
+log = logging.getLogger(__name__)
+
+# Register map (holding registers)
+OUTPUT_ADDRESS = 0x03E8
+INPUT_ADDRESS = 0x07D0
+NUM_REGISTERS = 3
+
+# Fault codes (gFLT)
+FAULT_NONE = 0x00
+FAULT_ACTIVATION_REQUIRED = 0x07
+FAULT_OVERCURRENT = 0x0B
+
+# --- Device Model Definition
+class RobotiqDevice:
+    """Register model of a Robotiq 2F gripper with simple motion dynamics.
+    Travel time over the full stroke scales with the requested speed (rSP), an object placed at
+    object_position is detected while closing (gOBJ of 2), and the grip current scales with the
+    requested force (rFR). State is advanced lazily on every register access.
+    """
+    def __init__(
+            self,
+            stroke_time_min: float = 0.6,
+            stroke_time_max: float = 4.0,
+            activation_time: float = 1.5,
+            object_position: int = None
+        ):
+        """Constructor
+        """
+        self._stroke_time_min: float = stroke_time_min
+        self._stroke_time_max: float = stroke_time_max
+        self._activation_time: float = activation_time
+        self._object_position: int = object_position
+        self._output: OutputMsg = OutputMsg()
+        self._input: InputMsg = InputMsg()
+        self._position: float = 0.0
+        self._activation_end: float = None
+        self._stamp: float = time.monotonic()
+
+    # -- Private Methods
+    def _speed(self) -> float:
+        """Finger speed in position units per second for the requested speed
+        """
+        span = self._stroke_time_max - self._stroke_time_min
+        return 255.0 / (self._stroke_time_max - span * self._output.rSP / 255.0)
+
+    def _step(self, now: float):
+        """Advances the device state to the given time
+        """
+        dt = now - self._stamp
+        self._stamp = now
+        state = self._input
+
+        # Activation sequence
+        if self._activation_end is not None and now >= self._activation_end:
+            self._activation_end = None
+            self._position = 0.0
+            state.gSTA = 3
+
+        # Motion (only when activated, requested to go and not faulted)
+        moving = state.gSTA == 3 and self._output.rGTO == 1 and state.gFLT < 0x0A
+        if not moving:
+            if state.gSTA != 3:
+                state.gOBJ = 0
+            state.gCU = 0
+        elif state.gOBJ in (0, 3) or self._output.rPR != state.gPR:
+            target = float(self._output.rPR)
+            step = self._speed() * dt
+            closing = target > self._position
+            if abs(target - self._position) <= step:
+                position = target
+            else:
+                position = self._position + (step if closing else -step)
+
+            obj = self._object_position
+            if closing and obj is not None and self._position <= obj <= position and obj < target:
+                # Fingers stopped by an object while closing
+                self._position = float(obj)
+                state.gOBJ = 2
+                state.gCU = min(255, 10 + self._output.rFR // 2)
+            else:
+                self._position = position
+                state.gOBJ = 3 if position == target else 0
+                state.gCU = 3 if state.gOBJ == 0 else 0
+            state.gPR = self._output.rPR
+
+        state.gPO = int(round(self._position))
+
+    # -- Public Methods
+    def write(self, offset: int, registers: list, now: float = None):
+        """Writes output (request) registers starting at the register offset from 0x03E8
+        """
+        now = time.monotonic() if now is None else now
+        self._step(now)
+        data = [0] * (2 * NUM_REGISTERS)
+        current = self.output_registers()
+        for i in range(NUM_REGISTERS):
+            value = registers[i - offset] if offset <= i < offset + len(registers) else current[i]
+            data[2*i] = (value >> 8) & 0xFF
+            data[2*i+1] = value & 0xFF
+
+        previous = self._output
+        self._output = OutputMsg(
+            rACT=data[0] & 0x01,
+            rGTO=(data[0] >> 3) & 0x01,
+            rATR=(data[0] >> 4) & 0x01,
+            rPR=data[3],
+            rSP=data[4],
+            rFR=data[5]
+        )
+
+        state = self._input
+        if self._output.rACT == 0:
+            # Reset clears activation and any fault
+            self._activation_end = None
+            state.gACT = state.gSTA = state.gOBJ = 0
+            state.gFLT = FAULT_ACTIVATION_REQUIRED if self._output.rGTO == 1 else FAULT_NONE
+        elif previous.rACT == 0:
+            # Rising edge on rACT starts the activation sequence
+            state.gACT = 1
+            state.gSTA = 1
+            state.gFLT = FAULT_NONE
+            self._activation_end = now + self._activation_time
+        state.gGTO = self._output.rGTO
+
+    def read(self, now: float = None) -> list:
+        """Reads the input (status) registers from 0x07D0
+        """
+        self._step(time.monotonic() if now is None else now)
+        state = self._input
+        data = [
+            state.gACT | (state.gGTO << 3) | (state.gSTA << 4) | (state.gOBJ << 6),
+            0,
+            state.gFLT,
+            state.gPR,
+            state.gPO,
+            state.gCU
+        ]
+        return [(data[2*i] << 8) + data[2*i+1] for i in range(NUM_REGISTERS)]
+
+    def output_registers(self) -> list:
+        """The current output (request) registers
+        """
+        out = self._output
+        data = [out.rACT | (out.rGTO << 3) | (out.rATR << 4), 0, 0, out.rPR, out.rSP, out.rFR]
+        return [(data[2*i] << 8) + data[2*i+1] for i in range(NUM_REGISTERS)]
+
+    def inject_fault(self, code: int = FAULT_OVERCURRENT):
+        """Injects a fault (major faults, 0x0A and above, stop motion until reset)
+        """
+        self._input.gFLT = code
+
+    @property
+    def status(self) -> InputMsg:
+        return self._input
+
+# --- Modbus Context Definition
+class RobotiqSlaveContext(ModbusSlaveContext):
+    """Slave context mapping the Robotiq holding registers onto a RobotiqDevice.
+    Every access is delayed by the RTU frame time at the simulated baud rate plus a
+    device turnaround, so bus timing matches a real serial link
+    """
+    def __init__(self, device: RobotiqDevice, baudrate: int = 115200, turnaround: float = 0.002):
+        super().__init__(hr=ModbusSequentialDataBlock(0, [0] * (INPUT_ADDRESS + NUM_REGISTERS)), zero_mode=True)
+        self._device: RobotiqDevice = device
+        # Seconds per character (start + 8 data + stop bits)
+        self._char_time: float = 10.0 / baudrate if baudrate else 0.0
+        self._turnaround: float = turnaround
+
+    def _frame_time(self, request_bytes: int, response_bytes: int) -> float:
+        """Time on the wire for a request and response (each followed by a 3.5 character gap)
+        """
+        return (request_bytes + response_bytes + 7) * self._char_time + self._turnaround
+
+    def getValues(self, fc_as_hex: int, address: int, count: int = 1) -> list:
+        if INPUT_ADDRESS <= address < INPUT_ADDRESS + NUM_REGISTERS:
+            registers = self._device.read()
+            return registers[address - INPUT_ADDRESS:address - INPUT_ADDRESS + count]
+        if OUTPUT_ADDRESS <= address < OUTPUT_ADDRESS + NUM_REGISTERS:
+            registers = self._device.output_registers()
+            return registers[address - OUTPUT_ADDRESS:address - OUTPUT_ADDRESS + count]
+        return super().getValues(fc_as_hex, address, count)
+
+    def setValues(self, fc_as_hex: int, address: int, values: list):
+        if OUTPUT_ADDRESS <= address < OUTPUT_ADDRESS + NUM_REGISTERS:
+            self._device.write(address - OUTPUT_ADDRESS, list(values))
+            return
+        super().setValues(fc_as_hex, address, values)
+
+    async def async_getValues(self, fc_as_hex: int, address: int, count: int = 1) -> list:
+        # Read request (8 bytes) and response (5 + 2 bytes per register)
+        await asyncio.sleep(self._frame_time(8, 5 + 2 * count))
+        return self.getValues(fc_as_hex, address, count)
+
+    async def async_setValues(self, fc_as_hex: int, address: int, values: list):
+        # Write request (9 + 2 bytes per register) and response (8 bytes)
+        await asyncio.sleep(self._frame_time(9 + 2 * len(values), 8))
+        self.setValues(fc_as_hex, address, values)
+
+# --- Simulator Definition
+class RobotiqSimulator:
+    """Serves one or more simulated Robotiq grippers (slave ids) as Modbus RTU framed over TCP.
+    Can be run in a background thread (start/stop) for tests and benchmarks
+    """
+    def __init__(
+            self,
+            host: str = 'localhost',
+            port: int = 5020,
+            slaves: list = [9],
+            baudrate: int = 115200,
+            turnaround: float = 0.002,
+            **device_kwargs
+        ):
+        """Constructor
+        """
+        self._host: str = host
+        self._port: int = port
+        self.devices: dict = {slave_id: RobotiqDevice(**device_kwargs) for slave_id in slaves}
+        self._context: ModbusServerContext = ModbusServerContext(
+            slaves={
+                slave_id: RobotiqSlaveContext(device, baudrate=baudrate, turnaround=turnaround)
+                for slave_id, device in self.devices.items()
+            },
+            single=False
+        )
+        self._server: ModbusTcpServer = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._thread: Thread = None
+
+    @property
+    def url(self) -> str:
+        """The port to configure on the client
+        """
+        return f"socket://{self._host}:{self._port}"
+
+    async def serve(self):
+        """Serves until shutdown
+        """
+        self._server = ModbusTcpServer(self._context, framer='rtu', address=(self._host, self._port))
+        log.info(f"Serving Robotiq Slaves {list(self.devices.keys())} on {self.url}")
+        await self._server.serve_forever()
+
+    def start(self, timeout: float = 5.0):
+        """Starts serving in a background thread
+        """
+        ready = Event()
+
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.call_soon(ready.set)
+            try:
+                self._loop.run_until_complete(self.serve())
+            except asyncio.CancelledError:
+                pass
+
+        self._thread = Thread(target=_run, daemon=True, name="Thread-Robotiq-Simulator")
+        self._thread.start()
+        ready.wait(timeout)
+        # Allow the listener to bind
+        time.sleep(0.1)
+
+    def stop(self, timeout: float = 2.0):
+        """Stops a simulator started with start()
+        """
+        if self._server is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._server.shutdown(), self._loop).result(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated Robotiq 2F gripper(s) over Modbus RTU/TCP loopback")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5020)
+    parser.add_argument('--slaves', type=int, nargs='+', default=[9])
+    parser.add_argument('--baudrate', type=int, default=115200, help="simulated RTU byte timing (0 disables)")
+    parser.add_argument('--turnaround', type=float, default=0.002, help="device response delay (s)")
+    parser.add_argument('--object', type=int, default=None, help="position (0-255) of an object to grasp")
+    args = parser.parse_args()
+    configure_logging()
+
+    simulator = RobotiqSimulator(
+        host=args.host,
+        port=args.port,
+        slaves=args.slaves,
+        baudrate=args.baudrate,
+        turnaround=args.turnaround,
+        object_position=args.object
+    )
+    try:
+        asyncio.run(simulator.serve())
+    except KeyboardInterrupt:
+        log.info("Terminating")
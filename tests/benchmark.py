@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# End-to-end latency and throughput benchmark
+# Drives the real GrasshopperInterface -> GripperHandler -> RobotiqModbusSerialClient pipeline against
+# the simulated Robotiq gripper(s) and reports websocket-message to register-write latency.
+# A command's latency is the time until a write carrying its target (or a newer, superseding one)
+# reaches the simulated device. Results are written as JSON for comparison between releases.
+#
+# Usage (from the package root):
+#   python tests/benchmark.py --clients 1 --rate 100 --duration 5 --output bench_output.json
+#   python tests/benchmark.py --clients 4 --shared-bus --compare bench_output.json
+import argparse, asyncio, contextlib, json, os, platform, sys, threading, time
+import websockets
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import gripper
+from grippers.robotiq.simulator import RobotiqSimulator
+
+INTERFACE_URL = "ws://localhost:8001"
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of a list of values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def record_writes(device) -> list:
+    """Wraps a simulated device so every register write is logged as (time, rPR)
+    """
+    log: list = []
+    write = device.write
+
+    def _write(offset, registers, now=None):
+        write(offset, registers, now)
+        log.append((time.perf_counter(), device._output.rPR))
+
+    device.write = _write
+    return log
+
+def match_latencies(sends: list, writes: list) -> list:
+    """Latency of each sent (time, value) command to the first write carrying it or a newer target
+    """
+    latencies: list = []
+    served = 0
+    for stamp, value in writes:
+        # The newest send with this value issued before the write
+        index = None
+        for i in range(len(sends) - 1, served - 1, -1):
+            if sends[i][0] <= stamp and sends[i][1] == value:
+                index = i
+                break
+        if index is None:
+            continue
+        latencies.extend(stamp - sends[i][0] for i in range(served, index + 1))
+        served = index + 1
+    return latencies
+
+async def run_client(gripper_id: str, rate: float, duration: float, sends: list):
+    """Streams position commands to one gripper at the given rate
+    """
+    period = 1.0 / rate if rate > 0 else 0.0
+    async with websockets.connect(INTERFACE_URL) as ws:
+        start = time.perf_counter()
+        count = 0
+        while time.perf_counter() - start < duration:
+            # Consecutive values always differ so every command is a new target
+            value = (count % 250) + 1
+            sends.append((time.perf_counter(), value))
+            await ws.send(f"{gripper_id}:{value}")
+            count += 1
+            delay = start + count * period - time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
+        # Allow the final target to reach the bus
+        await asyncio.sleep(0.5)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end gripper-comms benchmark (simulated hardware)")
+    parser.add_argument('--clients', type=int, default=1, help="concurrent websocket clients (one gripper each)")
+    parser.add_argument('--rate', type=float, default=100.0, help="commands per second per client (0 is unpaced)")
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds of streaming per client")
+    parser.add_argument('--baudrate', type=int, default=115200, help="simulated RTU baud rate")
+    parser.add_argument('--command-rate', type=float, default=None, help="override the configured command_rate")
+    parser.add_argument('--client', default=None, help="override the configured client type (e.g., RobotiqProcessClient)")
+    parser.add_argument('--shared-bus', action='store_true', help="put every gripper on one simulated RS-485 port")
+    parser.add_argument('--output', default=None, help="write JSON results to this file")
+    parser.add_argument('--compare', default=None, help="JSON results to compare against (fails on regression)")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression for --compare")
+    parser.add_argument('--verbose', action='store_true', help="log the pipeline's output (at the configured logging level)")
+    args = parser.parse_args()
+
+    # Simulated grippers (one port each unless sharing a bus)
+    ids = [f"g{i}" for i in range(args.clients)]
+    simulators: list = []
+    entries: list = []
+    logs: dict = {}
+    if args.shared_bus:
+        sim = RobotiqSimulator(port=5020, slaves=list(range(1, args.clients + 1)),
+                               baudrate=args.baudrate, activation_time=0.1)
+        simulators.append(sim)
+        for i, gripper_id in enumerate(ids):
+            entries.append({'id': gripper_id, 'port': sim.url, 'slave_id': i + 1, 'baudrate': args.baudrate})
+            logs[gripper_id] = record_writes(sim.devices[i + 1])
+    else:
+        for i, gripper_id in enumerate(ids):
+            sim = RobotiqSimulator(port=5020 + i, slaves=[9], baudrate=args.baudrate, activation_time=0.1)
+            simulators.append(sim)
+            entries.append({'id': gripper_id, 'port': sim.url, 'slave_id': 9, 'baudrate': args.baudrate})
+            logs[gripper_id] = record_writes(sim.devices[9])
+
+    config = gripper.load_config()
+    config['runtime'] = 'threaded'
+    config['grippers'] = entries
+    # Measure the pipeline rather than the per-session rate limit
+    config['server'] = dict(config.get('server') or {}, rate=0)
+    if args.command_rate is not None:
+        config['command_rate'] = args.command_rate
+    if args.client is not None:
+        config['client'] = args.client
+
+    sink = sys.stdout if args.verbose else open(os.devnull, 'w')
+    with contextlib.redirect_stdout(sink):
+        if args.verbose:
+            gripper.configure_logging(config)
+        for sim in simulators:
+            sim.start()
+        handler = gripper.GripperHandler()
+        handler.create(config)
+        handler.setup()
+        threading.Thread(target=handler.run, daemon=True, name="Thread-Benchmark-Handler").start()
+        # Wait for activation of every gripper before streaming
+        for gripper_id in ids:
+            handler.wait_for_status(lambda status: status.gSTA == 3, timeout=10.0, gripper_id=gripper_id)
+
+        sends: dict = {gripper_id: [] for gripper_id in ids}
+        for log in logs.values():
+            log.clear()
+
+        async def _run_all():
+            await asyncio.gather(*[run_client(g, args.rate, args.duration, sends[g]) for g in ids])
+
+        started = time.perf_counter()
+        asyncio.run(_run_all())
+        elapsed = time.perf_counter() - started
+        stats = handler.get_stats()
+
+    # Collate results
+    latencies: list = []
+    per_client: dict = {}
+    for gripper_id in ids:
+        client_latencies = match_latencies(sends[gripper_id], logs[gripper_id])
+        latencies.extend(client_latencies)
+        per_client[gripper_id] = {
+            'sent': len(sends[gripper_id]),
+            'written': len(logs[gripper_id]),
+            'p50_ms': 1e3 * percentile(client_latencies, 50),
+            'p99_ms': 1e3 * percentile(client_latencies, 99),
+        }
+    sent = sum(len(s) for s in sends.values())
+    written = sum(len(w) for w in logs.values())
+    results = {
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'clients': args.clients,
+            'rate': args.rate,
+            'duration': args.duration,
+            'baudrate': args.baudrate,
+            'command_rate': config.get('command_rate'),
+            'shared_bus': args.shared_bus,
+            'client': config['client'],
+        },
+        'sent': sent,
+        'written': written,
+        'served': len(latencies),
+        'send_rate': sent / elapsed,
+        'write_rate': written / elapsed,
+        'latency_ms': {
+            'p50': 1e3 * percentile(latencies, 50),
+            'p99': 1e3 * percentile(latencies, 99),
+            'p999': 1e3 * percentile(latencies, 99.9),
+            'max': 1e3 * max(latencies) if latencies else 0.0,
+        },
+        'clients': per_client,
+        'handler': stats,
+    }
+
+    print(json.dumps({k: results[k] for k in ('parameters', 'sent', 'written', 'send_rate', 'write_rate', 'latency_ms')}, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+
+    # Regression check against previous results
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        failures: list = []
+        for key in ('p50', 'p99'):
+            before, after = baseline['latency_ms'][key], results['latency_ms'][key]
+            if before > 0 and after > before * (1.0 + args.tolerance):
+                failures.append(f"latency {key} {before:.2f} -> {after:.2f} ms")
+        if results['write_rate'] < baseline['write_rate'] * (1.0 - args.tolerance):
+            failures.append(f"write rate {baseline['write_rate']:.1f} -> {results['write_rate']:.1f} /s")
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        return 1 if failures else 0
+    return 0
+
+if __name__ == "__main__":
+    # Handler threads are daemons, so exit without waiting on them
+    code = main()
+    sys.stdout.flush()
+    os._exit(code)
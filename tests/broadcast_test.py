@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# Status broadcast backpressure
+# Checks that a full output queue drops its oldest update instead of blocking, that a slow
+# subscriber keeps only its newest updates without affecting another subscriber, that change-only
+# subscriptions skip unchanged statuses and that the publisher only publishes new snapshots. Runs
+# against fake workers (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/broadcast_test.py
+import os, sys, asyncio
+from queue import Queue
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.broadcast import StatusBroadcaster, StatusPublisher, put_latest
+from base.status import StatusCache
+
+class FakeWorker:
+    def __init__(self):
+        self.cache = StatusCache()
+
+    def get_status(self):
+        return self.cache.latest()
+
+def _update(position: int, gripper_id: str = 'left') -> dict:
+    return {'type': 'status', 'gripper': gripper_id, 'seq': position, 'status': {'gPO': position}}
+
+def test_put_latest():
+    queue = Queue(maxsize=2)
+    assert [put_latest(queue, i) for i in range(4)] == [False, False, True, True]
+    assert [queue.get_nowait() for _ in range(2)] == [2, 3]
+    async_queue = asyncio.Queue(maxsize=1)
+    assert not put_latest(async_queue, 1) and put_latest(async_queue, 2) and async_queue.get_nowait() == 2
+
+def test_slow_subscriber():
+    async def run():
+        broadcaster = StatusBroadcaster(queue_size=2)
+        slow = broadcaster.subscribe()
+        fast = broadcaster.subscribe()
+        received: list = []
+        for position in range(5):
+            broadcaster.publish(_update(position))
+            # The fast subscriber keeps up, the slow one never reads until the end
+            received.append((await fast.next())['seq'])
+        latest = [(await slow.next())['seq'] for _ in range(2)]
+        return broadcaster, slow, fast, received, latest
+    broadcaster, slow, fast, received, latest = asyncio.run(run())
+    assert received == [0, 1, 2, 3, 4] and fast.dropped == 0, received
+    assert latest == [3, 4] and slow.dropped == 3, latest
+    assert broadcaster.stats['published'] == 5 and broadcaster.stats['dropped'] == 3, broadcaster.stats
+
+def test_changes_only():
+    async def run():
+        broadcaster = StatusBroadcaster(queue_size=8)
+        subscriber = broadcaster.subscribe(changes_only=True)
+        for position in (1, 1, 2, 2, 1):
+            broadcaster.publish(_update(position))
+        broadcaster.publish(_update(1, gripper_id='right'))
+        return [(update['gripper'], update['status']['gPO']) for update in subscriber._updates]
+    assert asyncio.run(run()) == [('left', 1), ('left', 2), ('left', 1), ('right', 1)]
+
+def test_publisher():
+    workers = {'left': FakeWorker(), 'right': FakeWorker()}
+    output_q = Queue(maxsize=2)
+    publisher = StatusPublisher(lambda: workers, output_q)
+    publisher.publish()
+    assert output_q.empty()
+    workers['left'].cache.publish({'gPO': 1})
+    publisher.publish()
+    publisher.publish()
+    assert output_q.qsize() == 1 and output_q.get_nowait()['gripper'] == 'left'
+    # More new snapshots than the queue holds: the oldest are dropped
+    for position in range(3):
+        workers['left'].cache.publish({'gPO': position})
+        workers['right'].cache.publish({'gPO': position})
+        publisher.publish()
+    assert output_q.qsize() == 2 and publisher.stats == {'published': 7, 'dropped': 4}, publisher.stats
+    assert [output_q.get_nowait()['status']['gPO'] for _ in range(2)] == [2, 2]
+
+if __name__ == "__main__":
+    test_put_latest()
+    test_slow_subscriber()
+    test_changes_only()
+    test_publisher()
+    print("Broadcast checks OK")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# Shared bus arbitration
+# Checks that transactions on a shared bus run one at a time, by priority class (safety, mode,
+# motion, then status reads) and round-robin across slave ids within each class, that a
+# transaction's exception is raised to its caller only, that a wait is bounded by its timeout (the
+# transaction is then dropped) and that a stopped bus refuses transactions. Runs against fake
+# transactions (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/bus_test.py
+import os, sys, time
+from threading import Thread, Event
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.bus import BusScheduler
+from base.lanes import PRIORITY_SAFETY, PRIORITY_MODE, PRIORITY_MOTION, PRIORITY_QUERY
+
+def test_arbitration():
+    bus = BusScheduler('test_arbitration')
+    order: list = []
+    release = Event()
+    threads: list = []
+
+    def submit(slave_id: int, label: str, priority: int):
+        bus.submit(slave_id, lambda: order.append(label), priority=priority)
+
+    # Hold the bus with a first transaction while the others queue up behind it
+    threads.append(Thread(target=bus.submit, args=(1, release.wait), daemon=True))
+    threads[-1].start()
+    time.sleep(0.05)
+    for slave_id, label, priority in [(1, 'r1', PRIORITY_QUERY), (1, 'r1b', PRIORITY_QUERY), (2, 'r2', PRIORITY_QUERY),
+                                      (1, 'c1', PRIORITY_MOTION), (1, 'c1b', PRIORITY_MOTION), (2, 'c2', PRIORITY_MOTION),
+                                      (3, 'c3', PRIORITY_MOTION), (3, 'm3', PRIORITY_MODE), (2, 's2', PRIORITY_SAFETY)]:
+        threads.append(Thread(target=submit, args=(slave_id, label, priority), daemon=True))
+        threads[-1].start()
+        time.sleep(0.02)
+    release.set()
+    for thread in threads:
+        thread.join(2.0)
+    bus.stop()
+    # Safety, mode, then motion (round-robin 1, 2, 3, 1), then reads (round-robin 1, 2, 1)
+    assert order[:6] == ['s2', 'm3', 'c1', 'c2', 'c3', 'c1b'], order
+    assert order[6:] == ['r1', 'r2', 'r1b'], order
+    stats = bus.stats['slaves']
+    assert stats[1]['commands'] == 2 and stats[1]['reads'] == 3 and stats[3]['commands'] == 2, stats
+
+def test_exclusive():
+    bus = BusScheduler('test_exclusive')
+    active: list = []
+    overlaps: list = []
+
+    def transaction():
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.005)
+        active.pop()
+
+    threads = [Thread(target=lambda i=i: [bus.submit(i % 3, transaction, priority=PRIORITY_MOTION if i % 2 else PRIORITY_QUERY) for _ in range(5)], daemon=True)
+               for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5.0)
+    bus.stop()
+    assert len(overlaps) == 30 and max(overlaps) == 1, overlaps
+
+def test_exception():
+    bus = BusScheduler('test_exception')
+    try:
+        bus.submit(1, lambda: 1 / 0)
+        assert False, "the transaction exception was not raised"
+    except ZeroDivisionError:
+        pass
+    # The bus keeps serving other transactions
+    assert bus.submit(2, lambda: 'ok') == 'ok'
+    bus.stop()
+    assert bus.stats['slaves'][1]['errors'] == 1, bus.stats
+
+def test_timeout_and_stop():
+    bus = BusScheduler('test_timeout')
+    release = Event()
+    ran: list = []
+    holder = Thread(target=bus.submit, args=(1, release.wait), daemon=True)
+    holder.start()
+    time.sleep(0.05)
+    # A transaction that cannot run in time raises to its caller and is then dropped, not run late
+    try:
+        bus.submit(2, lambda: ran.append('late'), timeout=0.05)
+        assert False, "the wait was not bounded"
+    except TimeoutError:
+        pass
+    release.set()
+    holder.join(2.0)
+    assert bus.submit(2, lambda: 'ok', timeout=1.0) == 'ok' and ran == []
+    assert bus.stats['slaves'][2]['expired'] == 1, bus.stats
+    # A stopped bus refuses transactions rather than starting its thread again
+    bus.stop()
+    for _ in range(2):
+        try:
+            bus.submit(1, lambda: ran.append('stopped'))
+            assert False, "a stopped bus ran a transaction"
+        except RuntimeError:
+            pass
+    assert ran == [] and not bus._thread.is_alive()
+
+if __name__ == "__main__":
+    test_arbitration()
+    test_exclusive()
+    test_exception()
+    test_timeout_and_stop()
+    print("Bus checks OK")
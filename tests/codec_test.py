@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# Robotiq codec round trips
+# Checks that every output message survives encode -> registers -> bytes, and that random status
+# messages decode identically from bytes, byte lists and registers (and in bulk, if NumPy is
+# installed, from byte rows of any integer type or from registers when asked for).
+#
+# Usage (from the package root):
+#   python tests/codec_test.py
+import itertools, os, random, sys
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from grippers.robotiq.codec import (InputMsg, OutputMsg, encode_output, to_registers, from_registers,
+                                    decode_input, decode_registers, decode_inputs)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def test_output_round_trip():
+    buffer = bytearray(6)
+    values = range(0, 256, 5)
+    for act, gto, atr, position, speed, force in itertools.product((0, 1), (0, 1), (0, 1), values, values, (0, 255)):
+        message = bytes(encode_output(OutputMsg(act, gto, atr, position, speed, force), buffer))
+        assert message == bytes([act | gto << 3 | atr << 4, 0, 0, position, speed, force]), message
+        assert from_registers(to_registers(message)) == message
+        assert to_registers(list(message)) == to_registers(message)
+
+def test_input_decode(samples: int = 20000):
+    rows: list = []
+    for _ in range(samples):
+        value = bytes([random.randrange(256), 0] + [random.randrange(256) for _ in range(4)])
+        registers = to_registers(value)
+        expected = InputMsg(value[0] & 0x01, (value[0] >> 3) & 0x01, (value[0] >> 4) & 0x03, (value[0] >> 6) & 0x03,
+                            value[2], value[3], value[4], value[5])
+        assert decode_input(value) == expected, value
+        assert decode_input(list(value)) == expected, value
+        assert decode_registers(registers) == expected, registers
+        assert decode_input(value, InputMsg()) == expected, value
+        rows.append((value, registers, expected))
+
+    if np is None:
+        print("NumPy not installed, skipping bulk decode")
+        return
+    for columns in (decode_inputs(np.frombuffer(b''.join(row[0] for row in rows), dtype=np.uint8).reshape(-1, 6)),
+                    decode_inputs([list(row[0]) for row in rows]),
+                    decode_inputs([row[1] for row in rows], registers=True),
+                    decode_inputs(np.array([row[1] for row in rows], dtype=np.uint16), registers=True)):
+        for i, (_, _, expected) in enumerate(rows):
+            assert all(int(columns[field][i]) == getattr(expected, field) for field in columns), i
+
+def test_bulk_decode_checks():
+    if np is None:
+        return
+    # Samples are bytes unless registers are asked for, whatever their dtype
+    for samples, registers in (([[0x31, 0, 0, 0x64, 0x64]], False), ([[0x3100, 0x0064]], True),
+                               ([[0x3100, 0, 0, 0, 0, 0]], False), ([[-1, 0, 0]], True),
+                               (np.zeros((1, 6), dtype=np.float32), False), (np.zeros(6, dtype=np.uint8), False)):
+        try:
+            decode_inputs(samples, registers=registers)
+        except ValueError:
+            continue
+        raise AssertionError(f"decoded {samples!r} (registers={registers})")
+
+if __name__ == "__main__":
+    test_output_round_trip()
+    test_input_decode()
+    test_bulk_decode_checks()
+    print("Codec round trips OK")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# Closed-loop control
+# Checks the control loop timing (a tick running past the next deadline is counted as an overrun
+# and the deadlines it missed are skipped, not run late in a burst), that a compliant grasp holds
+# on contact, that control requests only create registered controllers with a finite, bounded rate
+# and options, and runs one against the simulator through a client worker (completed event).
+#
+# Usage (from the package root):
+#   python tests/control_test.py
+import os, sys, time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.control import Controller, ControlLoop
+from base.plugins import PluginRegistry
+from base.worker import ClientWorker
+from gripper import create_control
+from grippers import PLUGINS
+from grippers.robotiq.client import RobotiqModbusSerialClient, RobotiqInterpreter
+from grippers.robotiq.control import CompliantGraspController
+from grippers.robotiq.simulator import RobotiqSimulator
+
+class Counter(Controller):
+    """Commands a new position every tick, done after a number of ticks
+    """
+    def __init__(self, ticks: int = 1000):
+        super().__init__()
+        self._ticks: int = ticks
+        self.count: int = 0
+
+    def update(self, status, dt: float):
+        self.count += 1
+        self.done = self.count >= self._ticks
+        return {'position': self.count % 256}
+
+def test_overrun_and_skip():
+    loop = ControlLoop(spin=0.0)
+    events: list = []
+    loop.start(Counter(), rate=100.0, control_id='c1', reply=events.append)
+    interpreter = RobotiqInterpreter()
+    status = SimpleNamespace(gPO=0)
+    # An on time tick
+    assert loop.due()
+    loop.begin()
+    assert loop.step(status, interpreter, 0.01) is not None
+    loop.end()
+    assert loop.stats['overruns'] == 0 and not loop.due()
+    # A tick that runs for 3.5 periods overruns, and the next tick skips the deadlines it missed
+    time.sleep(loop.time_to_next())
+    loop.begin()
+    time.sleep(0.035)
+    loop.end()
+    assert loop.stats['overruns'] == 1 and loop.due(), loop.stats
+    loop.begin()
+    loop.end()
+    stats = loop.stats
+    assert stats['skipped'] in (2, 3) and stats['ticks'] == 3, stats
+    # Every recorded lateness is under a period once the missed deadlines are skipped
+    assert stats['jitter_ms']['max'] < 10.0, stats
+    assert loop.cancel() and [event['event'] for event in events] == ['started', 'stopped'], events
+    assert events[-1]['ticks'] == 3
+
+def test_compliant_grasp():
+    controller = CompliantGraspController(position=200, current_limit=40, step=10, hold_force=20, settle_ticks=2)
+    controller.start(SimpleNamespace(gPO=0))
+    free = SimpleNamespace(gPO=0, gPR=0, gCU=3, gOBJ=0)
+    assert controller.update(free, 0.01)['position'] == 10
+    assert controller.update(free, 0.01)['position'] == 20
+    # Contact holds the fingers where they are with the hold force until settled
+    contact = SimpleNamespace(gPO=35, gPR=30, gCU=45, gOBJ=0)
+    assert controller.update(contact, 0.01) == {'position': 35, 'force': 20, 'go': 1}
+    assert not controller.done
+    controller.update(SimpleNamespace(gPO=36, gPR=35, gCU=45, gOBJ=2), 0.01)
+    assert controller.done and controller.result['contact'] and controller.result['peak_current'] == 45
+
+def test_create_control():
+    plugins = PluginRegistry(PLUGINS)
+    config = {'control': {'rate': 100.0}}
+    control = create_control(plugins, config, {'controller': 'CompliantGraspController', 'position': 200, 'id': 'g1'})
+    assert isinstance(control['controller'], CompliantGraspController) and control['rate'] == 100.0 and control['id'] == 'g1'
+    for spec in ({'controller': 'os:system'}, {'controller': 'grippers.robotiq.control:CompliantGraspController'},
+                 {'controller': 'RobotiqInterpreter'}, {'controller': ['CompliantGraspController']}, {},
+                 {'controller': 'CompliantGraspController', 'rate': float('inf')},
+                 {'controller': 'CompliantGraspController', 'rate': 1e6},
+                 {'controller': 'CompliantGraspController', 'rate': 0},
+                 {'controller': 'CompliantGraspController', 'rate': '50'},
+                 {'controller': 'CompliantGraspController', 'position': float('inf')},
+                 {'controller': 'CompliantGraspController', 'position': float('nan')},
+                 {'controller': 'CompliantGraspController', 'position': 10 ** 400},
+                 {'controller': 'CompliantGraspController', 'position': 300},
+                 {'controller': 'CompliantGraspController', 'step': 0},
+                 {'controller': 'SlipReactionController', 'force_step': '25'},
+                 {'controller': 'SlipReactionController', 'bogus': 1}):
+        try:
+            create_control(plugins, config, spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {spec}")
+
+def test_worker_control(port: int = 5092):
+    sim = RobotiqSimulator(port=port, activation_time=0.1, object_position=120)
+    sim.start()
+    client = RobotiqModbusSerialClient(interpreter=RobotiqInterpreter(), port=sim.url, slave_id=9, timeout=0.2)
+    worker = ClientWorker('control', client, status_rate=20.0)
+    events: list = []
+    try:
+        assert client.connect() and client.setup()
+        worker.start()
+        worker.put({'control': {
+            'controller': CompliantGraspController(position=255, step=20, settle_ticks=3),
+            'rate': 50.0, 'id': 'g1'}, 'reply': events.append})
+        deadline = time.monotonic() + 10.0
+        while not any(event['event'] == 'completed' for event in events) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        completed = events[-1]
+        assert [event['event'] for event in events] == ['started', 'completed'], events
+        assert completed['id'] == 'g1' and completed['contact'] and completed['ticks'] >= 3, completed
+        # The fingers are held at the object rather than closing on to the target
+        assert sim.devices[9].status.gPO <= 120 and worker.stats['control']['writes'] > 0, sim.devices[9].status
+    finally:
+        worker.stop()
+        client.disconnect()
+        sim.stop()
+
+if __name__ == "__main__":
+    test_overrun_and_skip()
+    test_compliant_grasp()
+    test_create_control()
+    test_worker_control()
+    print("Control checks OK")
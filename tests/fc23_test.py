@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# Combined write/read (FC23) transaction
+# Checks that a command and status read go out as one Read/Write Multiple Registers request, and
+# that the client falls back to separate write and read transactions for the rest of the session
+# only when the device refuses FC23 (Illegal Function): a device that does not answer (e.g.,
+# unpowered) fails the transaction and keeps FC23. Runs against a fake Modbus client (no bus or
+# simulator needed).
+#
+# Usage (from the package root):
+#   python tests/fc23_test.py
+import asyncio, os, sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from pymodbus.exceptions import ModbusIOException
+from base.client import Client, AsyncClient
+from grippers.robotiq.client import RobotiqModbusSerialClient, RobotiqInterpreter
+
+# Status registers of an activated gripper holding position 0x64
+REGISTERS = [0x3100, 0x0064, 0x6400]
+
+class FakeResponse:
+    def __init__(self, registers: list = None, exception_code: int = None):
+        self.registers: list = registers or []
+        self.exception_code: int = exception_code
+
+    def isError(self) -> bool:
+        return self.exception_code is not None
+
+class FakeModbus:
+    """Records requests by function and answers FC23 as configured ('ok', 'illegal' or 'silent')
+    """
+    def __init__(self, fc23: str = 'ok'):
+        self.fc23: str = fc23
+        # Transport settings adjusted by the client's adaptive timeouts
+        self.comm_params = SimpleNamespace(timeout_connect=None)
+        self.socket = None
+        self.calls: list = []
+
+    def readwrite_registers(self, read_address, read_count, write_address, values, slave):
+        self.calls.append(('fc23', write_address, list(values)))
+        if self.fc23 == 'silent':
+            raise ModbusIOException("No response received")
+        if self.fc23 == 'illegal':
+            return FakeResponse(exception_code=1)
+        return FakeResponse(REGISTERS[:read_count])
+
+    def write_registers(self, address, values, slave):
+        self.calls.append(('write', address, list(values)))
+        return FakeResponse()
+
+    def read_holding_registers(self, address, count, slave):
+        self.calls.append(('read', address, count))
+        return FakeResponse(REGISTERS[:count])
+
+def _client(fc23: str) -> RobotiqModbusSerialClient:
+    client = RobotiqModbusSerialClient(interpreter=RobotiqInterpreter())
+    client._client = FakeModbus(fc23)
+    client._connected = True
+    return client
+
+def _output(client: RobotiqModbusSerialClient, value: str) -> list:
+    return client.get_interpreter().generate_output(value)
+
+def test_single_transaction():
+    client = _client('ok')
+    status = client.send_and_get_status(_output(client, '100'))
+    assert list(status) == [0x31, 0, 0, 0x64, 0x64, 0], status
+    assert client._client.calls == [('fc23', 0x03E8, [0x0000, 0x0064, 0x0000])], client._client.calls
+
+def test_illegal_function_fallback():
+    client = _client('illegal')
+    assert list(client.send_and_get_status(_output(client, '100')))[3] == 0x64
+    assert list(client.send_and_get_status(_output(client, '50')))[3] == 0x64
+    # Refused once, then separate write/read transactions for the rest of the session
+    assert [call[0] for call in client._client.calls] == ['fc23', 'write', 'read', 'write', 'read'], client._client.calls
+
+def test_silent_no_fallback():
+    client = _client('silent')
+    assert not client.send_and_get_status(_output(client, '100'))
+    # FC23 is resent up to the retry limit, then the link is down but FC23 is kept
+    expected = ['fc23'] * (client._max_retries + 1)
+    assert [call[0] for call in client._client.calls] == expected, client._client.calls
+    assert not client._connected and client._fc23_supported
+
+def test_no_fallback_once_confirmed():
+    client = _client('ok')
+    assert client.send_and_get_status(_output(client, '100'))
+    # A timeout after FC23 has worked is a bus failure, not a lack of support
+    client._client.fc23 = 'silent'
+    assert not client.send_and_get_status(_output(client, '50'))
+    assert not client._connected and client._fc23_supported
+
+class FailingClient(Client):
+    """A client using the default send_and_get_status (separate send and status read) whose
+    sends always fail
+    """
+    def setup(self):
+        return True
+
+    def send(self, command) -> bool:
+        return False
+
+    def connect(self) -> bool:
+        return True
+
+    def disconnect(self):
+        pass
+
+    def get_status(self):
+        raise AssertionError("status read after a failed send")
+
+class AsyncFailingClient(AsyncClient):
+    """Asyncio variant of the FailingClient
+    """
+    async def setup(self):
+        return True
+
+    async def send(self, command) -> bool:
+        return False
+
+    async def connect(self) -> bool:
+        return True
+
+    async def disconnect(self):
+        pass
+
+    async def get_status(self):
+        raise AssertionError("status read after a failed send")
+
+def test_default_failure_is_empty_bytes():
+    # The same empty status as the Modbus clients return on failure
+    assert FailingClient(RobotiqInterpreter()).send_and_get_status(b'\x01') == b''
+    assert asyncio.run(AsyncFailingClient(RobotiqInterpreter()).send_and_get_status(b'\x01')) == b''
+
+if __name__ == "__main__":
+    test_single_transaction()
+    test_illegal_function_fallback()
+    test_silent_no_fallback()
+    test_no_fallback_once_confirmed()
+    test_default_failure_is_empty_bytes()
+    print("FC23 checks OK")
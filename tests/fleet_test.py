@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# Fleet mode routing and isolation
+# Checks that commands are routed to the worker of the addressed gripper (the first configured one
+# when no gripper is given), that unknown grippers are dropped and that a slow gripper does not
+# delay commands to another. Runs against fake clients (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/fleet_test.py
+import os, sys, time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.worker import ClientWorker
+from base.lanes import PRIORITY_MOTION
+from gripper import GripperHandler, gripper_configs
+from grippers.robotiq.client import RobotiqInterpreter
+
+STATUS = [0x31, 0, 0, 0, 0, 0]
+
+class FakeClient:
+    """Records the outputs written (each taking delay seconds)
+    """
+    def __init__(self, delay: float = 0.0):
+        self.interpreter = RobotiqInterpreter()
+        self.delay: float = delay
+        self.writes: list = []
+        self._connected: bool = False
+
+    def get_interpreter(self):
+        return self.interpreter
+
+    def connect(self) -> bool:
+        self._connected = True
+        return True
+
+    def setup(self) -> bool:
+        return True
+
+    def get_status(self) -> list:
+        return list(STATUS)
+
+    def send_and_get_status(self, output, priority: int = PRIORITY_MOTION) -> list:
+        time.sleep(self.delay)
+        self.writes.append((time.monotonic(), list(output)))
+        return list(STATUS)
+
+    @property
+    def stats(self) -> dict:
+        return {}
+
+def _handler(clients: dict) -> GripperHandler:
+    handler = GripperHandler()
+    for name, client in clients.items():
+        handler._workers[name] = ClientWorker(name=name, client=client, command_rate=0)
+    handler._default_id = next(iter(handler._workers))
+    for worker in handler._workers.values():
+        worker.start()
+    return handler
+
+def _stop(handler: GripperHandler):
+    for worker in handler._workers.values():
+        worker.stop()
+
+def test_gripper_configs():
+    assert gripper_configs({'connection': {'port': 'COM4'}}) == [{'port': 'COM4', 'id': 'default'}]
+    fleet = {'grippers': [{'id': 'left', 'port': 'COM4'}, {'id': 'right', 'port': 'COM5'}]}
+    assert [entry['id'] for entry in gripper_configs(fleet)] == ['left', 'right']
+
+def test_routing():
+    left, right = FakeClient(), FakeClient()
+    handler = _handler({'left': left, 'right': right})
+    try:
+        handler._route({'command': '10'})
+        handler._route({'command': '20', 'gripper': 'right'})
+        handler._route({'command': '30', 'gripper': 'missing'})
+        time.sleep(0.2)
+    finally:
+        _stop(handler)
+    assert [output[3] for _, output in left.writes] == [10], left.writes
+    assert [output[3] for _, output in right.writes] == [20], right.writes
+
+def test_isolation(delay: float = 0.5):
+    slow, fast = FakeClient(delay=delay), FakeClient()
+    handler = _handler({'slow': slow, 'fast': fast})
+    try:
+        start = time.monotonic()
+        handler._route({'command': '10', 'gripper': 'slow'})
+        handler._route({'command': '20', 'gripper': 'fast'})
+        deadline = start + 2 * delay
+        while not (slow.writes and fast.writes) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        _stop(handler)
+    assert fast.writes and fast.writes[0][0] - start < delay / 2, "the fast gripper waited for the slow one"
+    assert slow.writes and slow.writes[0][0] - start >= delay
+
+if __name__ == "__main__":
+    test_gripper_configs()
+    test_routing()
+    test_isolation()
+    print("Fleet checks OK")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Command frame validation and isolation
+# Checks that JSON, binary and legacy frames parse into interface data, that frames with an action
+# that is not a string or a field that is not a finite number within its register range are
+# rejected, that the interpreter ignores such fields given directly, and that data which cannot
+# be routed or dispatched is dropped without ending the handler or worker loops. Runs against a
+# fake client (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/frames_test.py
+import os, sys, time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.worker import ClientWorker
+from base.lanes import PRIORITY_MOTION
+from gripper import GripperHandler, load_config, plugin_registry
+from grippers.robotiq.client import RobotiqInterpreter
+from grippers.robotiq.interface import _parse_message
+
+STATUS = [0x31, 0, 0, 0, 0, 0]
+
+class FakeClient:
+    """Records the outputs written
+    """
+    def __init__(self):
+        self.interpreter = RobotiqInterpreter()
+        self.writes: list = []
+        self._connected: bool = False
+
+    def get_interpreter(self):
+        return self.interpreter
+
+    def connect(self) -> bool:
+        self._connected = True
+        return True
+
+    def setup(self) -> bool:
+        return True
+
+    def get_status(self) -> list:
+        return list(STATUS)
+
+    def send_and_get_status(self, output, priority: int = PRIORITY_MOTION) -> list:
+        self.writes.append(list(output))
+        return list(STATUS)
+
+    @property
+    def stats(self) -> dict:
+        return {}
+
+def test_valid_frames():
+    assert _parse_message('{"position": 128, "speed": 200.0, "gripper": "left"}')['command'] == {'position': 128, 'speed': 200.0}
+    assert _parse_message('[{"action": "activate"}, {"position": 255}]')['command'] == [{'action': 'activate'}, {'position': 255}]
+    assert _parse_message('{"trajectory": [{"t": 0, "position": 0}, {"t": 0.5, "position": 200}]}')['trajectory']['waypoints']
+    assert _parse_message(bytes([0x01, 0x00, 0x01, 128, 0, 0]))['command'] == [{'position': 128}]
+    data = _parse_message('left:128')
+    assert data['command'] == '128' and data['gripper'] == 'left' and 'received' in data['stamps'], data
+
+def test_invalid_frames():
+    for message in ('{"position": 1e400}', '{"position": NaN}', '{"position": 256}', '{"speed": -1}',
+                    '{"force": "50"}', '{"go": true}', '{"action": ["reset"]}', '{"action": {"a": 1}}',
+                    '{"commands": [{"position": 10}, {"position": Infinity}]}', '[1, 2]',
+                    '{"trajectory": [{"t": 1e400, "position": 10}]}', '{"trajectory": [{"t": 0, "position": 999}]}',
+                    '{"trajectory": {"t": 0}}', '[' * 100000, '{"position": 128', bytes([0x02, 0x00])):
+        assert _parse_message(message) is None, message
+
+def test_interpreter_ignores_invalid_fields():
+    interpreter = RobotiqInterpreter()
+    before = bytes(interpreter.generate_output({'position': 100}))
+    assert bytes(interpreter.generate_output({'position': float('inf'), 'action': ['reset']})) == before
+    assert bytes(interpreter.generate_output('1' * 5000)) == before
+    assert not interpreter.is_barrier({'action': ['reset']}) and interpreter.is_barrier({'action': 'reset'})
+
+def test_bad_data_dropped():
+    client = FakeClient()
+    handler = GripperHandler()
+    worker = ClientWorker(name='left', client=client, command_rate=0)
+    handler._workers['left'] = worker
+    handler._default_id = 'left'
+    handler._plugins = plugin_registry(load_config())
+    worker.start()
+    try:
+        # A reply that raises while rejecting a control request, and malformed worker data, are
+        # logged and dropped, and the following commands still arrive
+        def reply(message: dict):
+            raise RuntimeError("client gone")
+        handler._route({'control': {'controller': 'Unknown'}, 'reply': reply})
+        handler._route({'command': {'position': 10}, 'gripper': ['left']})
+        worker.put({'trajectory': None})
+        worker.put({'control': {'rate': 50.0}})
+        handler._route({'command': {'position': 200}})
+        deadline = time.monotonic() + 2.0
+        while not client.writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.writes and client.writes[-1][3] == 200, client.writes
+        assert worker._thread.is_alive()
+    finally:
+        worker.stop()
+
+if __name__ == "__main__":
+    test_valid_frames()
+    test_invalid_frames()
+    test_interpreter_ignores_invalid_fields()
+    test_bad_data_dropped()
+    print("Frame checks OK")
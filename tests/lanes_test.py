@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# Priority lanes
+# Checks that lane queues serve items by priority class (FIFO within a class), that a safety or
+# mode item cancels the motion queued before it (reporting each cancelled item), and that waiting
+# for an urgent item wakes on one arriving (in both the threaded and asyncio queues).
+#
+# Usage (from the package root):
+#   python tests/lanes_test.py
+import asyncio, os, sys, threading, time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.lanes import LaneQueue, AsyncLaneQueue, PRIORITY_SAFETY, PRIORITY_MODE, PRIORITY_MOTION, PRIORITY_QUERY
+
+# Items are (priority, name)
+def priority(item: tuple) -> int:
+    return item[0]
+
+def drain(queue) -> list:
+    return [queue.get_nowait() for _ in range(queue.qsize())]
+
+def test_priority_order():
+    queue = LaneQueue(priority)
+    for item in ((PRIORITY_QUERY, 'q1'), (PRIORITY_MOTION, 'm1'), (PRIORITY_MOTION, 'm2'), (PRIORITY_QUERY, 'q2')):
+        queue.put(item)
+    assert not queue.urgent()
+    assert [name for _, name in drain(queue)] == ['m1', 'm2', 'q1', 'q2']
+
+def test_urgent_cancels_motion():
+    cancelled: list = []
+    queue = LaneQueue(priority, cancel=cancelled.append)
+    for item in ((PRIORITY_MOTION, 'm1'), (PRIORITY_QUERY, 'q1'), (PRIORITY_MOTION, 'm2'),
+                 (PRIORITY_MODE, 'reset'), (PRIORITY_MOTION, 'm3'), (PRIORITY_SAFETY, 'stop')):
+        queue.put(item)
+    assert queue.urgent()
+    # Safety first, then mode; motion queued before either was cancelled (queries are kept)
+    assert [name for _, name in drain(queue)] == ['stop', 'reset', 'q1']
+    assert [name for _, name in cancelled] == ['m1', 'm2', 'm3'] and queue.cancelled == 3, cancelled
+
+def test_wait_urgent():
+    queue = LaneQueue(priority)
+    queue.put((PRIORITY_MOTION, 'm1'))
+    start = time.perf_counter()
+    assert not queue.wait_urgent(0.05)
+    assert time.perf_counter() - start >= 0.04
+    threading.Timer(0.05, queue.put, args=((PRIORITY_SAFETY, 'stop'),)).start()
+    start = time.perf_counter()
+    assert queue.wait_urgent(2.0)
+    assert time.perf_counter() - start < 1.0, "an urgent item did not wake the wait"
+
+def test_async_lanes():
+    async def run():
+        cancelled: list = []
+        queue = AsyncLaneQueue(priority, cancel=cancelled.append)
+        queue.put_nowait((PRIORITY_MOTION, 'm1'))
+        assert not await queue.wait_urgent(0.05)
+        asyncio.get_running_loop().call_later(0.05, queue.put_nowait, (PRIORITY_MODE, 'activate'))
+        start = time.perf_counter()
+        assert await queue.wait_urgent(2.0)
+        assert time.perf_counter() - start < 1.0, "an urgent item did not wake the wait"
+        queue.put_nowait((PRIORITY_MOTION, 'm2'))
+        assert [name for _, name in drain(queue)] == ['activate', 'm2']
+        assert [name for _, name in cancelled] == ['m1'] and queue.cancelled == 1, cancelled
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_priority_order()
+    test_urgent_cancels_motion()
+    test_wait_urgent()
+    test_async_lanes()
+    print("Lane checks OK")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# Rate limited, queue-backed logging
+# Checks that records from one call site are limited to a burst per period (and the next passed
+# record notes how many were suppressed), that call sites are limited independently and that the
+# queue handler drops records instead of blocking when its queue is full.
+#
+# Usage (from the package root):
+#   python tests/log_test.py
+import os, sys, time, logging
+from queue import Queue
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.log import RateLimitFilter, NonBlockingQueueHandler
+
+def _record(message: str = 'message', lineno: int = 1) -> logging.LogRecord:
+    return logging.LogRecord('test', logging.INFO, __file__, lineno, message, None, None)
+
+def test_rate_limit(period: float = 0.1):
+    limit = RateLimitFilter(burst=3, period=period)
+    passed = [limit.filter(_record()) for _ in range(5)]
+    assert passed == [True, True, True, False, False] and limit.suppressed == 2, passed
+    # Another call site has its own budget
+    assert limit.filter(_record(lineno=2))
+    time.sleep(period)
+    record = _record()
+    assert limit.filter(record) and record.msg == 'message (2 similar suppressed)', record.msg
+
+def test_rate_limit_disabled():
+    limit = RateLimitFilter(burst=0)
+    assert all(limit.filter(_record()) for _ in range(100)) and limit.suppressed == 0
+
+def test_queue_full():
+    handler = NonBlockingQueueHandler(Queue(maxsize=2))
+    start = time.monotonic()
+    for i in range(5):
+        handler.emit(_record(f'message {i}'))
+    assert time.monotonic() - start < 0.5, "a full queue blocked the caller"
+    assert handler.queue.qsize() == 2 and handler.dropped == 3, handler.dropped
+
+def test_exception_rendered():
+    handler = NonBlockingQueueHandler(Queue())
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = logging.LogRecord('test', logging.ERROR, __file__, 1, 'failed', None, sys.exc_info())
+    prepared = handler.prepare(record)
+    assert prepared.exc_info is None and 'ZeroDivisionError' in prepared.exc_text, prepared.exc_text
+
+if __name__ == "__main__":
+    test_rate_limit()
+    test_rate_limit_disabled()
+    test_queue_full()
+    test_exception_rendered()
+    print("Logging checks OK")
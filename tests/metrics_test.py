@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# Latency histograms and the metrics endpoint
+# Checks histogram bucketing, quantile estimates and the cumulative Prometheus export, that the
+# registry keeps one histogram per label set, that nested stats render as gauges and that the
+# endpoint serves the rendered text (on a local ephemeral port).
+#
+# Usage (from the package root):
+#   python tests/metrics_test.py
+import os, sys, math
+from urllib.request import urlopen
+from urllib.error import HTTPError
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.metrics import Histogram, MetricsRegistry, MetricsServer, render_stats
+
+def test_histogram():
+    hist = Histogram(buckets=(0.001, 0.01, 0.1))
+    for value in (0.0005, 0.001, 0.005, 0.05, 0.05, 1.0):
+        hist.observe(value)
+    snapshot = hist.snapshot()
+    assert snapshot['count'] == 6 and math.isclose(snapshot['sum'], 1.1065), snapshot
+    # Quantiles are the upper bound of their bucket (+Inf above the last bound)
+    assert hist.quantile(0.5) == 0.01 and hist.quantile(0.8) == 0.1 and hist.quantile(1.0) == math.inf
+    lines = hist.render('latency', 'stage="send"')
+    assert lines[:4] == ['latency_bucket{stage="send",le="0.001"} 2', 'latency_bucket{stage="send",le="0.01"} 3',
+                         'latency_bucket{stage="send",le="0.1"} 5', 'latency_bucket{stage="send",le="+Inf"} 6'], lines
+    assert lines[-1] == 'latency_count{stage="send"} 6', lines
+    assert Histogram().quantile(0.5) == 0.0
+
+def test_registry():
+    registry = MetricsRegistry()
+    send = registry.histogram('latency', 'Stage latency', stage='send', gripper='left')
+    assert registry.histogram('latency', gripper='left', stage='send') is send
+    assert registry.histogram('latency', stage='queue', gripper='left') is not send
+    send.observe(0.002)
+    snapshot = registry.snapshot()['latency']
+    assert snapshot['gripper=left,stage=send']['count'] == 1 and snapshot['gripper=left,stage=queue']['count'] == 0, snapshot
+    text = registry.render()
+    assert '# TYPE latency histogram' in text and 'latency_count{gripper="left",stage="send"} 1' in text, text
+
+def test_render_stats():
+    text = render_stats({'left': {'scheduler': {'sent': 3, 'name': 'left'}, 'connected': True}})
+    assert 'gripper_stat{path="left.scheduler.sent"} 3.0' in text and 'gripper_stat{path="left.connected"} 1.0' in text, text
+    assert 'name' not in text.split('# TYPE')[1], text
+
+def test_endpoint():
+    server = MetricsServer(lambda: 'metric 1\n', host='127.0.0.1', port=0)
+    assert server.start()
+    port = server._server.server_address[1]
+    try:
+        with urlopen(f'http://127.0.0.1:{port}/metrics', timeout=2.0) as response:
+            assert response.status == 200 and response.read() == b'metric 1\n'
+        try:
+            urlopen(f'http://127.0.0.1:{port}/other', timeout=2.0)
+            assert False, "an unknown path was served"
+        except HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    test_histogram()
+    test_registry()
+    test_render_stats()
+    test_endpoint()
+    print("Metrics checks OK")
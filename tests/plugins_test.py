@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# Lazy plugin registry
+# Checks that registered names load their entry point once (and record the import time), that
+# unknown names are rejected (and raw entry points when loading strictly), and that importing the
+# grippers package or loading a client does not import the websocket interface (checked in a
+# fresh interpreter).
+#
+# Usage (from the package root):
+#   python tests/plugins_test.py
+import os, sys, subprocess
+
+SRC = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC)
+from base.plugins import PluginRegistry, load_entry_point
+from grippers import PLUGINS
+
+def test_load():
+    registry = PluginRegistry(PLUGINS)
+    interpreter = registry.load('RobotiqInterpreter')
+    assert interpreter is load_entry_point('grippers.robotiq.client:RobotiqInterpreter')
+    assert registry.load('RobotiqInterpreter') is interpreter
+    assert 'grippers.robotiq.client' in registry.stats['import_seconds'] and registry.stats['loaded'] == 1, registry.stats
+
+def test_register():
+    registry = PluginRegistry()
+    registry.register('Decoder', 'json:JSONDecoder')
+    assert registry.names == ['Decoder'] and registry.load('Decoder').__name__ == 'JSONDecoder'
+
+def test_unknown():
+    registry = PluginRegistry(PLUGINS)
+    try:
+        registry.load('MissingClient')
+        assert False, "an unknown plugin was loaded"
+    except ValueError as e:
+        assert 'RobotiqInterpreter' in str(e), e
+
+def test_strict():
+    registry = PluginRegistry(PLUGINS)
+    assert registry.load('RobotiqInterpreter', strict=True) is registry.load('RobotiqInterpreter')
+    # A raw entry point is only loaded from the config, never strictly (even once loaded)
+    assert registry.load('json:JSONDecoder').__name__ == 'JSONDecoder'
+    for name in ('json:JSONDecoder', 'os:system'):
+        try:
+            registry.load(name, strict=True)
+            assert False, f"{name} was loaded strictly"
+        except ValueError:
+            pass
+
+def test_lazy_import():
+    # A fresh interpreter so modules imported by other tests do not count
+    script = (
+        "import sys; import grippers; from base.plugins import PluginRegistry; "
+        "assert 'grippers.robotiq.client' not in sys.modules; "
+        "PluginRegistry(grippers.PLUGINS).load('RobotiqModbusSerialClient'); "
+        "assert 'grippers.robotiq.client' in sys.modules; "
+        "assert 'grippers.robotiq.interface' not in sys.modules and 'websockets' not in sys.modules"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=SRC, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+if __name__ == "__main__":
+    test_load()
+    test_register()
+    test_unknown()
+    test_strict()
+    test_lazy_import()
+    print("Plugin checks OK")
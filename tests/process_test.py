@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# Process-split client
+# Checks that seqlock slots never return a torn value while written concurrently, and runs the
+# process client against the simulator: setup and a command round trip through the I/O process,
+# and a restart of the I/O process after it is killed.
+#
+# Usage (from the package root):
+#   python tests/process_test.py
+import os, sys, time
+from multiprocessing import RawArray
+from threading import Thread
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.shm import SeqlockSlot
+from grippers.robotiq.client import RobotiqInterpreter
+from grippers.robotiq.process import RobotiqProcessClient
+from grippers.robotiq.simulator import RobotiqSimulator
+
+def test_seqlock(writes: int = 20000):
+    buffer = RawArray('B', SeqlockSlot.size('II'))
+    writer, reader = SeqlockSlot(buffer, 'II'), SeqlockSlot(buffer, 'II')
+    assert reader.read() == (0, 0)
+    thread = Thread(target=lambda: [writer.write(i, i) for i in range(1, writes + 1)], daemon=True)
+    thread.start()
+    last = 0
+    while thread.is_alive() or last < writes:
+        first, second = reader.read()
+        # Both values come from the same write, and never go backwards
+        assert first == second and first >= last, (first, second, last)
+        last = first
+    thread.join()
+
+def test_round_trip(port: int = 5091):
+    sim = RobotiqSimulator(port=port, activation_time=0.1)
+    sim.start()
+    client = RobotiqProcessClient(interpreter=RobotiqInterpreter(), port=sim.url, slave_id=9, timeout=0.2)
+    try:
+        assert client.connect() and client.setup()
+        interpreter = client.get_interpreter()
+        status = client.send_and_get_status(interpreter.generate_output('100'))
+        assert len(status) == 6 and interpreter.interpret_input(status).gACT == 1, status
+        assert interpreter.is_motion_complete(client.wait_until_motion_complete(timeout=5.0))
+        assert sim.devices[9].status.gPO == 100 and client.stats['process']['transactions'] > 0, client.stats
+        assert interpreter.interpret_input(client.get_status()).gPO == 100
+        # A killed I/O process takes the link down and the next connect starts another
+        client._process.kill()
+        client._process.join(2.0)
+        assert not client._connected and not client.get_status()
+        assert client.connect() and client.stats['process']['restarts'] == 1, client.stats
+        assert interpreter.interpret_input(client.get_status()).gPO == 100
+    finally:
+        client.close()
+        sim.stop()
+
+if __name__ == "__main__":
+    test_seqlock()
+    test_round_trip()
+    print("Process client checks OK")
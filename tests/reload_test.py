@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# Config reload planning and rejection
+# Checks which grippers a changed config rebuilds (added, or their client spec changed, and every
+# gripper on an affected shared port) and removes, that a config with any invalid setting is
+# rejected before anything is applied (the running config is kept), and that the config watcher
+# survives a callback that raises. Needs no gripper or simulator (nothing is built).
+#
+# Usage (from the package root):
+#   python tests/reload_test.py
+import asyncio, copy, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import gripper
+from gripper import reload_plan, load_config
+from base.watcher import ConfigWatcher
+from base.worker import ClientWorker
+
+def fleet(*entries) -> dict:
+    config = load_config()
+    config['grippers'] = [dict(entry) for entry in entries]
+    return config
+
+LEFT = {'id': 'left', 'port': 'COM4', 'slave_id': 9}
+RIGHT = {'id': 'right', 'port': 'COM5', 'slave_id': 9}
+
+def test_reload_plan():
+    old = fleet(LEFT, RIGHT)
+    assert reload_plan(old, copy.deepcopy(old), 'client') == ([], [], set())
+    # A changed client option rebuilds only that gripper
+    assert reload_plan(old, fleet(LEFT, dict(RIGHT, timeout=0.3)), 'client') == (['right'], [], set())
+    # Added and removed grippers
+    assert reload_plan(old, fleet(LEFT, RIGHT, {'id': 'third', 'port': 'COM6', 'slave_id': 9}), 'client') == (['third'], [], set())
+    assert reload_plan(old, fleet(RIGHT), 'client') == ([], ['left'], set())
+    # A changed client type rebuilds every gripper using it
+    changed = dict(old, client='RobotiqProcessClient')
+    assert sorted(reload_plan(old, changed, 'client')[0]) == ['left', 'right']
+    # Rates and supervisor options change in place
+    assert reload_plan(old, dict(old, command_rate=10, supervisor={'heartbeat': 0.2}), 'client') == ([], [], set())
+
+def test_reload_plan_shared_port():
+    old = fleet(LEFT, dict(RIGHT, port='COM4', slave_id=10))
+    # Grippers on a shared port share a transport, so a change to one rebuilds both
+    build, removed, ports = reload_plan(old, fleet(LEFT, dict(RIGHT, port='COM4', slave_id=11)), 'client')
+    assert sorted(build) == ['left', 'right'] and removed == [] and ports == {'COM4'}, (build, ports)
+    # Moving a gripper off the shared port rebuilds the one left behind too
+    build, _, ports = reload_plan(old, fleet(LEFT, RIGHT), 'client')
+    assert sorted(build) == ['left', 'right'] and ports == {'COM4'}, (build, ports)
+
+def test_validate():
+    ClientWorker.validate(command_rate=0, status_rate=5, supervisor={'heartbeat': 0.5}, control={'spin': 0})
+    for options in ({'status_rate': 0}, {'command_rate': -1}, {'command_rate': '10'}, {'hold_timeout': True},
+                    {'policy': 'bogus'}, {'supervisor': {'heartbeat': 0}}, {'supervisor': {'bogus': 1}},
+                    {'supervisor': 'fast'}, {'control': {'max_failures': 0}}):
+        try:
+            ClientWorker.validate(**options)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {options}")
+
+def test_reload_rejected():
+    handler = gripper.GripperHandler()
+    running = fleet(LEFT, RIGHT)
+    handler._config = copy.deepcopy(running)
+    for change in ({'status_rate': 0}, {'supervisor': dict(running['supervisor'], policy='bogus')},
+                   {'supervisor': dict(running['supervisor'], bogus=1)}, {'control': {'spin': -1}},
+                   {'logging': {'level': 'LOUD'}}, {'logging': {'rate_limit': 'high'}},
+                   {'broadcast': {'rate': 'fast'}}):
+        assert not handler.reload(dict(running, **change)), change
+        assert handler._config == running and handler._workers == {}, change
+
+def test_async_reload_buses():
+    handler = gripper.AsyncGripperHandler()
+    handler._config = fleet(LEFT, RIGHT)
+    seen: list = []
+    def build_workers(config: dict, worker_cls: type, client_key: str, buses: dict) -> tuple:
+        seen.append(buses)
+        raise ValueError("not applied")
+    handler._build_workers = build_workers
+    # The workers are built with the handler's own bus map, as in the threaded handler
+    assert not asyncio.run(handler.reload(fleet(LEFT)))
+    assert seen == [handler._buses] and seen[0] is handler._buses
+
+def test_watcher_survives_callback_error():
+    path = os.path.join(tempfile.mkdtemp(), 'gripper.yaml')
+    with open(path, 'w') as f:
+        f.write("command_rate: 1\n")
+    calls: list = []
+    def callback(config: dict) -> bool:
+        calls.append(config)
+        if len(calls) == 1:
+            raise RuntimeError("reload failed")
+        return True
+    watcher = ConfigWatcher(path, load_config, callback, config={'command_rate': 1}, interval=0.02)
+    watcher.start()
+    try:
+        # Each change is a different size, so it is seen within the file system's time resolution
+        for count, rate in enumerate((20, 300), start=1):
+            with open(path, 'w') as f:
+                f.write(f"command_rate: {rate}\n")
+            deadline = time.monotonic() + 2.0
+            while len(calls) < count and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert [config['command_rate'] for config in calls] == [20, 300], calls
+        assert watcher.stats['errors'] == 1 and watcher.stats['reloads'] == 1, watcher.stats
+    finally:
+        watcher.stop()
+
+if __name__ == "__main__":
+    test_reload_plan()
+    test_reload_plan_shared_port()
+    test_validate()
+    test_reload_rejected()
+    test_async_reload_buses()
+    test_watcher_survives_callback_error()
+    print("Reload checks OK")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# Telemetry replay
+# Feeds the commands of a telemetry recording (see base.telemetry) back through the real
+# GrasshopperInterface -> GripperHandler -> RobotiqModbusSerialClient pipeline against simulated
+# Robotiq grippers (one per recorded gripper id), at the recorded pace or accelerated.
+# Each recorded output message is sent as the structured JSON command that reproduces it.
+#
+# Usage (from the package root):
+#   python tests/replay.py telemetry.bin --speed 1
+#   python tests/replay.py telemetry.bin --speed 10 --start 1718000000 --end 1718000600 --record replay.bin
+import argparse, asyncio, contextlib, json, os, sys, threading, time
+import websockets
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import gripper
+from base.telemetry import TelemetryReader, KIND_COMMAND
+from grippers.robotiq.client import RobotiqInterpreter
+from grippers.robotiq.simulator import RobotiqSimulator
+from benchmark import percentile, record_writes, INTERFACE_URL
+
+def load_commands(path: str, start: float = None, end: float = None, gripper_id: str = None) -> list:
+    """The recorded (time, gripper id, output message) commands of a window
+    """
+    reader = TelemetryReader(path)
+    try:
+        return [(stamp, gripper_name, data) for stamp, kind, gripper_name, data in reader.records(start, end)
+                if kind == KIND_COMMAND and (gripper_id is None or gripper_name == gripper_id)]
+    finally:
+        reader.close()
+
+def to_frames(commands: list) -> list:
+    """The (time, JSON frame) of each recorded command. A request for activation following a
+    reset is sent as an activate action
+    """
+    interpreter = RobotiqInterpreter()
+    active: dict = {}
+    frames: list = []
+    for stamp, gripper_id, data in commands:
+        command = interpreter.decode_output(data)
+        if command is None:
+            continue
+        if 'action' not in command and not active.get(gripper_id, True):
+            command['action'] = 'activate'
+        active[gripper_id] = 'action' not in command or command['action'] != 'reset'
+        frames.append((stamp, json.dumps(dict(command, gripper=gripper_id))))
+    return frames
+
+async def replay(frames: list, speed: float) -> list:
+    """Sends the frames at the recorded pace divided by speed. Returns each send's lateness (s)
+    """
+    lateness: list = []
+    async with websockets.connect(INTERFACE_URL) as ws:
+        origin = frames[0][0]
+        start = time.perf_counter()
+        for stamp, frame in frames:
+            due = start + (stamp - origin) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lateness.append(max(0.0, time.perf_counter() - due))
+            await ws.send(frame)
+        # Allow the final commands to reach the bus
+        await asyncio.sleep(0.5)
+    return lateness
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded gripper commands against simulated grippers")
+    parser.add_argument('recording', help="telemetry recording to replay")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed (1 is the recorded pace)")
+    parser.add_argument('--start', type=float, default=None, help="start of the window (wall time, s)")
+    parser.add_argument('--end', type=float, default=None, help="end of the window (wall time, s)")
+    parser.add_argument('--gripper', default=None, help="only replay this gripper id")
+    parser.add_argument('--record', default=None, help="record the replay's telemetry to this file")
+    parser.add_argument('--verbose', action='store_true', help="log the pipeline's output (at the configured logging level)")
+    args = parser.parse_args()
+
+    commands = load_commands(args.recording, args.start, args.end, args.gripper)
+    if not commands:
+        print("No commands recorded in the window")
+        return 1
+    frames = to_frames(commands)
+    ids: list = sorted({gripper_id for _, gripper_id, _ in commands})
+
+    simulators: list = []
+    entries: list = []
+    logs: dict = {}
+    for i, gripper_id in enumerate(ids):
+        sim = RobotiqSimulator(port=5020 + i, slaves=[9], activation_time=0.1)
+        simulators.append(sim)
+        entries.append({'id': gripper_id, 'port': sim.url, 'slave_id': 9})
+        logs[gripper_id] = record_writes(sim.devices[9])
+
+    config = gripper.load_config()
+    config['runtime'] = 'threaded'
+    config['grippers'] = entries
+    config['telemetry'] = {'path': os.path.realpath(args.record)} if args.record else {}
+
+    sink = sys.stdout if args.verbose else open(os.devnull, 'w')
+    with contextlib.redirect_stdout(sink):
+        if args.verbose:
+            gripper.configure_logging(config)
+        for sim in simulators:
+            sim.start()
+        handler = gripper.GripperHandler()
+        handler.create(config)
+        handler.setup()
+        threading.Thread(target=handler.run, daemon=True, name="Thread-Replay-Handler").start()
+        for gripper_id in ids:
+            handler.wait_for_status(lambda status: status.gSTA == 3, timeout=10.0, gripper_id=gripper_id)
+        for log in logs.values():
+            log.clear()
+
+        started = time.perf_counter()
+        lateness = asyncio.run(replay(frames, args.speed))
+        elapsed = time.perf_counter() - started
+        stats = handler.get_stats()
+        if handler._recorder is not None:
+            handler._recorder.close()
+
+    results = {
+        'recording': args.recording,
+        'speed': args.speed,
+        'recorded_seconds': commands[-1][0] - commands[0][0],
+        'replay_seconds': elapsed,
+        'commands': len(frames),
+        'lateness_ms': {
+            'p50': 1e3 * percentile(lateness, 50),
+            'p99': 1e3 * percentile(lateness, 99),
+            'max': 1e3 * max(lateness),
+        },
+        'grippers': {
+            gripper_id: {
+                'commands': sum(1 for _, name, _ in commands if name == gripper_id),
+                'written': len(logs[gripper_id]),
+                'recorded_position': [data for _, name, data in commands if name == gripper_id][-1][3],
+                'replayed_position': simulators[i].devices[9]._output.rPR,
+                'scheduler': {key: value for key, value in stats[gripper_id]['scheduler'].items() if not isinstance(value, dict)},
+            } for i, gripper_id in enumerate(ids)
+        },
+    }
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    # Handler threads are daemons, so exit without waiting on them
+    code = main()
+    sys.stdout.flush()
+    os._exit(code)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# Command scheduler planning and rate limiting
+# Checks that pending commands coalesce to the newest target, that barriers (reset/activate) are
+# sent in order between them, that urgent outputs skip the write rate limit and that motion
+# writes are spaced by it. Runs against a fake client (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/scheduler_test.py
+import os, sys, time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.scheduler import CommandScheduler
+from base.status import StatusCache
+from base.lanes import LaneQueue, PRIORITY_SAFETY, PRIORITY_MODE, PRIORITY_MOTION
+from grippers.robotiq.client import RobotiqInterpreter
+
+# An activated gripper at rest
+STATUS = bytes([0x31, 0, 0, 0, 0, 0])
+
+class FakeClient:
+    """Records the outputs written and answers each with a fixed status
+    """
+    def __init__(self):
+        self.interpreter = RobotiqInterpreter()
+        self.writes: list = []
+
+    def get_interpreter(self):
+        return self.interpreter
+
+    def send_and_get_status(self, output, priority: int = PRIORITY_MOTION) -> bytes:
+        self.writes.append((bytes(output), priority))
+        return STATUS
+
+def test_coalescing():
+    scheduler = CommandScheduler(FakeClient(), rate=0, name='test_coalescing')
+    # The planned outputs are views of one buffer, so each is copied before the next is planned
+    outputs = [(bytes(output), served, priority) for output, served, priority in
+               scheduler._plan(['10', '20', '30'], stamps=[1.0, 2.0, 3.0])]
+    assert len(outputs) == 1, outputs
+    output, served, priority = outputs[0]
+    assert output[3] == 30 and served == [1.0, 2.0, 3.0] and priority == PRIORITY_MOTION, outputs[0]
+    assert scheduler.stats['coalesced'] == 2, scheduler.stats
+
+def test_barrier_ordering():
+    scheduler = CommandScheduler(FakeClient(), rate=0, name='test_barrier_ordering')
+    outputs = [(bytes(output), served, priority) for output, served, priority in
+               scheduler._plan(['10', 'r', '20', '30', 'a', '40'])]
+    # The targets before each barrier are flushed (coalesced) ahead of it
+    assert [(output[0], output[3]) for output, _, _ in outputs] == [(0, 10), (0, 10), (0, 30), (9, 30), (9, 40)], outputs
+    assert [priority for _, _, priority in outputs] == [PRIORITY_MOTION, PRIORITY_MODE, PRIORITY_MOTION,
+                                                        PRIORITY_MODE, PRIORITY_MOTION], outputs
+    assert scheduler.stats['coalesced'] == 1, scheduler.stats
+
+def test_drain():
+    client = FakeClient()
+    scheduler = CommandScheduler(client, rate=0, name='test_drain')
+    queue = LaneQueue(client.interpreter.priority)
+    for value in ('10', '20', '30'):
+        queue.put(value)
+    assert scheduler.drain(queue, timeout=1.0) == ['10', '20', '30']
+    assert scheduler.stats['max_queue_depth'] == 3, scheduler.stats
+
+def test_urgent_bypass(rate: float = 5.0):
+    client = FakeClient()
+    scheduler = CommandScheduler(client, rate=rate, name='test_urgent_bypass')
+    scheduler.dispatch(['a'])
+    start = time.perf_counter()
+    scheduler.dispatch(['50'], priorities=[PRIORITY_SAFETY])
+    assert time.perf_counter() - start < 0.5 / rate, "an urgent write waited for the rate limit"
+    # Draining urgent data does not wait for the next write slot, draining motion does
+    queue = LaneQueue(client.interpreter.priority)
+    queue.put('r')
+    start = time.perf_counter()
+    assert scheduler.drain(queue, timeout=1.0) == ['r']
+    assert time.perf_counter() - start < 0.5 / rate, "an urgent drain waited for the rate limit"
+    queue.put('60')
+    start = time.perf_counter()
+    assert scheduler.drain(queue, timeout=1.0) == ['60']
+    assert time.perf_counter() - start >= 0.5 / rate, "a motion drain did not wait for the write slot"
+    assert [priority for _, priority in client.writes] == [PRIORITY_MODE, PRIORITY_SAFETY], client.writes
+
+def test_write_rate_limit(rate: float = 20.0, writes: int = 5):
+    client = FakeClient()
+    cache = StatusCache()
+    scheduler = CommandScheduler(client, rate=rate, cache=cache, name='test_write_rate_limit')
+    start = time.perf_counter()
+    for i in range(writes):
+        assert scheduler.dispatch([str(10 * (i + 1))])
+    elapsed = time.perf_counter() - start
+    assert elapsed >= 0.9 * (writes - 1) / rate, f"{writes} writes took {elapsed:.3f}s at {rate} Hz"
+    assert len(client.writes) == writes and client.writes[-1][0][3] == 10 * writes, client.writes
+    # Each write's status is published to the cache
+    assert cache.latest().seq == writes and cache.latest().status.gSTA == 3, cache.latest()
+
+if __name__ == "__main__":
+    test_coalescing()
+    test_barrier_ordering()
+    test_drain()
+    test_urgent_bypass()
+    test_write_rate_limit()
+    print("Scheduler checks OK")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# Session arbitration
+# Checks the exclusive policy (the first controller to command or lock a gripper holds it until it
+# unlocks or closes, stops always pass), the last writer policy (takeovers notify the superseded
+# session), that unaddressed commands and those naming the default gripper contend for the same
+# lock, observers, the session limit and per session rate limiting.
+#
+# Usage (from the package root):
+#   python tests/sessions_test.py
+import os, sys
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.sessions import SessionManager, POLICY_EXCLUSIVE, POLICY_LAST_WRITER, ROLE_OBSERVER
+
+def open_session(manager: SessionManager, **kwargs):
+    """Opens a session recording the events sent to it
+    """
+    session = manager.open(**kwargs)
+    session.events = []
+    session.reply = session.events.append
+    return session
+
+def events(session) -> list:
+    return [event['event'] for event in session.events]
+
+def resolve(gripper: str) -> str:
+    return gripper or 'left'
+
+def test_exclusive():
+    manager = SessionManager(policy=POLICY_EXCLUSIVE, rate=0, resolve=resolve)
+    first, second = open_session(manager), open_session(manager)
+    assert manager.admit(first, {'command': '10'})
+    assert not manager.admit(second, {'command': '20'})
+    assert manager.admit(second, {'command': '20', 'gripper': 'right'}), "grippers are arbitrated separately"
+    # Stops always pass
+    assert manager.admit(second, {'stop': True})
+    assert not manager.lock(second)
+    assert events(first) == ['locked'] and events(second) == ['denied', 'locked', 'denied'], second.events
+    assert manager.unlock(first)
+    assert manager.lock(second) and not manager.admit(first, {'command': '30'})
+    # Closing the holder releases its locks
+    manager.close(second)
+    assert manager.admit(first, {'command': '30'}) and manager.holders == {'left': first.id}, manager.holders
+
+def test_default_gripper_lock():
+    manager = SessionManager(policy=POLICY_EXCLUSIVE, rate=0, resolve=resolve)
+    first, second = open_session(manager), open_session(manager)
+    assert manager.admit(first, {'command': '10'})
+    # Naming the default gripper reaches the same lock as an unaddressed command
+    assert not manager.admit(second, {'command': '50', 'gripper': 'left'})
+    assert not manager.unlock(second, 'left') and manager.unlock(first, 'left')
+
+def test_last_writer():
+    manager = SessionManager(policy=POLICY_LAST_WRITER, rate=0)
+    first, second = open_session(manager), open_session(manager)
+    assert manager.admit(first, {'command': '10'}) and manager.admit(second, {'command': '20'})
+    assert events(first) == ['superseded'] and first.events[0]['by'] == second.id, first.events
+    assert not manager.lock(first), "locks are only taken under the exclusive policy"
+    assert manager.stats['takeovers'] == 1, manager.stats
+
+def test_observer_and_limit():
+    manager = SessionManager(max_sessions=2, rate=0)
+    observer = open_session(manager, role=ROLE_OBSERVER)
+    assert not manager.admit(observer, {'command': '10'}) and not manager.admit(observer, {'stop': True})
+    assert manager.allow(observer), "observers may query"
+    assert open_session(manager) is not None
+    assert manager.open() is None and manager.stats['refused'] == 1, manager.stats
+    try:
+        manager.open(role='admin')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("accepted an unknown role")
+
+def test_rate_limit():
+    manager = SessionManager(rate=1.0, burst=3)
+    session = open_session(manager)
+    results = [manager.admit(session, {'command': str(i)}) for i in range(5)]
+    assert results == [True, True, True, False, False], results
+    # Told once per throttled episode, and stops still pass
+    assert events(session) == ['throttled'] and session.throttled == 2, session.events
+    assert manager.admit(session, {'stop': True})
+
+if __name__ == "__main__":
+    test_exclusive()
+    test_default_gripper_lock()
+    test_last_writer()
+    test_observer_and_limit()
+    test_rate_limit()
+    print("Session checks OK")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# Status poller and snapshot cache
+# Checks that published snapshots are numbered and replace each other, that waiters wake on a
+# publish, that failed reads are counted without publishing and that the poll period follows the
+# motion state. Runs against a fake client (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/status_test.py
+import os, sys, time
+from threading import Thread
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.status import StatusCache, StatusPoller
+from grippers.robotiq.client import RobotiqInterpreter
+
+# Activated and at rest, then going to a position with no object detected (in motion)
+AT_REST = [0x31, 0, 0, 0, 0, 0]
+MOVING = [0x09, 0, 0, 100, 50, 0]
+
+class FakeClient:
+    """Answers status reads from a settable raw status
+    """
+    def __init__(self, status: list = AT_REST):
+        self.interpreter = RobotiqInterpreter()
+        self.status: list = status
+        self.reads: int = 0
+        self._connected: bool = True
+
+    def get_interpreter(self):
+        return self.interpreter
+
+    def get_status(self) -> list:
+        self.reads += 1
+        return list(self.status)
+
+def test_cache_publish():
+    cache = StatusCache()
+    assert cache.latest() is None
+    first = cache.publish('a')
+    second = cache.publish('b')
+    assert (first.seq, second.seq) == (1, 2) and cache.latest() is second, cache.latest()
+    # Snapshots are replaced, never mutated
+    assert first.status == 'a' and second.age() >= 0
+
+def test_cache_wait():
+    cache = StatusCache()
+    cache.publish('a')
+    # Nothing newer than the current snapshot: times out with the current one
+    start = time.monotonic()
+    assert cache.wait(after_seq=1, timeout=0.05).seq == 1
+    assert time.monotonic() - start >= 0.04
+    Thread(target=lambda: (time.sleep(0.05), cache.publish('b')), daemon=True).start()
+    assert cache.wait(after_seq=1, timeout=2.0).status == 'b'
+
+def test_poll_errors():
+    client = FakeClient(status=[])
+    cache = StatusCache()
+    poller = StatusPoller(client, cache)
+    assert poller.poll() is None and cache.latest() is None
+    client.status = AT_REST
+    assert poller.poll().status.gSTA == 3
+    assert poller.stats['polls'] == 1 and poller.stats['errors'] == 1, poller.stats
+
+def test_poll_rate(rate: float = 50.0, idle_rate: float = 5.0):
+    client = FakeClient(status=MOVING)
+    cache = StatusCache()
+    poller = StatusPoller(client, cache, rate=rate, idle_rate=idle_rate)
+    poller.start()
+    try:
+        time.sleep(0.3)
+        moving_reads = client.reads
+        assert poller.stats['period'] == 1.0 / rate, poller.stats
+        client.status = AT_REST
+        time.sleep(0.1)
+        idle_start = client.reads
+        time.sleep(0.3)
+        idle_reads = client.reads - idle_start
+    finally:
+        poller.stop()
+    assert poller.stats['period'] == 1.0 / idle_rate, poller.stats
+    assert moving_reads >= 8 and idle_reads <= 3, (moving_reads, idle_reads)
+
+if __name__ == "__main__":
+    test_cache_publish()
+    test_cache_wait()
+    test_poll_errors()
+    test_poll_rate()
+    print("Status checks OK")
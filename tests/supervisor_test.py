@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# Connection supervisor reconnect and backoff
+# Checks the reconnect backoff (exponential with equal jitter, capped), that the link is declared
+# down after consecutive failed heartbeats and restored once a reconnect succeeds, and that the
+# gripper is only set up again (through the owner's setup method) when activation was lost.
+# Runs against a fake client (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/supervisor_test.py
+import asyncio, os, sys, time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.supervisor import ConnectionSupervisor, AsyncConnectionSupervisor
+from base.status import StatusCache
+from grippers.robotiq.client import RobotiqInterpreter
+
+# An activated gripper at rest, and one that has lost activation (e.g., power cycled)
+ACTIVATED = bytes([0x31, 0, 0, 0, 0, 0])
+RESET = bytes(6)
+
+class FakeClient:
+    """A client whose connection attempts and status reads follow a script
+    """
+    def __init__(self, connects: list = (), status: bytes = ACTIVATED):
+        self._connected: bool = False
+        self.interpreter = RobotiqInterpreter()
+        # Activation was requested (so a reset status is a lost activation)
+        self.interpreter.generate_output('a')
+        # Results of the next connection attempts (then True)
+        self.connects: list = list(connects)
+        self.status: bytes = status
+        self.setups: int = 0
+
+    def get_interpreter(self):
+        return self.interpreter
+
+    def connect(self) -> bool:
+        self._connected = self.connects.pop(0) if self.connects else True
+        return self._connected
+
+    def disconnect(self):
+        self._connected = False
+
+    def get_status(self) -> bytes:
+        return self.status
+
+    def setup(self) -> bool:
+        self.setups += 1
+        return True
+
+def wait(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_backoff_delay():
+    supervisor = ConnectionSupervisor(FakeClient(), StatusCache(), backoff=0.5, backoff_max=4.0)
+    for attempt, delay in enumerate((0.5, 1.0, 2.0, 4.0, 4.0, 4.0)):
+        supervisor._attempt = attempt
+        for _ in range(50):
+            assert delay / 2 <= supervisor._delay() <= delay, (attempt, delay)
+
+def test_reconnect():
+    client = FakeClient(connects=[False, False])
+    supervisor = ConnectionSupervisor(client, StatusCache(), heartbeat=0.05, backoff=0.01, backoff_max=0.02)
+    supervisor.start()
+    try:
+        assert supervisor.wait_until_up(2.0), supervisor.stats
+        stats = supervisor.stats
+        assert stats['outages'] == 1 and stats['reconnects'] == 1 and stats['attempts'] == 3, stats
+        assert client.setups == 0, "an activated gripper was set up again"
+    finally:
+        supervisor.stop()
+
+def test_heartbeat_failures():
+    client = FakeClient()
+    client.connect()
+    supervisor = ConnectionSupervisor(client, StatusCache(), heartbeat=0.02, failures=2, backoff=0.01, backoff_max=0.02)
+    supervisor.start()
+    try:
+        assert supervisor.up
+        # The client stays connected but stops answering
+        client.status = b''
+        client.connects = [False] * 3
+        assert wait(lambda: not supervisor.up), supervisor.stats
+        assert supervisor.stats['heartbeat_failures'] >= 2, supervisor.stats
+        client.status = ACTIVATED
+        assert supervisor.wait_until_up(2.0), supervisor.stats
+        assert supervisor.stats['outages'] == 1 and supervisor.stats['reconnects'] == 1, supervisor.stats
+    finally:
+        supervisor.stop()
+
+def test_reactivation_uses_setup_method():
+    client = FakeClient(connects=[False], status=RESET)
+    calls: list = []
+    def setup() -> bool:
+        calls.append(time.monotonic())
+        client.status = ACTIVATED
+        return True
+    supervisor = ConnectionSupervisor(client, StatusCache(), heartbeat=0.02, backoff=0.01, backoff_max=0.02, setup=setup)
+    supervisor.start()
+    try:
+        assert supervisor.wait_until_up(2.0), supervisor.stats
+        assert len(calls) == 1 and client.setups == 0, (calls, client.setups)
+        assert supervisor.stats['reactivations'] == 1, supervisor.stats
+    finally:
+        supervisor.stop()
+
+def test_async_wait_until_up():
+    class AsyncFakeClient(FakeClient):
+        async def connect(self) -> bool:
+            return FakeClient.connect(self)
+
+        async def disconnect(self):
+            FakeClient.disconnect(self)
+
+        async def get_status(self) -> bytes:
+            return self.status
+
+    async def run():
+        supervisor = AsyncConnectionSupervisor(AsyncFakeClient(connects=[False, False]), StatusCache(),
+                                               heartbeat=0.05, backoff=0.01, backoff_max=0.02)
+        assert not await supervisor.wait_until_up(0.05), "the link was up before the supervisor started"
+        supervisor.start()
+        try:
+            assert await supervisor.wait_until_up(2.0), supervisor.stats
+            assert supervisor.stats['attempts'] == 3, supervisor.stats
+        finally:
+            supervisor.stop()
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_backoff_delay()
+    test_reconnect()
+    test_heartbeat_failures()
+    test_reactivation_uses_setup_method()
+    test_async_wait_until_up()
+    print("Supervisor checks OK")
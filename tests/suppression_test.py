@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# Redundant write suppression
+# Checks that an unchanged command is not written (only the status is read), that a partial change
+# writes just the span of changed registers, that force always writes in full and that a failed
+# write clears the shadow so the next write is full. Runs against a fake Modbus client (no bus or
+# simulator needed).
+#
+# Usage (from the package root):
+#   python tests/suppression_test.py
+import os, sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from grippers.robotiq.client import RobotiqModbusSerialClient, RobotiqInterpreter
+
+class FakeResponse:
+    def __init__(self, registers: list = None, exception_code: int = None):
+        self.registers: list = registers or []
+        self.exception_code: int = exception_code
+
+    def isError(self) -> bool:
+        return self.exception_code is not None
+
+class FakeModbus:
+    """Records the register span of each write (the next write is refused if fail is set)
+    """
+    def __init__(self):
+        self.fail: bool = False
+        # Transport settings adjusted by the client's adaptive timeouts
+        self.comm_params = SimpleNamespace(timeout_connect=None)
+        self.socket = None
+        self.calls: list = []
+
+    def _write(self, name: str, address: int, values: list) -> FakeResponse:
+        self.calls.append((name, address - 0x03E8, list(values)))
+        if self.fail:
+            self.fail = False
+            return FakeResponse(exception_code=4)
+        return FakeResponse([0x3100, 0, 0])
+
+    def readwrite_registers(self, read_address, read_count, write_address, values, slave):
+        return self._write('fc23', write_address, values)
+
+    def write_registers(self, address, values, slave):
+        return self._write('write', address, values)
+
+    def read_holding_registers(self, address, count, slave):
+        self.calls.append(('read', address - 0x07D0, count))
+        return FakeResponse([0x3100, 0, 0][:count])
+
+def _client() -> RobotiqModbusSerialClient:
+    client = RobotiqModbusSerialClient(interpreter=RobotiqInterpreter())
+    client._client = FakeModbus()
+    client._connected = True
+    return client
+
+def _send(client: RobotiqModbusSerialClient, value: str, force: bool = False) -> list:
+    return client.send_and_get_status(client.get_interpreter().generate_output(value), force=force)
+
+def test_suppressed():
+    client = _client()
+    assert _send(client, 'a') and _send(client, 'a')
+    assert client._client.calls == [('fc23', 0, [0x0900, 0x0000, 0xFF96]), ('read', 0, 3)], client._client.calls
+    assert client.stats['writes'] == 1 and client.stats['suppressed'] == 1, client.stats
+
+def test_partial():
+    client = _client()
+    assert _send(client, 'a') and _send(client, '100')
+    # Only the position register (rPR) changed
+    assert client._client.calls[-1] == ('fc23', 1, [0x0064]), client._client.calls
+    assert client.stats['partial'] == 1 and client.stats['registers_saved'] == 2, client.stats
+    # Sync writes suppress in the same way
+    assert client.send(client.get_interpreter().generate_output('100'))
+    assert client.stats['suppressed'] == 1 and len(client._client.calls) == 2, client._client.calls
+
+def test_force():
+    client = _client()
+    assert _send(client, 'a') and _send(client, 'a', force=True)
+    assert [len(call[2]) for call in client._client.calls] == [3, 3], client._client.calls
+
+def test_failure_clears_shadow():
+    client = _client()
+    assert _send(client, 'a')
+    client._client.fail = True
+    assert not _send(client, '100')
+    assert client._shadow is None
+    # The device state is unknown so the retry is written in full
+    assert _send(client, '100') and client._client.calls[-1] == ('fc23', 0, [0x0900, 0x0064, 0xFF96]), client._client.calls
+
+if __name__ == "__main__":
+    test_suppressed()
+    test_partial()
+    test_force()
+    test_failure_clears_shadow()
+    print("Suppression checks OK")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# Telemetry ring recording
+# Checks that records read back in order with their kind, gripper and register bytes, that the
+# ring overwrites its oldest records once full, that a recorder appends to an existing recording
+# of the same capacity and that a time window loads as column arrays (when NumPy is installed).
+#
+# Usage (from the package root):
+#   python tests/telemetry_test.py
+import os, sys, tempfile
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.telemetry import TelemetryRecorder, TelemetryReader, KIND_COMMAND, KIND_STATUS, HEADER_SIZE, RECORD_SIZE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def _path(name: str) -> str:
+    return os.path.join(tempfile.mkdtemp(), name)
+
+def test_records():
+    path = _path('records.bin')
+    recorder = TelemetryRecorder(path, max_bytes=HEADER_SIZE + 16 * RECORD_SIZE)
+    left, right = recorder.channel('left'), recorder.channel('right')
+    left.command([9, 0, 0, 100, 255, 150])
+    right.status([0x31, 0, 0, 0, 0, 0])
+    recorder.close()
+    reader = TelemetryReader(path)
+    records = [(kind, gripper, data) for _, kind, gripper, data in reader.records()]
+    reader.close()
+    assert records == [(KIND_COMMAND, 'left', [9, 0, 0, 100, 255, 150]),
+                       (KIND_STATUS, 'right', [0x31, 0, 0, 0, 0, 0])], records
+
+def test_ring_overwrite(capacity: int = 8):
+    path = _path('ring.bin')
+    recorder = TelemetryRecorder(path, max_bytes=HEADER_SIZE + capacity * RECORD_SIZE)
+    channel = recorder.channel('left')
+    for i in range(20):
+        channel.command([i])
+    assert recorder.stats == {'records': 20, 'capacity': capacity, 'overwritten': 12}, recorder.stats
+    # Records can be read while recording
+    reader = TelemetryReader(path)
+    assert [data[0] for _, _, _, data in reader.records()] == list(range(12, 20))
+    reader.close()
+    recorder.close()
+    assert os.path.getsize(path) == HEADER_SIZE + capacity * RECORD_SIZE
+
+def test_resume():
+    path = _path('resume.bin')
+    max_bytes = HEADER_SIZE + 8 * RECORD_SIZE
+    recorder = TelemetryRecorder(path, max_bytes=max_bytes)
+    recorder.channel('left').command([1])
+    recorder.close()
+    recorder = TelemetryRecorder(path, max_bytes=max_bytes)
+    recorder.channel('left').command([2])
+    recorder.close()
+    # Another capacity starts afresh
+    recorder = TelemetryRecorder(path, max_bytes=max_bytes + RECORD_SIZE)
+    recorder.channel('left').command([3])
+    recorder.close()
+    reader = TelemetryReader(path)
+    assert [data for _, _, _, data in reader.records()] == [[3]]
+    reader.close()
+
+def test_window():
+    if numpy is None:
+        print("NumPy is not installed, skipping the window check")
+        return
+    path = _path('window.bin')
+    recorder = TelemetryRecorder(path, max_bytes=HEADER_SIZE + 8 * RECORD_SIZE)
+    for i in range(12):
+        recorder.append(KIND_COMMAND if i % 2 else KIND_STATUS, b'left' if i % 3 else b'right', [i, i], stamp=100.0 + i)
+    recorder.close()
+    reader = TelemetryReader(path)
+    window = reader.window(start=105.0, end=110.0, gripper='left', kind=KIND_COMMAND)
+    reader.close()
+    assert window['time'].tolist() == [105.0, 107.0], window['time']
+    assert window['data'][:, :2].tolist() == [[5, 5], [7, 7]] and window['length'].tolist() == [2, 2], window['data']
+
+if __name__ == "__main__":
+    test_records()
+    test_ring_overwrite()
+    test_resume()
+    test_window()
+    print("Telemetry checks OK")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# Adaptive transaction timeout
+# Checks that the timeout is the configured ceiling until the first measurement, tracks the
+# smoothed round-trip time plus k deviations within its floor and ceiling, and doubles on each
+# expiry (up to MAX_BACKOFF) until the next successful measurement.
+#
+# Usage (from the package root):
+#   python tests/timeout_test.py
+import math, os, sys
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.timing import AdaptiveTimeout, MAX_BACKOFF
+
+def test_initial_ceiling():
+    timing = AdaptiveTimeout(floor=0.005, ceiling=0.2)
+    assert timing.timeout() == 0.2
+    # A ceiling below the floor is raised to it
+    assert AdaptiveTimeout(floor=0.05, ceiling=0.01).timeout() == 0.05
+
+def test_tracks_round_trip():
+    timing = AdaptiveTimeout(floor=0.001, ceiling=1.0, k=4.0)
+    timing.observe(0.010)
+    # First measurement: srtt = rtt, rttvar = rtt / 2
+    assert math.isclose(timing.timeout(), 0.010 + 4.0 * 0.005), timing.stats
+    for _ in range(200):
+        timing.observe(0.010)
+    # A steady round-trip time converges on it (the deviation decays)
+    assert math.isclose(timing.stats['rtt'], 0.010) and timing.timeout() < 0.0101, timing.stats
+
+def test_bounds():
+    timing = AdaptiveTimeout(floor=0.02, ceiling=0.1)
+    for _ in range(50):
+        timing.observe(0.001)
+    assert timing.timeout() == 0.02, timing.stats
+    for _ in range(50):
+        timing.observe(0.5)
+    assert timing.timeout() == 0.1, timing.stats
+
+def test_backoff():
+    timing = AdaptiveTimeout(floor=0.0, ceiling=10.0)
+    for _ in range(200):
+        timing.observe(0.010)
+    base = timing.timeout()
+    for factor in (2, 4, 8, 8):
+        timing.expire()
+        assert math.isclose(timing.timeout(), base * min(factor, MAX_BACKOFF)), (factor, timing.stats)
+    # A successful measurement resets the backoff
+    timing.observe(0.010)
+    assert timing.timeout() < 1.1 * base, timing.stats
+
+if __name__ == "__main__":
+    test_initial_ceiling()
+    test_tracks_round_trip()
+    test_bounds()
+    test_backoff()
+    print("Adaptive timeout checks OK")
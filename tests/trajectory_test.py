@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# Timed trajectory execution
+# Checks that waypoints are released in planned time order, that malformed trajectories are
+# rejected, that a worker writes each waypoint at its planned time and reports progress and
+# completion, and that a new trajectory or a stop pre-empts the running one. Runs against a fake
+# client (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/trajectory_test.py
+import os, sys, time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.trajectory import Trajectory
+from base.worker import ClientWorker
+from base.lanes import PRIORITY_MOTION
+from grippers.robotiq.client import RobotiqInterpreter
+
+STATUS = [0x39, 0, 0, 0, 0x40, 0]
+
+class FakeClient:
+    """Records the time and position of each output written
+    """
+    def __init__(self):
+        self.interpreter = RobotiqInterpreter()
+        self.writes: list = []
+        self._connected: bool = False
+
+    def get_interpreter(self):
+        return self.interpreter
+
+    def connect(self) -> bool:
+        self._connected = True
+        return True
+
+    def setup(self) -> bool:
+        return True
+
+    def get_status(self) -> list:
+        return list(STATUS)
+
+    def send_and_get_status(self, output, priority: int = PRIORITY_MOTION) -> list:
+        self.writes.append((time.monotonic(), output[3]))
+        return list(STATUS)
+
+    @property
+    def stats(self) -> dict:
+        return {}
+
+def test_plan():
+    events: list = []
+    trajectory = Trajectory([{'t': 0.2, 'position': 2}, {'t': 0.0, 'position': 0}, {'t': 0.2, 'position': 3}],
+                            trajectory_id='plan', reply=events.append)
+    trajectory.start(now=10.0)
+    assert trajectory.time_to_next(now=10.0) == 0.0
+    assert [command['position'] for _, _, command in trajectory.due(now=10.1)] == [0]
+    assert abs(trajectory.time_to_next(now=10.1) - 0.1) < 1e-9
+    # Waypoints planned for the same time keep their order
+    assert [command['position'] for _, _, command in trajectory.due(now=10.2)] == [2, 3]
+    assert trajectory.done and trajectory.time_to_next() is None
+    assert events == [{'type': 'trajectory', 'id': 'plan', 'event': 'started', 'total': 3}], events
+
+def test_rejected():
+    for waypoints in ([], None, [{'position': 1}], [{'t': 'soon', 'position': 1}]):
+        try:
+            Trajectory(waypoints)
+            assert False, f"{waypoints} was accepted"
+        except ValueError:
+            pass
+
+def _worker() -> tuple:
+    client = FakeClient()
+    worker = ClientWorker(name='test', client=client, command_rate=0)
+    worker.start()
+    return client, worker
+
+def test_execution(step: float = 0.1):
+    client, worker = _worker()
+    events: list = []
+    try:
+        time.sleep(0.1)
+        start = time.monotonic()
+        worker.put({'trajectory': {'id': 'run', 'waypoints': [{'t': i * step, 'position': 10 * (i + 1)} for i in range(4)]},
+                    'reply': events.append})
+        time.sleep(4 * step + 0.2)
+    finally:
+        worker.stop()
+    assert [position for _, position in client.writes] == [10, 20, 30, 40], client.writes
+    for i, (stamp, _) in enumerate(client.writes):
+        assert -0.01 <= stamp - start - i * step < step / 2, f"waypoint {i} written at {stamp - start:.3f}s"
+    assert [event['event'] for event in events] == ['started'] + ['progress'] * 4 + ['completed'], events
+    assert worker.stats['trajectory']['completed'] == 1, worker.stats
+
+def test_preemption(step: float = 0.1):
+    client, worker = _worker()
+    first: list = []
+    try:
+        time.sleep(0.1)
+        worker.put({'trajectory': {'id': 'first', 'waypoints': [{'t': i * step, 'position': 10 + i} for i in range(5)]},
+                    'reply': first.append})
+        time.sleep(1.5 * step)
+        worker.put({'trajectory': {'id': 'second', 'waypoints': [{'t': 0.0, 'position': 100}, {'t': 10.0, 'position': 200}]}})
+        time.sleep(step)
+        worker.put({'stop': True})
+        time.sleep(step)
+    finally:
+        worker.stop()
+    positions = [position for _, position in client.writes]
+    # The first trajectory is pre-empted after two waypoints, the stop holds the current position
+    assert positions == [10, 11, 100, 0x40], positions
+    assert first[-1] == {'type': 'trajectory', 'id': 'first', 'event': 'preempted', 'remaining': 3}, first
+    assert worker.stats['trajectory']['preempted'] == 2 and not worker.stats['trajectory']['active'], worker.stats
+
+if __name__ == "__main__":
+    test_plan()
+    test_rejected()
+    test_execution()
+    test_preemption()
+    print("Trajectory checks OK")
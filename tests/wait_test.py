@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# Status-driven waits
+# Checks that setup returns as soon as the status reports reset and then activation (instead of
+# sleeping a fixed time), that a wait times out with the last status read, that the asyncio client
+# waits in the same way and that the cache wait does not touch the client. Runs against scripted
+# status reads (no bus or simulator needed).
+#
+# Usage (from the package root):
+#   python tests/wait_test.py
+import os, sys, time, asyncio
+from threading import Thread
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from base.status import StatusCache
+from grippers.robotiq.client import RobotiqModbusSerialClient, RobotiqAsyncModbusSerialClient, RobotiqInterpreter
+
+RESET = [0x00, 0, 0, 0, 0, 0]
+ACTIVATING = [0x11, 0, 0, 0, 0, 0]
+ACTIVATED = [0x31, 0, 0, 0, 0, 0]
+
+def _scripted(statuses: list):
+    """Returns a status read answering each status in turn (repeating the last)
+    """
+    reads: list = []
+    def get_status(num_bytes: int = 6) -> list:
+        reads.append(1)
+        return list(statuses[min(len(reads), len(statuses)) - 1])
+    return get_status
+
+def _client(statuses: list) -> RobotiqModbusSerialClient:
+    client = RobotiqModbusSerialClient(interpreter=RobotiqInterpreter())
+    client._connected = True
+    client.send = lambda command, **kwargs: True
+    client.get_status = _scripted(statuses)
+    return client
+
+def test_setup_waits_for_status():
+    client = _client([RESET, ACTIVATING, ACTIVATING, ACTIVATED])
+    start = time.monotonic()
+    assert client.setup()
+    assert time.monotonic() - start < 0.5, "setup waited longer than the status required"
+
+def test_wait_timeout():
+    client = _client([ACTIVATING])
+    start = time.monotonic()
+    status = client.wait_until_activated(timeout=0.1)
+    assert 0.08 <= time.monotonic() - start < 0.5
+    assert status.gSTA == 1 and not client.get_interpreter().is_activated(status), status
+    # Unreadable status times out with nothing
+    client.get_status = lambda num_bytes=6: []
+    assert client.wait_for(lambda status: True, timeout=0.05) is None
+
+def test_async_wait():
+    scripted = _scripted([RESET, ACTIVATING, ACTIVATED])
+    async def get_status(num_bytes: int = 6) -> list:
+        return scripted(num_bytes)
+    async def run():
+        # The asyncio Modbus client needs a running loop to be created
+        client = RobotiqAsyncModbusSerialClient(interpreter=RobotiqInterpreter())
+        client.get_status = get_status
+        return client, await client.wait_until_activated(timeout=1.0)
+    client, status = asyncio.run(run())
+    assert client.get_interpreter().is_activated(status), status
+
+def test_cache_wait_until():
+    interpreter = RobotiqInterpreter()
+    cache = StatusCache()
+    cache.publish(interpreter.interpret_input(ACTIVATING))
+    Thread(target=lambda: (time.sleep(0.05), cache.publish(interpreter.interpret_input(ACTIVATED))), daemon=True).start()
+    snapshot = cache.wait_until(interpreter.is_activated, timeout=2.0)
+    assert snapshot.seq == 2 and interpreter.is_activated(snapshot.status), snapshot
+
+if __name__ == "__main__":
+    test_setup_waits_for_status()
+    test_wait_timeout()
+    test_async_wait()
+    test_cache_wait_until()
+    print("Wait checks OK")